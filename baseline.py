@@ -0,0 +1,225 @@
+import numpy as np
+
+"""
+    Defined variables used for estimating the baseline of the signal:
+
+    BASELINE_METHODS ([]) : available methods of the get_phase_part method:
+                            "polynomial" - polynomial fitted iteratively to the whole signal, values above the fit
+                            are lowered to the fit in each iteration (the same as peakutils.baseline) - default,
+                            "piecewise" - the same fit in half-overlapping segments of the signal joined
+                            with triangular weights,
+                            "als" - asymmetric least squares smoothing (penalized second differences)
+    BASELINE_TOLERANCE (float) : relative change of coefficients of the polynomial which stops the iterations
+    SEGMENT_LENGTH (int) : the default number of samples of segments of the "piecewise" method
+    ALS_SMOOTHNESS (float) : the default weight of the penalty of second differences of the "als" method
+    ALS_ASYMMETRY (float) : the default weight of samples above the baseline of the "als" method
+                            (samples below the baseline have the weight 1 - ALS_ASYMMETRY)
+    ALS_ITERATIONS (int) : the default maximal number of iterations of the "als" method
+"""
+
+BASELINE_METHODS = ["polynomial", "piecewise", "als"]
+BASELINE_TOLERANCE = 1e-3
+SEGMENT_LENGTH = 1000
+ALS_SMOOTHNESS = 1e6
+ALS_ASYMMETRY = 0.01
+ALS_ITERATIONS = 10
+
+
+def polynomial_baseline(values, degree, max_iterations, tolerance=BASELINE_TOLERANCE):
+    """Estimates the baseline as the polynomial fitted iteratively to the signal - in each iteration values above
+        the fit are lowered to the fit, so peaks stop pulling the fit up. The fit is the same as in peakutils.baseline,
+        but the QR factorization of the Vandermonde matrix is computed once and reused by all iterations.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal
+        degree : int
+            The degree of the polynomial
+        max_iterations : int
+            The maximal number of iterations
+        tolerance : float
+            (optional) The relative change of coefficients of the polynomial which stops the iterations
+
+        Returns
+        -------
+        numpy.ndarray
+            values of the baseline
+        """
+
+    import scipy.linalg as sl
+
+    order = degree + 1
+    fitted = np.array(values, dtype=float)
+    baseline = fitted.copy()
+
+    """Positions are scaled like in peakutils to avoid numerical issues"""
+    positions = np.linspace(0., np.abs(fitted).max() ** (1. / order), len(fitted))
+    q, r = np.linalg.qr(np.vander(positions, order))
+
+    coefficients = np.ones(order)
+    for _ in range(max_iterations):
+        projection = q.T @ fitted
+        new_coefficients = sl.solve_triangular(r, projection)
+        if np.linalg.norm(new_coefficients - coefficients) / np.linalg.norm(coefficients) < tolerance:
+            break
+
+        coefficients = new_coefficients
+        baseline = q @ projection
+        np.minimum(fitted, baseline, out=fitted)
+
+    return baseline
+
+
+def piecewise_baseline(values, degree, max_iterations, segment_length=SEGMENT_LENGTH, tolerance=BASELINE_TOLERANCE):
+    """Estimates the baseline with polynomials fitted iteratively (like polynomial_baseline) to half-overlapping
+        segments of the signal. All segments share the QR factorization and are fitted together, so the cost grows
+        linearly with the length of the signal. Fits of overlapping segments are joined with triangular weights,
+        so the baseline is continuous. The last segment is filled up with the last value of the signal.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal
+        degree : int
+            The degree of polynomials
+        max_iterations : int
+            The maximal number of iterations
+        segment_length : int
+            (optional) The number of samples of each segment (rounded down to an even number)
+        tolerance : float
+            (optional) The relative change of coefficients of the polynomial which stops iterations of the segment
+
+        Returns
+        -------
+        numpy.ndarray
+            values of the baseline
+        """
+
+    import scipy.linalg as sl
+
+    values = np.asarray(values, dtype=float)
+    half = max(int(segment_length) // 2, degree + 1)
+    if len(values) <= 2 * half:
+        return polynomial_baseline(values, degree, max_iterations, tolerance)
+
+    segments_count = -(-(len(values) - 2 * half) // half) + 1
+    padded = np.concatenate((values, np.full((segments_count + 1) * half - len(values), values[-1])))
+    fitted = np.lib.stride_tricks.sliding_window_view(padded, 2 * half)[::half].T.copy()
+    baselines = fitted.copy()
+
+    q, r = np.linalg.qr(np.vander(np.linspace(-1., 1., 2 * half), degree + 1))
+    coefficients = np.ones((degree + 1, segments_count))
+    active = np.arange(segments_count)
+    for _ in range(max_iterations):
+        projection = q.T @ fitted[:, active]
+        new_coefficients = sl.solve_triangular(r, projection)
+        changes = np.linalg.norm(new_coefficients - coefficients[:, active], axis=0) / \
+            np.linalg.norm(coefficients[:, active], axis=0)
+        changing = changes >= tolerance
+
+        """Segments whose coefficients stopped changing keep their last fit"""
+        active = active[changing]
+        if len(active) == 0:
+            break
+        coefficients[:, active] = new_coefficients[:, changing]
+        baselines[:, active] = q @ projection[:, changing]
+        fitted[:, active] = np.minimum(fitted[:, active], baselines[:, active])
+
+    """Triangular weights of two overlapping segments sum up to one - the first and the last half of the signal
+        are covered by one segment only"""
+    weights = 1 - np.abs(np.arange(2 * half) + 0.5 - half) / half
+    weighted = baselines * weights[:, np.newaxis]
+    joined = np.zeros((segments_count + 1, half))
+    weights_sum = np.zeros((segments_count + 1, half))
+    joined[:-1] += weighted[:half].T
+    joined[1:] += weighted[half:].T
+    weights_sum[:-1] += weights[:half]
+    weights_sum[1:] += weights[half:]
+
+    return (joined / weights_sum).ravel()[:len(values)]
+
+
+def als_baseline(values, smoothness=ALS_SMOOTHNESS, asymmetry=ALS_ASYMMETRY, max_iterations=ALS_ITERATIONS):
+    """Estimates the baseline with asymmetric least squares smoothing: the baseline z minimizes
+        sum(w * (y - z) ** 2) + smoothness * sum(diff(z, 2) ** 2), where samples above the baseline have the weight
+        asymmetry and samples below it 1 - asymmetry. The pentadiagonal system is solved with the banded solver,
+        so each iteration costs time linear in the length of the signal.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal
+        smoothness : float
+            (optional) The weight of the penalty of second differences - larger values give smoother baselines
+        asymmetry : float
+            (optional) The weight of samples above the baseline (peaks)
+        max_iterations : int
+            (optional) The maximal number of iterations - they stop when weights do not change
+
+        Returns
+        -------
+        numpy.ndarray
+            values of the baseline
+        """
+
+    import scipy.linalg as sl
+
+    values = np.asarray(values, dtype=float)
+    length = len(values)
+    if length < 3:
+        return values.copy()
+
+    """Upper diagonals of the matrix of the penalty D^T D, where D is the matrix of second differences [1, -2, 1]"""
+    difference = [1., -2., 1.]
+    penalty = np.zeros((3, length))
+    for diagonal in range(3):
+        for index in range(3 - diagonal):
+            penalty[2 - diagonal, diagonal + index:length - 2 + index + diagonal] += \
+                difference[index] * difference[index + diagonal]
+    penalty *= smoothness
+
+    weights = np.ones(length)
+    baseline = values.copy()
+    for _ in range(max_iterations):
+        system = penalty.copy()
+        system[2] += weights
+        baseline = sl.solveh_banded(system, weights * values)
+
+        new_weights = np.where(values > baseline, asymmetry, 1 - asymmetry)
+        if np.array_equal(new_weights, weights):
+            break
+        weights = new_weights
+
+    return baseline
+
+
+def estimate_baseline(values, attr):
+    """Estimates the baseline of the signal with the method selected by attributes of the get_phase_part method
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal
+        attr : {}
+            The dictionary with attributes: "method" (one of BASELINE_METHODS, default is "polynomial"),
+            "deg" and "maxIt" of polynomial methods, "segmentLength" of the "piecewise" method,
+            "lambda", "p" and "maxIt" of the "als" method
+
+        Returns
+        -------
+        numpy.ndarray
+            values of the baseline
+        """
+
+    method = attr.get("method", "polynomial")
+    if method == "polynomial":
+        return polynomial_baseline(values, int(attr["deg"]), int(attr["maxIt"]))
+    if method == "piecewise":
+        return piecewise_baseline(values, int(attr["deg"]), int(attr["maxIt"]),
+                                  int(attr.get("segmentLength", SEGMENT_LENGTH)))
+    if method == "als":
+        return als_baseline(values, float(attr.get("lambda", ALS_SMOOTHNESS)), float(attr.get("p", ALS_ASYMMETRY)),
+                            int(attr.get("maxIt", ALS_ITERATIONS)))
+
+    raise ValueError("Unknown method of the baseline: " + str(method))
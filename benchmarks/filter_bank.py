@@ -0,0 +1,98 @@
+import argparse
+import sys
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+import numpy as np
+import scipy.signal as ss
+
+from filters import apply_filter, design_butterworth, get_butterworth_design
+
+"""
+    Defined variables used for the benchmark of the filter bank:
+
+    FILTER_BANK ([]) : attributes of butterworth_filter methods applied to every recording
+"""
+
+FILTER_BANK = [
+    {"filterOrder": 3, "samplingRate": 256, "type": "lowpass", "cutOfFrequencies": 5},
+    {"filterOrder": 4, "samplingRate": 256, "type": "highpass", "cutOfFrequencies": 0.5},
+    {"filterOrder": 5, "samplingRate": 256, "type": "bandpass", "cutOfFrequencies": [5, 15]},
+    {"filterOrder": 5, "samplingRate": 256, "type": "bandstop", "cutOfFrequencies": [49, 51]},
+    {"filterOrder": 8, "samplingRate": 256, "type": "bandpass", "cutOfFrequencies": [0.5, 40]},
+    {"filterOrder": 10, "samplingRate": 256, "type": "bandpass", "cutOfFrequencies": [1, 3]},
+]
+
+
+def legacy_filter(attr, values):
+    """The former path of butterworth_filter: the filter is designed as (b, a) coefficients on every call
+        and applied with scipy.signal.lfilter"""
+
+    nyquist_freq = 0.5 * attr["samplingRate"]
+    cut_of_freq = attr["cutOfFrequencies"]
+    if isinstance(cut_of_freq, list):
+        cut_of_freq = [elem / nyquist_freq for elem in cut_of_freq]
+    else:
+        cut_of_freq = cut_of_freq / nyquist_freq
+
+    b, a = ss.butter(attr["filterOrder"], cut_of_freq, btype=attr["type"], analog=False)
+    return ss.lfilter(b, a, values)
+
+
+def run_bank(filter_function, recordings):
+    """Applies every filter of the bank to every recording and returns the time of the run and the outputs"""
+
+    start = time.perf_counter()
+    outputs = [[filter_function(attr, values) for attr in FILTER_BANK] for values in recordings]
+    return time.perf_counter() - start, outputs
+
+
+def main(arguments):
+    """FILTER BANK BENCHMARK
+
+        Compares the throughput of the former filtering path (design of (b, a) coefficients on every call and lfilter)
+        with the memoized second-order sections (sosfilt and sosfiltfilt) for the bank of filters applied
+        to many recordings. It reports also the largest difference between outputs of both paths for every filter -
+        large differences show filters which are numerically unstable in the (b, a) form.
+        Run from the main directory of the program: py -3 -m benchmarks.filter_bank
+
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the filter bank applied to many recordings.")
+    parser.add_argument("--recordings", type=int, default=20, help="the number of recordings (default: 20)")
+    parser.add_argument("--length", type=int, default=256 * 60 * 10,
+                        help="the number of samples of each recording (default: 10 minutes at 256 Hz)")
+    arguments = parser.parse_args(arguments)
+
+    generator = np.random.default_rng(0)
+    recordings = [np.cumsum(generator.standard_normal(arguments.length)) for _ in range(arguments.recordings)]
+    samples = arguments.recordings * arguments.length * len(FILTER_BANK)
+
+    design_butterworth.cache_clear()
+    paths = [
+        ("lfilter (b, a), designed on every call", legacy_filter),
+        ("sosfilt, memoized design", lambda attr, values: apply_filter(get_butterworth_design(attr), values)),
+        ("sosfiltfilt, memoized design",
+         lambda attr, values: apply_filter(get_butterworth_design(attr), values, "zeroPhase")),
+    ]
+
+    results = {}
+    for name, filter_function in paths:
+        elapsed, outputs = run_bank(filter_function, recordings)
+        results[name] = outputs
+        print("%-42s %8.3f s %14.0f samples/s" % (name, elapsed, samples / elapsed))
+
+    print("\nLargest difference between lfilter (b, a) and sosfilt outputs (relative to the output range):")
+    legacy_outputs = results[paths[0][0]]
+    sos_outputs = results[paths[1][0]]
+    for index, attr in enumerate(FILTER_BANK):
+        difference = max(np.max(np.abs(legacy[index] - sos[index])) / max(np.ptp(sos[index]), np.finfo(float).tiny)
+                         for legacy, sos in zip(legacy_outputs, sos_outputs))
+        description = "%.3g" % difference if np.isfinite(difference) else "unstable in the (b, a) form"
+        print("  order %2d %-8s %-12s %s" % (attr["filterOrder"], attr["type"], str(attr["cutOfFrequencies"]),
+                                             description))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
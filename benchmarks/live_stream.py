@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+
+from main import process_live_stream
+
+"""
+    Defined variables used for the benchmark of the real-time streaming mode:
+
+    LIVE_SCENARIO (()) : the scenario run on the live feed (the tuple like in the list of scenarios in main.py)
+    MALFORMED_LINES ([]) : lines inserted in the middle of the feed - the value which is not a number and the line
+                           without the "values" column
+"""
+
+LIVE_SCENARIO = ("Live_GSR", {"signalFileName": "rawGSR", "signalType": "GSR",
+                              "columns_to_read": {"timestamp": 1, "values": 2},
+                              "windowing": {"length": 2000, "slide": 1000},
+                              "methods": [{"functionName": "butterworth_filter", "order": 1,
+                                           "attributes": {"filterOrder": 4, "samplingRate": 128, "type": "lowpass",
+                                                          "cutOfFrequencies": 5}},
+                                          {"functionName": "mean", "order": 2},
+                                          {"functionName": "maximum", "order": 3}]})
+MALFORMED_LINES = ["1000000.0,not a number", "1000000.0"]
+
+
+def run_session(lines):
+    """Runs the live session on lines of the feed and returns rows written to the output, reports written
+        to the standard error output and the elapsed time"""
+
+    output_file = io.StringIO()
+    error_file = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(error_file):
+        errors = process_live_stream([LIVE_SCENARIO], io.StringIO("\n".join(lines) + "\n"), output_file)
+    elapsed = time.perf_counter() - start
+    if len(errors) > 0:
+        raise errors[0][1]
+    return output_file.getvalue().splitlines(), error_file.getvalue().splitlines(), elapsed
+
+
+def main(arguments):
+    """LIVE STREAM BENCHMARK
+
+        Runs the real-time streaming mode (--stream-input) on samples of the GSR signal given line by line, once
+        as they are and once with the header and MALFORMED_LINES inserted in the middle of the feed, and reports
+        the throughput of both sessions. Malformed lines must be skipped and reported with their line numbers
+        (the header silently), and the session must go on with the same rows of features as the clean session.
+        The exit code is 1 if rows differ or malformed lines are not reported.
+        Run from the main directory of the program: py -3 -m benchmarks.live_stream
+
+    """
+    parser = argparse.ArgumentParser(description="Checks that malformed lines do not end the live streaming session.")
+    parser.add_argument("--signal", default="rawGSR", help="the name of the GSR signal file (default: rawGSR)")
+    arguments = parser.parse_args(arguments)
+
+    with open("./signals/" + arguments.signal + ".csv") as signal_file:
+        lines = [line.strip() for line in signal_file if line.strip()]
+
+    middle = len(lines) // 2
+    malformed_lines = ["timestamp,value"] + lines[:middle] + MALFORMED_LINES + lines[middle:]
+    """Line numbers start with 1 and the header is the first line"""
+    expected_reports = [str(middle + 2 + index) for index in range(len(MALFORMED_LINES))]
+
+    """The first session imports methods of the scenario, so it is not measured"""
+    run_session(lines[:100])
+    clean_rows, _, clean_time = run_session(lines)
+    rows, reports, elapsed = run_session(malformed_lines)
+
+    print("clean feed:     %6d rows %8.3f s %10.0f samples/s" % (len(clean_rows), clean_time, len(lines) / clean_time))
+    print("malformed feed: %6d rows %8.3f s %10.0f samples/s" % (len(rows), elapsed, len(lines) / elapsed))
+    for report in reports:
+        print("  " + report)
+
+    failed = False
+    if rows != clean_rows or len(rows) < 3:
+        print("\nRows of the feed with malformed lines differ from rows of the clean feed", file=sys.stderr)
+        failed = True
+    reported_lines = [report.split()[1] for report in reports]
+    if reported_lines != expected_reports:
+        print("\nReported lines %s, expected lines %s" % (reported_lines, expected_reports), file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,114 @@
+import argparse
+import sys
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+import numpy as np
+
+from r_peaks import detect_r_peaks
+from signalTypes.PeriodicSignal import PeriodicSignal
+
+"""
+    Defined variables used for the benchmark of R peak detectors:
+
+    PAN_TOMPKINS_ATTRIBUTES ({}) : attributes of the pan_tompkins method applied to the recording
+                                   (the same as in configuration/config_ecg.json)
+"""
+
+PAN_TOMPKINS_ATTRIBUTES = {"filterOrder": 5, "samplingRate": 256, "type": "bandpass", "cutOfFrequencies": [5, 15],
+                           "lengthOfWindow": 15}
+
+
+def get_integrated_signal(signal_file_name):
+    """Returns values of the recording after all steps of the pan_tompkins method which precede the detection
+        of R peaks"""
+
+    ecg = PeriodicSignal(signal_file_name, "ECG", {"timestamp": 1, "values": 2})
+    ecg.butterworth_filter(PAN_TOMPKINS_ATTRIBUTES)
+    ecg.differentiate()
+    ecg.square()
+    ecg.moving_window_integration(PAN_TOMPKINS_ATTRIBUTES)
+    return ecg.get_values()
+
+
+def match_peaks(reference_peaks, peaks, tolerance):
+    """Returns the number of reference peaks which have a peak at most tolerance samples away"""
+
+    if len(peaks) == 0:
+        return 0
+    positions = np.searchsorted(peaks, reference_peaks)
+    previous_peaks = peaks[np.maximum(positions - 1, 0)]
+    next_peaks = peaks[np.minimum(positions, len(peaks) - 1)]
+    distances = np.minimum(np.abs(previous_peaks - reference_peaks), np.abs(next_peaks - reference_peaks))
+    return int(np.count_nonzero(distances <= tolerance))
+
+
+def main(arguments):
+    """R PEAK DETECTORS BENCHMARK
+
+        Compares the native detector of R peaks with the biosppy ECG pipeline on the Pan-Tompkins integrated signal
+        of the recording. It reports how many R peaks found by biosppy are found by the native detector
+        (sensitivity) and how many R peaks of the native detector are found by biosppy (positive predictivity),
+        and the throughput of both detectors on the recording repeated many times. biosppy drops beats at the edges
+        of the recording, so native R peaks closer to the first or the last sample than the edge margin are not counted
+        in the positive predictivity.
+        The exit code is 1 if the sensitivity or the positive predictivity is lower than required.
+        Run from the main directory of the program: py -3 -m benchmarks.r_peaks
+
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks detectors of R peaks and checks their agreement.")
+    parser.add_argument("--signal", default="ECG_1", help="the name of the ECG signal file (default: ECG_1)")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="the largest distance of matched R peaks in seconds (default: 0.05)")
+    parser.add_argument("--min-sensitivity", type=float, default=1.0,
+                        help="the required fraction of biosppy R peaks found by the native detector (default: 1.0)")
+    parser.add_argument("--min-predictivity", type=float, default=1.0,
+                        help="the required fraction of native R peaks (outside edge margins) found by biosppy "
+                             "(default: 1.0)")
+    parser.add_argument("--edge-margin", type=float, default=0.5,
+                        help="the distance from the edges of the recording in seconds within which native R peaks "
+                             "are not counted in the positive predictivity (default: 0.5)")
+    parser.add_argument("--repeat", type=int, default=360,
+                        help="how many times the recording is repeated for the throughput (default: 360)")
+    arguments = parser.parse_args(arguments)
+
+    sampling_rate = PAN_TOMPKINS_ATTRIBUTES["samplingRate"]
+    integrated_signal = get_integrated_signal(arguments.signal)
+
+    native_peaks = detect_r_peaks(integrated_signal, sampling_rate, "native")
+    biosppy_peaks = detect_r_peaks(integrated_signal, sampling_rate, "biosppy")
+    tolerance = int(round(arguments.tolerance * sampling_rate))
+    sensitivity = match_peaks(biosppy_peaks, native_peaks, tolerance) / max(len(biosppy_peaks), 1)
+    margin = int(round(arguments.edge_margin * sampling_rate))
+    inner_peaks = native_peaks[(native_peaks >= margin) & (native_peaks < len(integrated_signal) - margin)]
+    predictivity = match_peaks(inner_peaks, biosppy_peaks, tolerance) / max(len(inner_peaks), 1)
+
+    print("R peaks of %s: native %d (%d at edges), biosppy %d" % (arguments.signal, len(native_peaks),
+                                                                  len(native_peaks) - len(inner_peaks),
+                                                                  len(biosppy_peaks)))
+    print("sensitivity (biosppy peaks found by native): %.3f" % sensitivity)
+    print("positive predictivity (native peaks outside edges found by biosppy): %.3f" % predictivity)
+
+    long_signal = np.tile(integrated_signal, arguments.repeat)
+    print("\nThroughput on %d samples:" % len(long_signal))
+    for detector in ["native", "biosppy"]:
+        start = time.perf_counter()
+        detect_r_peaks(long_signal, sampling_rate, detector)
+        elapsed = time.perf_counter() - start
+        print("%-8s %8.3f s %14.0f samples/s" % (detector, elapsed, len(long_signal) / elapsed))
+
+    failed = False
+    if sensitivity < arguments.min_sensitivity:
+        print("\nSensitivity is lower than %.3f" % arguments.min_sensitivity, file=sys.stderr)
+        failed = True
+    if predictivity < arguments.min_predictivity:
+        print("\nPositive predictivity is lower than %.3f" % arguments.min_predictivity, file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
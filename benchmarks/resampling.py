@@ -0,0 +1,99 @@
+import argparse
+import sys
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+import numpy as np
+import scipy.signal as ss
+
+from benchmarks.synthetic import generate_gsr
+from resampling import get_resampling_ratio, resample
+from streaming import create_processing_stage
+
+"""
+    Defined variables used for the benchmark of resampling:
+
+    SAMPLING_FREQUENCY (int) : the frequency of the synthetic GSR signal (the same as signals/rawGSR.csv)
+    GOAL_FREQUENCIES ([]) : goal frequencies of the decimate method - integer ratios are compared with the former
+                            path, other ratios are run only by the polyphase resampler
+"""
+
+SAMPLING_FREQUENCY = 128
+GOAL_FREQUENCIES = [64, 16, 4, 48, 100]
+
+
+def iir_decimate(timestamps, values, ratio):
+    """The former path of the decimate method: the IIR filter applied to the two-dimensions array
+        with timestamps and values"""
+
+    filtered = ss.decimate(np.column_stack((timestamps, values)), ratio, 8, axis=0)
+    return filtered[:, 0], filtered[:, 1]
+
+
+def stream_decimate(timestamps, values, attr, chunk_size):
+    """Runs the decimate method of the streaming mode on the signal in chunks"""
+
+    stage = create_processing_stage("decimate", attr)
+    outputs = [stage.push(timestamps[start:start + chunk_size], values[start:start + chunk_size])
+               for start in range(0, len(values), chunk_size)]
+    outputs.append(stage.flush())
+    return np.concatenate([output[0] for output in outputs]), np.concatenate([output[1] for output in outputs])
+
+
+def measure(function, samples):
+    """Runs the function and returns its result, the elapsed time and the throughput in samples per second"""
+
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    return result, elapsed, samples / elapsed
+
+
+def main(arguments):
+    """RESAMPLING BENCHMARK
+
+        Compares the throughput of the former decimate path (order 8 IIR filter applied to timestamps and values
+        with scipy.signal.decimate) with the polyphase FIR resampler applied to values only, on the whole signal
+        and in chunks of the streaming mode. For integer ratios it reports also the largest error of timestamps
+        of the former path (the polyphase resampler takes timestamps of input samples, so it has no error).
+        Run from the main directory of the program: py -3 -m benchmarks.resampling
+
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks resampling of the signal by the decimate method.")
+    parser.add_argument("--length", type=int, default=SAMPLING_FREQUENCY * 3600 * 8,
+                        help="the number of samples of the synthetic GSR signal (default: 8 hours at 128 Hz)")
+    parser.add_argument("--chunk-size", type=int, default=100000,
+                        help="the number of samples of chunks of the streaming mode (default: 100000)")
+    arguments = parser.parse_args(arguments)
+
+    chunks = list(generate_gsr(arguments.length, SAMPLING_FREQUENCY))
+    timestamps = np.concatenate([chunk[0] for chunk in chunks])
+    values = np.concatenate([chunk[1] for chunk in chunks])
+    samples = len(values)
+    print("Synthetic GSR: %d samples at %d Hz\n" % (samples, SAMPLING_FREQUENCY))
+
+    for goal_frequency in GOAL_FREQUENCIES:
+        up, down = get_resampling_ratio(SAMPLING_FREQUENCY, goal_frequency)
+        attr = {"samplingFrequency": SAMPLING_FREQUENCY, "goalFrequency": goal_frequency}
+        print("%d Hz -> %g Hz (up %d, down %d)" % (SAMPLING_FREQUENCY, goal_frequency, up, down))
+
+        if up == 1:
+            (iir_timestamps, _), elapsed, throughput = measure(lambda: iir_decimate(timestamps, values, down), samples)
+            timestamp_error = np.max(np.abs(iir_timestamps - timestamps[::down][:len(iir_timestamps)]))
+            print("  %-34s %8.3f s %14.0f samples/s   largest timestamp error %.3g" % (
+                "iir (timestamps and values)", elapsed, throughput, timestamp_error))
+
+        (_, polyphase_values), elapsed, throughput = measure(lambda: resample(timestamps, values, up, down), samples)
+        print("  %-34s %8.3f s %14.0f samples/s" % ("polyphase (values only)", elapsed, throughput))
+
+        (_, stream_values), elapsed, throughput = measure(
+            lambda: stream_decimate(timestamps, values, attr, arguments.chunk_size), samples)
+        print("  %-34s %8.3f s %14.0f samples/s   largest difference from the whole signal %.3g" % (
+            "polyphase, chunks of %d" % arguments.chunk_size, elapsed, throughput,
+            np.max(np.abs(stream_values - polyphase_values))))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+import numpy as np
+
+from benchmarks.synthetic import generate_ecg, generate_gsr, write_signal_file
+
+"""
+    Defined variables used for the scaling benchmark:
+
+    CONFIGURATIONS ([]) : configuration files whose scenarios are run on synthetic signals
+    SYNTHETIC_SIGNALS ({}) : for each type of signal - the generator of the synthetic signal, its sampling rate
+                             and the number of timestamp units in one second (the same as in files in ./signals)
+    RECORD_KEY ([]) : fields of the record which identify the measurement when it is compared with the baseline
+"""
+
+CONFIGURATIONS = ["./configuration/config_ecg.json", "./configuration/config_gsr.json"]
+SYNTHETIC_SIGNALS = {"ECG": (generate_ecg, 256, 1e6), "GSR": (generate_gsr, 128, 1e3)}
+RECORD_KEY = ["config", "scenario", "samples", "window", "step"]
+
+
+def get_peak_rss():
+    """Returns the peak resident set size of the process in bytes (None if it can not be measured on the platform)"""
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_case(case):
+    """Runs all scenarios of the configuration file on the synthetic signal file and measures the load of the signal,
+        every processing step and the whole scenario. It is run in a fresh interpreter, so the peak RSS belongs
+        only to this case.
+
+        Parameters
+        ----------
+        case : dict
+            "config" - the path to the configuration file, "signal_file" - the path to the synthetic signal file,
+            "samples" - its number of samples, "window" - [length, slide] in seconds or None, "repeat" - the number
+            of runs (the shortest time of each step is reported)
+
+        Returns
+        -------
+        list
+            records with "config", "scenario", "samples", "window", "step", "time" and "samples_per_second"
+        """
+
+    import importlib
+
+    from benchmarks.startup import DEFERRED_MODULES
+    from main import create_scenario, load_config_file
+
+    """Modules imported by methods when they are needed are imported before measurements,
+        so the time of the import is not included in the time of the first method which needs them"""
+    for module in DEFERRED_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    window = "none" if case["window"] is None else "%g:%g" % tuple(case["window"])
+    times = {}
+    for _ in range(case["repeat"]):
+        for scenario_name, attributes in load_config_file(case["config"]):
+            attributes = dict(attributes, signalFileName=case["signal_file"])
+            if case["window"] is not None:
+                units = SYNTHETIC_SIGNALS[attributes["signalType"]][2]
+                attributes["windowing"] = {"length": case["window"][0] * units, "slide": case["window"][1] * units}
+
+            start = time.perf_counter()
+            scenario = create_scenario((scenario_name, attributes))
+            measured = [("load", time.perf_counter() - start)]
+            scenario.sort_methods_by_order()
+            for step in scenario.get_processing_steps():
+                step_start = time.perf_counter()
+                scenario.process_step(step)
+                measured.append((" ".join("%s %s" % (method["order"], method["functionName"]) for method in step),
+                                 time.perf_counter() - step_start))
+            measured.append(("total", time.perf_counter() - start))
+
+            for step, elapsed in measured:
+                key = (scenario_name, step)
+                times[key] = min(times.get(key, elapsed), elapsed)
+
+    return [{"config": os.path.basename(case["config"]), "scenario": scenario_name, "samples": case["samples"],
+             "window": window, "step": step, "time": elapsed, "samples_per_second": case["samples"] / elapsed}
+            for (scenario_name, step), elapsed in times.items()]
+
+
+def measure_case(case, timeout):
+    """Runs the case (see run_case) in a fresh interpreter and returns its records with the peak RSS of the interpreter.
+        If the case fails or exceeds the timeout, a single record with the "error" is returned."""
+
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    failure = {"config": os.path.basename(case["config"]), "scenario": "", "samples": case["samples"],
+               "window": "none" if case["window"] is None else "%g:%g" % tuple(case["window"]), "step": "total"}
+    try:
+        process = subprocess.run([sys.executable, "-m", "benchmarks.scaling", "--case", json.dumps(case)],
+                                 cwd=directory, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return [dict(failure, error="timeout after %g s" % timeout)]
+    if process.returncode != 0:
+        return [dict(failure, error=process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed")]
+
+    """The last line of the output is the result - methods may print their own messages before it"""
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def get_signal_file(directory, signal_type, samples, arguments):
+    """Returns the path to the synthetic signal file of the type and length (generated if it does not exist yet)"""
+
+    generator, sampling_rate, _ = SYNTHETIC_SIGNALS[signal_type]
+    parameters = {"seed": arguments.seed}
+    if signal_type == "ECG":
+        parameters.update(heart_rate=arguments.heart_rate, hrv=arguments.hrv)
+
+    name = "synthetic_%s_%d_%s.npy" % (signal_type, samples,
+                                       "_".join("%s%g" % item for item in sorted(parameters.items())))
+    path = os.path.join(directory, name)
+    if not os.path.isfile(path):
+        write_signal_file(path, generator(samples, sampling_rate, **parameters), samples)
+    return path
+
+
+def compare_with_baseline(records, baseline_records, tolerance, min_time):
+    """Returns measurements which failed or are slower than in the baseline by more than the tolerance
+        (measurements shorter than min_time in the baseline are skipped as too noisy)
+
+        Returns
+        -------
+        list
+            tuples (record, baseline record or None)
+        """
+
+    baseline = {tuple(record[field] for field in RECORD_KEY): record for record in baseline_records
+                if "error" not in record}
+    regressions = []
+    for record in records:
+        reference = baseline.get(tuple(record[field] for field in RECORD_KEY))
+        if "error" in record:
+            regressions.append((record, reference))
+        elif reference is not None and reference["time"] >= min_time and \
+                record["time"] > reference["time"] * (1 + tolerance):
+            regressions.append((record, reference))
+    return regressions
+
+
+def print_record(record):
+    """Prints the single measurement"""
+
+    case = "%-16s %-14s %10d %-8s %-44s" % (record["config"], record["scenario"], record["samples"], record["window"],
+                                           record["step"])
+    if "error" in record:
+        print(case + " " + record["error"])
+        return
+
+    peak_rss = "" if record.get("peak_rss") is None else "%10.1f MB" % (record["peak_rss"] / 1024 / 1024)
+    print(case + " %9.3f s %14.0f samples/s" % (record["time"], record["samples_per_second"]) + peak_rss)
+
+
+def main(arguments):
+    """SCALING BENCHMARK
+
+        Runs scenarios of configuration files (CONFIGURATIONS) on deterministic synthetic signals of the same types
+        for every selected length and windowing of the signal. Each case is run in a fresh interpreter and the time
+        of loading the signal, of every processing step and of the whole scenario is reported with the throughput
+        (samples per second) and the peak RSS of the interpreter. Results are saved to the .json file which can be
+        used as the baseline of next runs - the exit code is 1 if any measurement is slower than in the baseline
+        by more than the tolerance or fails.
+        Run from the main directory of the program: py -3 -m benchmarks.scaling --lengths 1000000 10000000
+
+    """
+    parser = argparse.ArgumentParser(description="Measures how processing of scenarios scales with the signal length.")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--configs", nargs="+", default=CONFIGURATIONS,
+                        help="configuration files with scenarios (default: ECG and GSR configurations)")
+    parser.add_argument("--lengths", nargs="+", type=int, default=[100000, 1000000],
+                        help="numbers of samples of synthetic signals (default: 100000 1000000)")
+    parser.add_argument("--windows", nargs="+", default=["none", "60:10"],
+                        help="windowing of signals as LENGTH:SLIDE in seconds or none (default: none 60:10)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="the number of runs of each case - the shortest times are reported (default: 1)")
+    parser.add_argument("--timeout", type=float, default=1800, help="the time limit of each case in seconds")
+    parser.add_argument("--heart-rate", type=float, default=60, help="the mean heart rate of the synthetic ECG")
+    parser.add_argument("--hrv", type=float, default=0.05,
+                        help="the relative variability of R-R intervals of the synthetic ECG (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of synthetic signals (default: 0)")
+    parser.add_argument("--data-dir", default=None,
+                        help="directory where synthetic signal files are kept between runs (default: temporary)")
+    parser.add_argument("--output", default="./results/benchmarks/scaling.json",
+                        help="the .json file with results (default: ./results/benchmarks/scaling.json)")
+    parser.add_argument("--baseline", default=None, help="the .json file with results of the baseline run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="the allowed relative slowdown against the baseline (default: 0.25)")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="measurements shorter than this in the baseline are not compared (default: 0.05 s)")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.case is not None:
+        records = run_case(json.loads(arguments.case))
+        peak_rss = get_peak_rss()
+        print(json.dumps([dict(record, peak_rss=peak_rss) for record in records]))
+        return
+
+    windows = [None if window.lower() == "none" else [float(value) for value in window.split(":")]
+               for window in arguments.windows]
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = arguments.data_dir if arguments.data_dir is not None else temporary_directory
+        os.makedirs(directory, exist_ok=True)
+
+        records = []
+        for config in arguments.configs:
+            with open(config) as config_file:
+                signal_types = {scenario["signalType"] for scenarios in json.load(config_file).values()
+                                for scenario in scenarios}
+            if len(signal_types) != 1 or not signal_types <= set(SYNTHETIC_SIGNALS):
+                print("Skipped " + config + ": scenarios have to use one type of " + ", ".join(SYNTHETIC_SIGNALS),
+                      file=sys.stderr)
+                continue
+
+            signal_type = signal_types.pop()
+            for samples in arguments.lengths:
+                signal_file = get_signal_file(directory, signal_type, samples, arguments)
+                for window in windows:
+                    case = {"config": os.path.abspath(config), "signal_file": signal_file, "samples": samples,
+                            "window": window, "repeat": arguments.repeat}
+                    for record in measure_case(case, arguments.timeout):
+                        print_record(record)
+                        records.append(record)
+
+    output_directory = os.path.dirname(arguments.output)
+    if output_directory != "" and not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    with open(arguments.output, 'w') as output_file:
+        json.dump({"python": platform.python_version(), "numpy": np.__version__, "machine": platform.platform(),
+                   "records": records}, output_file, indent=4)
+    print("\nResults saved to " + arguments.output)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare_with_baseline(records, json.load(baseline_file)["records"], arguments.tolerance,
+                                                arguments.min_time)
+        if len(regressions) > 0:
+            print("\nSlower than the baseline by more than %d%%:" % round(arguments.tolerance * 100), file=sys.stderr)
+            for record, reference in regressions:
+                change = record.get("error", "%.3f s -> %.3f s" % (reference["time"], record["time"]))
+                print("  %s %s %d %s %s: %s" % (record["config"], record["scenario"], record["samples"],
+                                                record["window"], record["step"], change), file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against " + arguments.baseline)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
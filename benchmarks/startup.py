@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+    Defined variables used for the benchmark of the start of the program:
+
+    DEFERRED_MODULES ([]) : heavy modules which must not be imported together with main.py
+                            (they are imported by methods which need them)
+    IMPORT_SCRIPT (str) : the script run by a fresh interpreter - it imports main.py and prints the time of the import
+                          and deferred modules which have been imported
+"""
+
+DEFERRED_MODULES = ["pandas", "scipy.signal", "scipy.stats", "scipy.integrate", "scipy.interpolate", "scipy.linalg",
+                    "matplotlib", "biosppy", "pyarrow"]
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"time": elapsed, "imported": [name for name in %r if name in sys.modules]}))
+""" % DEFERRED_MODULES
+
+
+def measure_import(directory):
+    """Imports main.py in a fresh interpreter and returns the time of the import and imported deferred modules"""
+
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=directory, capture_output=True, text=True,
+                            check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["time"], result["imported"]
+
+
+def main(arguments):
+    """STARTUP BENCHMARK
+
+        Measures the time of importing main.py (the start of the program before the configuration file is read)
+        in fresh interpreters and checks the import budget: the median time must not exceed the budget
+        and none of DEFERRED_MODULES may be imported. The exit code is 1 if the budget is exceeded.
+        Run from the main directory of the program: py -3 -m benchmarks.startup
+
+    """
+    parser = argparse.ArgumentParser(description="Measures the start of the program and checks the import budget.")
+    parser.add_argument("--runs", type=int, default=10, help="the number of measured imports (default: 10)")
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="the largest allowed median time of the import in seconds (default: 0.5)")
+    arguments = parser.parse_args(arguments)
+
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    imported = set()
+    for _ in range(arguments.runs):
+        elapsed, run_imported = measure_import(directory)
+        times.append(elapsed)
+        imported.update(run_imported)
+
+    median = statistics.median(times)
+    print("import main: median %.3f s, min %.3f s, max %.3f s (%d runs)" % (median, min(times), max(times),
+                                                                            arguments.runs))
+    print("deferred modules imported at startup: " + (", ".join(sorted(imported)) if imported else "none"))
+
+    if median > arguments.budget or imported:
+        print("Import budget exceeded (%.3f s, no deferred modules)" % arguments.budget, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
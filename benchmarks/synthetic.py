@@ -0,0 +1,174 @@
+import numpy as np
+
+"""
+    Defined variables used for generating synthetic signals:
+
+    CHUNK_SIZE (int) : number of samples generated at once (signals are generated in chunks, so signals larger
+                       than the memory can be written to files)
+    ECG_WAVES ([]) : waves of a single heart beat as tuples (name, offset from the R peak in seconds, width in seconds,
+                     amplitude in mV) - the offset of the T wave is scaled by the square root of the R-R interval
+    RESPIRATORY_FREQUENCY (float) : frequency (Hz) of the respiratory sinus arrhythmia (high frequency HRV component)
+    MAYER_WAVE_FREQUENCY (float) : frequency (Hz) of Mayer waves (low frequency HRV component)
+    SCR_RISE_TIME (float) : time constant (seconds) of the rise of the skin conductance response
+    SCR_DECAY_TIME (float) : time constant (seconds) of the decay of the skin conductance response
+"""
+
+CHUNK_SIZE = 1000000
+ECG_WAVES = [("P", -0.2, 0.025, 0.12), ("Q", -0.03, 0.008, -0.12), ("R", 0.0, 0.01, 1.0), ("S", 0.03, 0.008, -0.25),
+             ("T", 0.3, 0.05, 0.3)]
+RESPIRATORY_FREQUENCY = 0.25
+MAYER_WAVE_FREQUENCY = 0.1
+SCR_RISE_TIME = 0.75
+SCR_DECAY_TIME = 2.0
+
+
+def get_beat_times(duration, heart_rate, hrv, generator):
+    """Returns times of R peaks (seconds) and R-R intervals of the heart beats of the synthetic ECG
+
+        Parameters
+        ----------
+        duration : float
+            The duration of the signal in seconds
+        heart_rate : float
+            The mean heart rate in beats per minute
+        hrv : float
+            The relative variability of R-R intervals - equal parts of respiratory sinus arrhythmia, Mayer waves
+            and random variability
+        generator : numpy.random.Generator
+            The generator of random numbers
+        """
+
+    mean_interval = 60.0 / heart_rate
+    beats = int(duration / mean_interval * 1.5) + 3
+    beat_times = np.arange(beats) * mean_interval
+    modulation = np.sin(2 * np.pi * RESPIRATORY_FREQUENCY * beat_times) + \
+        np.sin(2 * np.pi * MAYER_WAVE_FREQUENCY * beat_times) + generator.standard_normal(beats)
+    intervals = np.maximum(mean_interval * (1 + hrv / np.sqrt(2) * modulation), 0.3)
+    return np.cumsum(intervals) - intervals[0] / 2, intervals
+
+
+def generate_ecg(samples, sampling_rate=256, heart_rate=60, hrv=0.05, noise=0.01, seed=0, chunk_size=CHUNK_SIZE):
+    """Generates the deterministic synthetic ECG: waves of heart beats (ECG_WAVES) at R peaks with variable R-R intervals,
+        the baseline wander, the 50 Hz power line interference and the white noise.
+        Timestamps are in microseconds (like in signals/ECG_1.csv).
+
+        Parameters
+        ----------
+        samples : int
+            The number of samples of the signal
+        sampling_rate : int
+            (optional) The rate that the signal is sampled with (default is 256)
+        heart_rate : float
+            (optional) The mean heart rate in beats per minute (default is 60)
+        hrv : float
+            (optional) The relative variability of R-R intervals (default is 0.05)
+        noise : float
+            (optional) The standard deviation of the white noise in mV (default is 0.01)
+        seed : int
+            (optional) The seed of random numbers (default is 0)
+        chunk_size : int
+            (optional) The number of samples generated at once
+
+        Yields
+        ------
+        tuple
+            arrays with timestamps and values of the next chunk of the signal
+        """
+
+    generator = np.random.default_rng(seed)
+    beat_times, intervals = get_beat_times(samples / sampling_rate, heart_rate, hrv, generator)
+
+    for start in range(0, samples, chunk_size):
+        times = np.arange(start, min(start + chunk_size, samples)) / sampling_rate
+        next_beats = np.minimum(np.searchsorted(beat_times, times), len(beat_times) - 1)
+        values = 0.1 * np.sin(2 * np.pi * 0.3 * times) + 0.02 * np.sin(2 * np.pi * 50 * times) + \
+            noise * generator.standard_normal(len(times))
+        for beats in (np.maximum(next_beats - 1, 0), next_beats):
+            offsets = times - beat_times[beats]
+            for name, offset, width, amplitude in ECG_WAVES:
+                if name == "T":
+                    offset = offset * np.sqrt(intervals[beats])
+                values += amplitude * np.exp(-0.5 * ((offsets - offset) / width) ** 2)
+
+        yield times * 1e6, values
+
+
+def generate_gsr(samples, sampling_rate=128, responses_per_minute=4, response_amplitude=300, noise=5, seed=0,
+                 chunk_size=CHUNK_SIZE):
+    """Generates the deterministic synthetic raw GSR: the slowly drifting tonic level, skin conductance responses
+        (bi-exponential with SCR_RISE_TIME and SCR_DECAY_TIME) at random times and the white noise,
+        rounded to integers like readings of the converter. Timestamps are in milliseconds (like in signals/rawGSR.csv).
+
+        Parameters
+        ----------
+        samples : int
+            The number of samples of the signal
+        sampling_rate : int
+            (optional) The rate that the signal is sampled with (default is 128)
+        responses_per_minute : float
+            (optional) The mean number of skin conductance responses per minute (default is 4)
+        response_amplitude : float
+            (optional) The mean amplitude of skin conductance responses (default is 300)
+        noise : float
+            (optional) The standard deviation of the white noise (default is 5)
+        seed : int
+            (optional) The seed of random numbers (default is 0)
+        chunk_size : int
+            (optional) The number of samples generated at once
+
+        Yields
+        ------
+        tuple
+            arrays with timestamps and values of the next chunk of the signal
+        """
+
+    import scipy.signal as ss
+
+    """Each component has its own generator, so the signal does not depend on the size of chunks"""
+    impulse_generator, amplitude_generator, drift_generator, noise_generator = \
+        [np.random.default_rng(sequence) for sequence in np.random.SeedSequence(seed).spawn(4)]
+    rise = np.exp(-1.0 / (SCR_RISE_TIME * sampling_rate))
+    decay = np.exp(-1.0 / (SCR_DECAY_TIME * sampling_rate))
+    rise_state = np.zeros(1)
+    decay_state = np.zeros(1)
+    tonic_level = 35000.0
+
+    for start in range(0, samples, chunk_size):
+        length = min(start + chunk_size, samples) - start
+        times = np.arange(start, start + length) / sampling_rate
+
+        impulses = (impulse_generator.random(length) < responses_per_minute / 60.0 / sampling_rate) * \
+            amplitude_generator.exponential(response_amplitude, length)
+        decay_response, decay_state = ss.lfilter([1.0], [1.0, -decay], impulses, zi=decay_state)
+        rise_response, rise_state = ss.lfilter([1.0], [1.0, -rise], impulses, zi=rise_state)
+        phasic = (decay_response - rise_response) * SCR_DECAY_TIME / (SCR_DECAY_TIME - SCR_RISE_TIME)
+
+        tonic = tonic_level + np.cumsum(drift_generator.standard_normal(length)) * 0.05
+        tonic_level = tonic[-1]
+
+        values = np.round(tonic + phasic + noise * noise_generator.standard_normal(length))
+        yield times * 1e3, values
+
+
+def write_signal_file(path, chunks, samples):
+    """Writes chunks of the generated signal to the .npy file with timestamp (column 1) and values (column 2) columns,
+        which is read as the memory-mapped signal file (see signal_files.read_signal_columns)
+
+        Parameters
+        ----------
+        path : str
+            The path to the .npy file
+        chunks : iterable
+            Tuples with arrays of timestamps and values of the signal (see generate_ecg and generate_gsr)
+        samples : int
+            The number of samples of the signal
+        """
+
+    data = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(samples, 2))
+    start = 0
+    for timestamps, values in chunks:
+        data[start:start + len(values), 0] = timestamps
+        data[start:start + len(values), 1] = values
+        start += len(values)
+    data.flush()
+    del data
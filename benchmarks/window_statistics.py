@@ -0,0 +1,104 @@
+import argparse
+import sys
+import time
+
+# The local signal.py module shadows the standard library "signal" module, so it has to be imported before scipy
+# (the same order as in main.py).
+import signal  # noqa: F401
+import numpy as np
+
+from window_statistics import batch_statistics, rolling_statistics
+
+"""
+    Defined variables used for the benchmark of window statistics:
+
+    STATISTICS ([]) : statistics computed in both modes (names of the feature extraction methods of the Signal class)
+"""
+
+STATISTICS = ["mean", "median", "standard_deviation", "minimum", "maximum", "variance", "kurtosis", "skewness",
+              "area_under_curve"]
+
+
+def generate_signal(samples, seed=0):
+    """Generates the drifting, heavy-tailed test signal: the random walk with large steps (drift far from the mean
+        of the signal), Student's t noise with 2 degrees of freedom and rare spikes many orders of magnitude larger
+        than the noise followed by quiet parts - the case where running sums of powers cancel"""
+
+    generator = np.random.default_rng(seed)
+    drift = np.cumsum(generator.standard_normal(samples)) * 100 + 1e6
+    noise = generator.standard_t(2, samples)
+    spikes = (generator.random(samples) < 1e-4) * generator.standard_normal(samples) * 1e8
+    quiet = np.repeat(generator.random(samples // 1000 + 1) < 0.2, 1000)[:samples]
+    return np.where(quiet, drift[0], drift + noise + spikes)
+
+
+def get_relative_errors(results, reference):
+    """Returns the largest relative error of every statistic (windows where only one mode gives NaN count as errors)"""
+
+    errors = {}
+    for name in STATISTICS:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            difference = np.abs(results[name] - reference[name]) / np.maximum(np.abs(reference[name]), 1e-12)
+        mismatched_nan = np.isnan(results[name]) != np.isnan(reference[name])
+        errors[name] = np.inf if np.any(mismatched_nan) else float(np.nanmax(difference, initial=0.0))
+    return errors
+
+
+def main(arguments):
+    """WINDOW STATISTICS BENCHMARK
+
+        Compares statistics of heavily overlapping windows computed incrementally (rolling_statistics) with
+        the vectorized batch computation (batch_statistics) on the drifting, heavy-tailed signal and reports
+        the largest relative error of every statistic, the time of both modes and how many times rolling
+        statistics are faster. The exit code is 1 if any error is larger than the tolerance or rolling statistics
+        are not enough faster (with default windows they have to be faster than batch statistics).
+        Run from the main directory of the program: py -3 -m benchmarks.window_statistics
+
+    """
+    parser = argparse.ArgumentParser(description="Checks rolling window statistics against batch statistics.")
+    parser.add_argument("--samples", type=int, default=1000000, help="the number of samples (default: 1000000)")
+    parser.add_argument("--length", type=int, default=5000, help="the length of windows in samples (default: 5000)")
+    parser.add_argument("--slide", type=int, default=100, help="the slide of windows in samples (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the signal (default: 0)")
+    parser.add_argument("--tolerance", type=float, default=1e-6,
+                        help="the largest allowed relative error of rolling statistics (default: 1e-6)")
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="the required ratio of the time of batch statistics to the time of rolling statistics "
+                             "(default: 1.0)")
+    arguments = parser.parse_args(arguments)
+
+    values = generate_signal(arguments.samples, arguments.seed)
+    starts = np.arange(0, arguments.samples - arguments.length + 1, arguments.slide)
+    stops = starts + arguments.length
+
+    results = {}
+    times = {}
+    for mode, compute in [("batch", batch_statistics), ("rolling", rolling_statistics)]:
+        start = time.perf_counter()
+        results[mode] = compute(values, starts, stops, STATISTICS)
+        times[mode] = time.perf_counter() - start
+        print("%-8s %8.3f s (%d windows of %d samples)" % (mode, times[mode], len(starts), arguments.length))
+    speedup = times["batch"] / times["rolling"]
+    print("rolling is %.2f times faster than batch" % speedup)
+
+    errors = get_relative_errors(results["rolling"], results["batch"])
+    print()
+    for name, error in errors.items():
+        print("%-20s %.3g" % (name, error))
+
+    failed = False
+    inaccurate = [name for name, error in errors.items() if not error <= arguments.tolerance]
+    if len(inaccurate) > 0:
+        print("\nRolling statistics differ from batch statistics by more than %g: %s"
+              % (arguments.tolerance, ", ".join(inaccurate)), file=sys.stderr)
+        failed = True
+    if speedup < arguments.min_speedup:
+        print("\nRolling statistics are only %.2f times faster than batch statistics (required %.2f)"
+              % (speedup, arguments.min_speedup), file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
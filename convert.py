@@ -0,0 +1,25 @@
+import argparse
+import sys
+
+from signal_files import CONVERSION_FORMATS, convert_csv_file
+
+
+def main(arguments):
+    """CONVERSION SCRIPT
+
+        Converts .csv signal files to binary files placed next to them. Binary files are used instead of .csv files
+        with the same name (if they are not older), so next runs of the program do not have to parse .csv files.
+
+    """
+    parser = argparse.ArgumentParser(description="Converts .csv signal files to binary files for fast loading.")
+    parser.add_argument("csv_files", nargs="+", help="paths to .csv files with signal data")
+    parser.add_argument("--format", choices=CONVERSION_FORMATS, default="npy",
+                        help="format of the binary file (default: npy)")
+    arguments = parser.parse_args(arguments)
+
+    for csv_file in arguments.csv_files:
+        print(csv_file + " -> " + convert_csv_file(csv_file, arguments.format))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,128 @@
+from functools import lru_cache
+
+import numpy as np
+
+"""
+    Defined variables used for filtering the signal:
+
+    FILTER_MODES ([]) : available modes of applying the filter:
+                        "forward" - causal filter (the same as processing the signal sample by sample),
+                        "zeroPhase" - the filter is applied forward and backward, so the signal is not delayed
+    MAX_CACHED_DESIGNS (int) : maximal number of memoized filter designs
+"""
+
+FILTER_MODES = ["forward", "zeroPhase"]
+MAX_CACHED_DESIGNS = 256
+
+
+def get_butterworth_design(attr):
+    """Returns the Butterworth filter described by attributes of the butterworth_filter method
+        as second-order sections (see design_butterworth)
+
+        Parameters
+        ----------
+        attr : {}
+            The dictionary with "filterOrder", "samplingRate", "type" and "cutOfFrequencies" attributes
+
+        Returns
+        -------
+        numpy.ndarray
+            second-order sections of the filter (shared by all callers - it must not be modified)
+        """
+
+    cut_of_freq = attr["cutOfFrequencies"]
+    if isinstance(cut_of_freq, list):
+        cut_of_freq = tuple(float(frequency) for frequency in cut_of_freq)
+    else:
+        cut_of_freq = float(cut_of_freq)
+
+    return design_butterworth(int(attr["filterOrder"]), cut_of_freq, attr["type"], float(attr["samplingRate"]))
+
+
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def design_butterworth(order, cut_of_freq, filter_type, sampling_rate):
+    """Designs the Butterworth digital filter as second-order sections, which stay numerically stable also for high
+        orders of bandpass and bandstop filters. Designs are memoized, so the same filter used by many scenarios
+        or applied to many recordings is designed only once in the process.
+
+        Parameters
+        ----------
+        order : int
+            The order of the filter
+        cut_of_freq : float | tuple
+            The cut of frequency (lowpass, highpass) or a tuple with two cut of frequencies (bandpass, bandstop) in Hz
+        filter_type : str
+            The type of the filter: 'lowpass', 'highpass', 'bandpass' or 'bandstop'
+        sampling_rate : float
+            The rate that the signal has been sampled with
+
+        Returns
+        -------
+        numpy.ndarray
+            second-order sections of the filter (shared by all callers - it must not be modified)
+        """
+
+    import scipy.signal as ss
+
+    nyquist_freq = 0.5 * sampling_rate
+
+    """Normalization of frequency values by the Nyquist frequency f = f / fn"""
+    if isinstance(cut_of_freq, tuple):
+        cut_of_freq = [frequency / nyquist_freq for frequency in cut_of_freq]
+    else:
+        cut_of_freq = cut_of_freq / nyquist_freq
+
+    return ss.butter(order, cut_of_freq, btype=filter_type, analog=False, output='sos')
+
+
+def apply_filter(sos, values, mode="forward"):
+    """Applies the filter given as second-order sections to values
+
+        Parameters
+        ----------
+        sos : numpy.ndarray
+            Second-order sections of the filter
+        values : numpy.ndarray
+            Values of the signal
+        mode : str
+            (optional) The mode of applying the filter (one of FILTER_MODES) - default is "forward"
+
+        Returns
+        -------
+        numpy.ndarray
+            filtered values
+        """
+
+    import scipy.signal as ss
+
+    if mode == "forward":
+        return ss.sosfilt(sos, values)
+    if mode == "zeroPhase":
+        return ss.sosfiltfilt(sos, values)
+
+    raise ValueError("Unknown mode of the filter: " + str(mode))
+
+
+def get_initial_state(sos):
+    """Returns the state of the filter before the first sample of the signal (zeros, like in apply_filter).
+        The state returned by scipy.signal.sosfilt(sos, values, zi=state) is carried to the next chunk of the signal."""
+
+    return np.zeros((sos.shape[0], 2))
+
+
+def get_settling_length(sos, precision):
+    """Returns the number of samples after which the response of the filter to a single sample
+        falls below the given fraction of its size (estimated from the largest pole of the filter)
+
+        Parameters
+        ----------
+        sos : numpy.ndarray
+            Second-order sections of the filter
+        precision : float
+            The relative size of the response which is neglected
+        """
+
+    import scipy.signal as ss
+
+    poles_radius = np.max(np.abs(ss.sos2zpk(sos)[1]))
+    return int(np.ceil(np.log(precision) / np.log(poles_radius)))
@@ -0,0 +1,284 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+"""
+    Defined variables used for computing heart rate variability (HRV) features:
+
+    FREQUENCY_BANDS ({}) : frequency bands of the power spectral density in Hz (both boundaries included)
+    RESAMPLING_FREQUENCY (int) : frequency in Hz with which the series of R-R intervals is interpolated before
+                                 the power spectral density is estimated
+    WELCH_NFFT (int) : length of the FFT used by the Welch's method
+    WELCH_SHORT_SERIES (int) : duration of the series of R-R intervals in ms below which the whole series is one
+                               segment of the Welch's method (otherwise segments have 300 samples)
+    MIN_PARALLEL_WINDOWS (int) : minimal number of windows for which power spectral densities of windows
+                                 are computed on a pool of worker processes
+"""
+
+FREQUENCY_BANDS = {"vlf": (0.0, 0.04), "lf": (0.04, 0.15), "hf": (0.15, 0.4)}
+RESAMPLING_FREQUENCY = 4
+WELCH_NFFT = 2 ** 12
+WELCH_SHORT_SERIES = 300000
+MIN_PARALLEL_WINDOWS = 64
+
+_window_jobs = 1
+
+
+def set_window_jobs(jobs):
+    """Sets the number of worker processes used for computing power spectral densities of windows
+        (see windowed_frequency_domain_parameters)"""
+
+    global _window_jobs
+    _window_jobs = max(int(jobs), 1)
+
+
+def time_domain_parameters(rr_intervals):
+    """Computes mean, standard deviation (SDNN), heart rate and RMSSD of R-R intervals
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+
+        Returns
+        -------
+        dict
+            "mean" and "sd" of R-R intervals in seconds, "hr" - heart rate in beats per minute and
+            "rmssd" - root mean square of successive differences of R-R intervals in seconds
+            (NaN if there are not enough intervals)
+        """
+
+    rr_intervals = np.asarray(rr_intervals, dtype=float)
+    results = {"mean": np.nan, "sd": np.nan, "hr": np.nan, "rmssd": np.nan}
+    if len(rr_intervals) > 0:
+        results["mean"] = np.mean(rr_intervals)
+        results["hr"] = 60 / results["mean"]
+    if len(rr_intervals) > 1:
+        results["sd"] = np.std(rr_intervals, ddof=1)
+        results["rmssd"] = np.sqrt(np.mean(np.square(np.diff(rr_intervals))))
+
+    return results
+
+
+def poincare_parameters(rr_intervals):
+    """Computes SD1 and SD2 of the Poincaré plot (each R-R interval against the next one) without creating the plot
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+
+        Returns
+        -------
+        dict
+            "sd1" - standard deviation perpendicular to the line of identity and "sd2" - standard deviation along
+            the line of identity, both in milliseconds (NaN if there are not enough intervals)
+        """
+
+    rr_intervals = np.asarray(rr_intervals, dtype=float) * 1000
+    if len(rr_intervals) < 2:
+        return {"sd1": np.nan, "sd2": np.nan}
+
+    current_intervals = rr_intervals[:-1]
+    next_intervals = rr_intervals[1:]
+    return {"sd1": np.std((current_intervals - next_intervals) / np.sqrt(2)),
+            "sd2": np.std((current_intervals + next_intervals) / np.sqrt(2))}
+
+
+def frequency_domain_parameters(rr_intervals):
+    """Computes powers of low (LF) and high (HF) frequency bands of the power spectral density of R-R intervals,
+        their normalized values and LF/HF ratio. The series of R-R intervals is interpolated with the cubic spline
+        at RESAMPLING_FREQUENCY, its mean is subtracted and the density is estimated with the Welch's method
+        (Hamming window), the same way as pyhrv.frequency_domain.welch_psd does - but no plot is created.
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+
+        Returns
+        -------
+        dict
+            "lf" and "hf" - absolute powers in ms^2, "lf_norm" and "hf_norm" - normalized powers in percents
+            and "lf_hf" - the ratio of LF and HF powers (NaN if there are not enough intervals)
+        """
+
+    import scipy.signal as ss
+    from scipy.interpolate import make_interp_spline
+
+    results = {"lf": np.nan, "hf": np.nan, "lf_norm": np.nan, "hf_norm": np.nan, "lf_hf": np.nan}
+    rr_intervals = np.asarray(rr_intervals, dtype=float) * 1000
+    if len(rr_intervals) < 4:
+        return results
+
+    times = np.cumsum(rr_intervals)
+    times -= times[0]
+    interpolated_times = np.arange(times[0], times[-1], 1000. / RESAMPLING_FREQUENCY)
+    if len(interpolated_times) < 2:
+        return results
+    interpolated_intervals = make_interp_spline(times, rr_intervals, k=3)(interpolated_times)
+    interpolated_intervals -= np.mean(interpolated_intervals)
+
+    segment_length = WELCH_NFFT if times[-1] < WELCH_SHORT_SERIES else 300
+    frequencies, powers = ss.welch(interpolated_intervals, fs=RESAMPLING_FREQUENCY, window='hamming',
+                                   nperseg=min(segment_length, len(interpolated_intervals)), nfft=WELCH_NFFT,
+                                   scaling='density')
+
+    resolution = frequencies[1] - frequencies[0]
+    band_powers = {}
+    for band, (low, high) in FREQUENCY_BANDS.items():
+        band_powers[band] = np.sum(powers[(low <= frequencies) & (frequencies <= high)]) * resolution
+
+    results["lf"] = band_powers["lf"]
+    results["hf"] = band_powers["hf"]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results["lf_norm"] = 100 * band_powers["lf"] / (band_powers["lf"] + band_powers["hf"])
+        results["hf_norm"] = 100 * band_powers["hf"] / (band_powers["lf"] + band_powers["hf"])
+        results["lf_hf"] = np.float64(band_powers["lf"]) / band_powers["hf"]
+
+    return results
+
+
+def windowed_time_domain_parameters(rr_intervals, first_intervals, stop_intervals):
+    """Computes time domain parameters (see time_domain_parameters) of many windows of R-R intervals at once.
+        Sums of intervals, their squares and squared successive differences are accumulated once with cumulative sums,
+        so parameters of every window are obtained from differences of sums at its boundaries - the cost does not
+        depend on the length or the overlap of windows.
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+        first_intervals : numpy.ndarray
+            Index of the first R-R interval of each window
+        stop_intervals : numpy.ndarray
+            Index one past the last R-R interval of each window
+
+        Returns
+        -------
+        dict
+            the same keys as time_domain_parameters, values are arrays with the parameter of every window
+        """
+
+    rr_intervals, counts = _as_windows(rr_intervals, first_intervals, stop_intervals)
+    reference = np.mean(rr_intervals) if len(rr_intervals) > 0 else 0.
+
+    """Sums are computed from intervals shifted by their mean, so the variance does not lose precision"""
+    sums = _window_sums(rr_intervals - reference, first_intervals, stop_intervals)
+    square_sums = _window_sums(np.square(rr_intervals - reference), first_intervals, stop_intervals)
+    difference_square_sums = _window_sums(np.square(np.diff(rr_intervals)), first_intervals,
+                                          np.maximum(stop_intervals - 1, first_intervals))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(counts > 0, reference + sums / counts, np.nan)
+        variances = np.maximum(square_sums - np.square(sums) / counts, 0) / (counts - 1)
+        return {"mean": means,
+                "sd": np.where(counts > 1, np.sqrt(variances), np.nan),
+                "hr": 60 / means,
+                "rmssd": np.where(counts > 1, np.sqrt(difference_square_sums / (counts - 1)), np.nan)}
+
+
+def windowed_poincare_parameters(rr_intervals, first_intervals, stop_intervals):
+    """Computes SD1 and SD2 (see poincare_parameters) of many windows of R-R intervals at once
+        with cumulative sums of differences and sums of successive intervals (see windowed_time_domain_parameters)
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+        first_intervals : numpy.ndarray
+            Index of the first R-R interval of each window
+        stop_intervals : numpy.ndarray
+            Index one past the last R-R interval of each window
+
+        Returns
+        -------
+        dict
+            the same keys as poincare_parameters, values are arrays with the parameter of every window
+        """
+
+    rr_intervals, counts = _as_windows(rr_intervals, first_intervals, stop_intervals)
+    rr_intervals = rr_intervals * 1000
+    reference = np.mean(rr_intervals) if len(rr_intervals) > 0 else 0.
+    stop_pairs = np.maximum(stop_intervals - 1, first_intervals)
+
+    results = {}
+    for key, pairs in (("sd1", (rr_intervals[:-1] - rr_intervals[1:]) / np.sqrt(2)),
+                       ("sd2", (rr_intervals[:-1] + rr_intervals[1:] - 2 * reference) / np.sqrt(2))):
+        sums = _window_sums(pairs, first_intervals, stop_pairs)
+        square_sums = _window_sums(np.square(pairs), first_intervals, stop_pairs)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variances = np.maximum(square_sums / (counts - 1) - np.square(sums / (counts - 1)), 0)
+        results[key] = np.where(counts > 1, np.sqrt(variances), np.nan)
+
+    return results
+
+
+def windowed_frequency_domain_parameters(rr_intervals, first_intervals, stop_intervals):
+    """Computes frequency domain parameters (see frequency_domain_parameters) of many windows of R-R intervals.
+        Every window needs its own interpolation and power spectral density, so with more than MIN_PARALLEL_WINDOWS
+        windows they are divided between worker processes (the number is set with set_window_jobs).
+
+        Parameters
+        ----------
+        rr_intervals : numpy.ndarray
+            Distances between consecutive R peaks in seconds
+        first_intervals : numpy.ndarray
+            Index of the first R-R interval of each window
+        stop_intervals : numpy.ndarray
+            Index one past the last R-R interval of each window
+
+        Returns
+        -------
+        dict
+            the same keys as frequency_domain_parameters, values are arrays with the parameter of every window
+        """
+
+    rr_intervals, _ = _as_windows(rr_intervals, first_intervals, stop_intervals)
+    jobs = min(_window_jobs, len(first_intervals) // MIN_PARALLEL_WINDOWS)
+    if jobs <= 1:
+        return _frequency_domain_windows(rr_intervals, first_intervals, stop_intervals)
+
+    """Each worker gets a contiguous part of windows with only R-R intervals of these windows"""
+    parts = np.array_split(np.arange(len(first_intervals)), jobs)
+    tasks = []
+    for part in parts:
+        offset = first_intervals[part].min()
+        tasks.append((rr_intervals[offset:stop_intervals[part].max()], first_intervals[part] - offset,
+                      stop_intervals[part] - offset))
+
+    # Workers are forked where possible - the local signal.py module shadows the standard library "signal" module,
+    # so starting a fresh interpreter for every worker is not safe.
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+        part_results = list(executor.map(_frequency_domain_windows, *zip(*tasks)))
+
+    return {key: np.concatenate([part_result[key] for part_result in part_results]) for key in part_results[0]}
+
+
+def _frequency_domain_windows(rr_intervals, first_intervals, stop_intervals):
+    """Computes frequency domain parameters of windows one by one"""
+
+    results = [frequency_domain_parameters(rr_intervals[first:stop])
+               for first, stop in zip(first_intervals, stop_intervals)]
+    return {key: np.array([result[key] for result in results], dtype=float)
+            for key in ("lf", "hf", "lf_norm", "hf_norm", "lf_hf")}
+
+
+def _as_windows(rr_intervals, first_intervals, stop_intervals):
+    """Returns R-R intervals as a float array and the number of R-R intervals of every window"""
+
+    return np.asarray(rr_intervals, dtype=float), np.asarray(stop_intervals) - np.asarray(first_intervals)
+
+
+def _window_sums(values, first_indexes, stop_indexes):
+    """Returns sums of values[first:stop] for every window from the cumulative sum of values
+        (indexes past the end of values are treated like in slicing)"""
+
+    cumulative_sums = np.concatenate(([0.], np.cumsum(values)))
+    return (cumulative_sums[np.minimum(stop_indexes, len(values))]
+            - cumulative_sums[np.minimum(first_indexes, len(values))])
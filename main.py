@@ -1,7 +1,22 @@
+import argparse
+import copy
+import csv
+import glob
 import json
+import multiprocessing
+import os
+import socket
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
+import numpy as np
+
+from hrv import set_window_jobs
+from result_files import ResultWriter, get_output_format, write_result_file
 from scenario import Scenario
+from signal_files import get_signal_file_path
+from signal_cache import SignalCache
 
 """ 
     Defined variables used for distinguishing values obtained from JSON tuple:
@@ -58,31 +73,706 @@ def convert_json_to_object_list(json_tup_scenarios_list):
 
     scenarios = []
     for scenario in json_tup_scenarios_list:
-        scenario_object = Scenario(scenario[SCENARIO_NAME],
-                                   scenario[DICTIONARY]["signalFileName"],
-                                   scenario[DICTIONARY]["signalType"],
-                                   scenario[DICTIONARY]["methods"],
-                                   scenario[DICTIONARY]["columns_to_read"],
-                                   options=scenario[DICTIONARY].get("options", None),
-                                   windowing_attr=scenario[DICTIONARY].get("windowing", None))
-
-        scenarios.append(scenario_object)
+        scenarios.append(create_scenario(scenario))
     return scenarios
 
 
-def process_scenarios(scenarios):
-    """Runs all scenarios
+def create_scenario(json_tup_scenario, load_signal=True):
+    """Creates Scenario object from the tuple obtained from loading a json configuration file
 
         Parameters
         ----------
-        scenarios : []
-            The list of Scenario's objects which should be run (all flow scenarios)
+        json_tup_scenario : ()
+            The tuple, where the first element is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        load_signal : bool
+            (optional) If set to False, the signal file is not loaded and processed_signal of the Scenario is None
+
+        Returns
+        -------
+        Scenario
+            Scenario object filled with data obtained from JSON configuration file
+        """
+
+    return Scenario(json_tup_scenario[SCENARIO_NAME],
+                    json_tup_scenario[DICTIONARY]["signalFileName"],
+                    json_tup_scenario[DICTIONARY]["signalType"],
+                    json_tup_scenario[DICTIONARY]["methods"],
+                    json_tup_scenario[DICTIONARY]["columns_to_read"],
+                    options=json_tup_scenario[DICTIONARY].get("options", None),
+                    windowing_attr=json_tup_scenario[DICTIONARY].get("windowing", None),
+                    load_signal=load_signal)
+
+
+def group_scenarios_by_signal(json_tup_scenarios_list):
+    """Groups scenarios which read the same columns of the same signal file as the same type of signal
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+
+        Returns
+        -------
+        list
+            a list of groups (lists of tuples with scenarios) in the order of the first scenario of each group
+        """
+
+    groups = {}
+    for scenario in json_tup_scenarios_list:
+        key = json.dumps([scenario[DICTIONARY]["signalFileName"],
+                          scenario[DICTIONARY]["signalType"],
+                          scenario[DICTIONARY]["columns_to_read"]], sort_keys=True)
+        groups.setdefault(key, []).append(scenario)
+
+    return list(groups.values())
+
+
+def enable_profiling(json_tup_scenarios_list, profile_step=None):
+    """Enables the "profile" option of all scenarios (see profiling.StepProfiler)
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        profile_step : str
+            (optional) The order or the name of the method whose step is run under cProfile
+
+        Returns
+        -------
+        list
+            the list of tuples with scenarios whose options enable profiling
+        """
+
+    profiled_scenarios = []
+    for scenario in json_tup_scenarios_list:
+        options = dict(scenario[DICTIONARY].get("options") or {}, profile="True")
+        if profile_step is not None:
+            options["profile_step"] = profile_step
+        profiled_scenarios.append((scenario[SCENARIO_NAME], dict(scenario[DICTIONARY], options=options)))
+    return profiled_scenarios
+
+
+def process_scenario_group(json_tup_scenarios_group, cache=None, finished=None):
+    """Processes a group of scenarios which use the same signal (see group_scenarios_by_signal).
+        The signal file is loaded at most once and processing steps which are common for the beginning of many scenarios
+        are run only once (see process_shared_steps). If the cache is given, scenarios resume from the longest
+        prefix of their processing steps whose result is stored in the cache.
+
+        Parameters
+        ----------
+        json_tup_scenarios_group : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+        finished : callable
+            (optional) The function called with each scenario as soon as all its steps are processed
+            (its signal is not changed afterwards)
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (Scenario, exception) in the order of the group, where exception is None
+            if the scenario succeeded
+        """
+
+    scenarios = [create_scenario(json_tup_scenario, load_signal=False) for json_tup_scenario in json_tup_scenarios_group]
+
+    steps = {}
+    for scenario in scenarios:
+        scenario.sort_methods_by_order()
+        steps[scenario.scenario_name] = scenario.get_processing_steps()
+
+    loaded_signal = []
+
+    def load_signal():
+        if len(loaded_signal) == 0:
+            loaded_signal.append(scenarios[0].create_signal(scenarios[0].signal_file_name))
+        return loaded_signal[0]
+
+    errors = {}
+    process_shared_steps(scenarios, load_signal, 0, steps, errors, cache, finished)
+
+    return [(scenario, errors.get(scenario.scenario_name)) for scenario in scenarios]
 
+
+def process_shared_steps(scenarios, load_signal, step_index, steps, errors, cache=None, finished=None):
+    """Runs the processing step once for all scenarios which have the same step at this position and share the signal.
+        Scenarios are divided into branches by their next step - each branch runs the step once and continues
+        with the next steps recursively. Signal is copied only where scenarios diverge, the last branch continues
+        with the original signal state. If the cache is given, a branch restores the longest cached prefix
+        of its common steps instead of running them, and the results of signal processing steps are stored in the cache.
+
+        Parameters
+        ----------
+        scenarios : []
+            The list of Scenario objects which share the signal state
+        load_signal : callable
+            The function which returns the signal state after running first step_index steps
+            (it is called only if some branch has to run the step)
+        step_index : int
+            The index of the step which should be run
+        steps : dict
+            The dictionary where the key is the scenario name and the value is the list of its processing steps
+        errors : dict
+            The dictionary where exceptions of failed scenarios are saved (the key is the scenario name)
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+        finished : callable
+            (optional) The function called with each scenario as soon as all its steps are processed
         """
 
+    branches = {}
     for scenario in scenarios:
-        scenario.process_methods()
-        scenario.save_results()
+        if step_index >= len(steps[scenario.scenario_name]):
+            key = "finished " + scenario.scenario_name
+        else:
+            key = get_step_key(scenario, steps[scenario.scenario_name][step_index])
+        branches.setdefault(key, []).append(scenario)
+
+    for branch_index, branch in enumerate(branches.values()):
+        leader = branch[0]
+        try:
+            next_step_index = step_index
+            if cache is not None:
+                next_step_index = restore_cached_prefix(branch, step_index, steps, cache)
+
+            if next_step_index == step_index:
+                if branch_index == len(branches) - 1:
+                    branch_signal = load_signal()
+                else:
+                    branch_signal = copy.deepcopy(load_signal())
+                leader.processed_signal = branch_signal
+                branch_signal.windowing_attributes = leader.windowing_attributes
+                if step_index >= len(steps[leader.scenario_name]):
+                    if finished is not None:
+                        finished(leader)
+                    continue
+
+                """The key is computed before the step runs - the step must not change the attributes it is based on"""
+                cache_key = None
+                if cache is not None and is_cacheable_prefix(leader, steps[leader.scenario_name][:step_index + 1]):
+                    cache_key = get_cache_key(leader, steps[leader.scenario_name][:step_index + 1], cache)
+
+                measured_steps = 0 if leader.profiler is None else len(leader.profiler.measurements)
+                leader.process_step(steps[leader.scenario_name][step_index])
+                next_step_index = step_index + 1
+                if leader.profiler is not None:
+                    for scenario in branch[1:]:
+                        if scenario.profiler is not None:
+                            scenario.profiler.add_shared_measurements(leader.profiler.measurements[measured_steps:],
+                                                                      leader.scenario_name)
+                if cache_key is not None:
+                    cache.save(cache_key, branch_signal)
+        except Exception as error:
+            for scenario in branch:
+                errors[scenario.scenario_name] = error
+            continue
+
+        for scenario in branch[1:]:
+            for step in steps[scenario.scenario_name][step_index:next_step_index]:
+                scenario.record_step(step)
+        process_shared_steps(branch, lambda signal=leader.processed_signal: signal, next_step_index, steps, errors, cache,
+                             finished)
+
+
+def restore_cached_prefix(scenarios, step_index, steps, cache):
+    """Restores the longest cached prefix of processing steps which are common for all scenarios
+        and consist only of signal processing methods.
+
+        Parameters
+        ----------
+        scenarios : []
+            The list of Scenario objects which share the signal state after running first step_index steps
+        step_index : int
+            The number of steps already run
+        steps : dict
+            The dictionary where the key is the scenario name and the value is the list of its processing steps
+        cache : SignalCache
+            The cache of intermediate signal states
+
+        Returns
+        -------
+        int
+            the number of steps run after restoring the prefix (step_index if nothing was restored)
+        """
+
+    leader = scenarios[0]
+    leader_steps = steps[leader.scenario_name]
+    common_length = step_index
+    while common_length < len(leader_steps) and is_cacheable_prefix(leader, leader_steps[:common_length + 1]) and \
+            all(common_length < len(steps[scenario.scenario_name]) and
+                get_step_key(scenario, steps[scenario.scenario_name][common_length]) ==
+                get_step_key(leader, leader_steps[common_length]) for scenario in scenarios):
+        common_length += 1
+
+    for prefix_length in range(common_length, step_index, -1):
+        key = get_cache_key(leader, leader_steps[:prefix_length], cache)
+        if cache.contains(key):
+            signal = leader.create_signal(None)
+            if cache.load(key, signal):
+                leader.processed_signal = signal
+                for step in leader_steps[step_index:prefix_length]:
+                    leader.record_step(step)
+                return prefix_length
+
+    return step_index
+
+
+def is_cacheable_prefix(scenario, prefix_steps):
+    """Checks whether the result of processing steps can be stored in the cache - all steps have to consist
+        only of signal processing methods (they do not extract features)"""
+
+    signal_processing_methods = scenario.get_signal_class().signal_processing_methods
+    return all(method["functionName"] in signal_processing_methods for step in prefix_steps for method in step)
+
+
+def get_cache_key(scenario, prefix_steps, cache):
+    """Returns the key of the signal state of the scenario after running the prefix of its processing steps"""
+
+    return cache.get_key(get_signal_file_path(scenario.signal_file_name), scenario.signal_type, scenario.columns,
+                         [get_step_key(scenario, step) for step in prefix_steps])
+
+
+def get_step_key(scenario, step):
+    """Creates the key which identifies the result of the processing step.
+        Steps which extract features depend also on the windowing and the feature mode of the scenario.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario which runs the step
+        step : list
+            The list of methods of the processing step
+
+        Returns
+        -------
+        str
+            the key of the step
+        """
+
+    methods = [[method["functionName"], method.get("attributes"), method.get("outputLabel")] for method in step]
+    signal_processing_methods = scenario.get_signal_class().signal_processing_methods
+    if all(method["functionName"] in signal_processing_methods for method in step):
+        return json.dumps(methods, sort_keys=True)
+
+    return json.dumps([methods, scenario.windowing_attributes, scenario.get_feature_mode()], sort_keys=True)
+
+
+def run_scenario_group(json_tup_scenarios_group, cache=None, writer=None):
+    """Processes a group of scenarios which use the same signal and saves their results.
+        It is run in worker processes of the parallel execution - the Scenario objects are built inside the worker,
+        so the signal data is never sent between processes. Results of each scenario are saved by the ResultWriter
+        in the background as soon as the scenario is processed, while the next scenarios are processed.
+
+        Parameters
+        ----------
+        json_tup_scenarios_group : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+        writer : ResultWriter
+            (optional) The writer shared with other groups - errors of writing are not included in the returned
+            list (they are collected by the writer). If it is not given, the group uses its own writer.
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (Scenario | None, exception) in the order of the group, where Scenario is returned only
+            if its signal should be plotted and exception is None if the scenario succeeded
+        """
+
+    if writer is None:
+        with ResultWriter() as group_writer:
+            results = run_scenario_group(json_tup_scenarios_group, cache, group_writer)
+        return apply_write_errors(json_tup_scenarios_group, results, group_writer.errors)
+
+    results = []
+    for scenario, error in process_scenario_group(json_tup_scenarios_group, cache, writer.submit):
+        if error is None and scenario.is_option_enabled("draw_plot"):
+            results.append((scenario, None))
+        else:
+            results.append((None, error))
+
+    return results
+
+
+def apply_write_errors(json_tup_scenarios_group, results, write_errors):
+    """Replaces results of scenarios whose results could not be saved with errors of writing
+
+        Parameters
+        ----------
+        json_tup_scenarios_group : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        results : []
+            The list of tuples (Scenario | None, exception) in the order of the group (see run_scenario_group)
+        write_errors : dict
+            Exceptions raised while saving results (the key is the scenario name)
+
+        Returns
+        -------
+        list of tuples
+            the list of tuples (Scenario | None, exception) in the order of the group
+        """
+
+    return [(None, write_errors[scenario[SCENARIO_NAME]]) if scenario[SCENARIO_NAME] in write_errors else result
+            for scenario, result in zip(json_tup_scenarios_group, results)]
+
+
+def run_scenarios(json_tup_scenarios_list, jobs=1, cache=None):
+    """Runs all scenarios. Scenarios which use the same signal are processed together, so the signal is loaded once
+        and common processing steps are run once. With more than one job, groups of scenarios are processed
+        in parallel on a pool of worker processes. Results are saved in the background (see ResultWriter)
+        while next scenarios are processed.
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        jobs : int
+            The number of worker processes
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+
+        Returns
+        -------
+        tuple
+            a list of processed Scenario objects whose signals should be plotted and a list of tuples
+            (scenario name, exception) with errors of failed scenarios - both in the order of the configuration file
+        """
+
+    groups = group_scenarios_by_signal(json_tup_scenarios_list)
+    if jobs > 1:
+        group_results = run_in_pool(run_scenario_group, [(group, cache) for group in groups], jobs)
+    else:
+        """One writer for all groups - results of a group are written while the next group is processed"""
+        with ResultWriter() as writer:
+            group_results = [(run_scenario_group(group, cache, writer), None) for group in groups]
+        group_results = [(apply_write_errors(group, group_result, writer.errors), None)
+                         for group, (group_result, _) in zip(groups, group_results)]
+
+    results = {}
+    for group, (group_result, group_error) in zip(groups, group_results):
+        if group_error is not None:
+            group_result = [(None, group_error) for _ in group]
+        for scenario, result in zip(group, group_result):
+            results[scenario[SCENARIO_NAME]] = result
+
+    scenarios = []
+    errors = []
+    for json_tup_scenario in json_tup_scenarios_list:
+        scenario, error = results[json_tup_scenario[SCENARIO_NAME]]
+        if error is not None:
+            errors.append((json_tup_scenario[SCENARIO_NAME], error))
+        elif scenario is not None:
+            scenarios.append(scenario)
+
+    return scenarios, errors
+
+
+def run_in_pool(function, tasks, jobs):
+    """Runs the function for all tasks on a pool of worker processes
+
+        Parameters
+        ----------
+        function : callable
+            The module-level function to run
+        tasks : []
+            The list of tuples with arguments of the function
+        jobs : int
+            The number of worker processes
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (result, exception) in the order of tasks, where exception is None if the task succeeded
+        """
+
+    # Workers are forked where possible - the local signal.py module shadows the standard library "signal" module,
+    # so starting a fresh interpreter for every worker is not safe.
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+
+    # Processes which are not needed for tasks are shared by workers for computing HRV features of windows.
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=set_window_jobs,
+                             initargs=(jobs // max(len(tasks), 1),)) as executor:
+        futures = [executor.submit(function, *task) for task in tasks]
+
+    return [(None, future.exception()) if future.exception() is not None else (future.result(), None)
+            for future in futures]
+
+
+def run_scenario_stream(json_tup_scenario, chunk_size):
+    """Processes the scenario in the streaming mode - the signal file is read and processed in chunks
+        and results are written while processing (see Scenario.process_stream)
+
+        Parameters
+        ----------
+        json_tup_scenario : ()
+            The tuple, where the first element is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        chunk_size : int
+            The maximal number of samples read from the signal file at once
+        """
+
+    create_scenario(json_tup_scenario, load_signal=False).process_stream(chunk_size)
+
+
+def stream_scenarios(json_tup_scenarios_list, chunk_size, jobs=1):
+    """Runs all scenarios in the streaming mode. With more than one job, scenarios are processed in parallel
+        on a pool of worker processes.
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        chunk_size : int
+            The maximal number of samples read from the signal file at once
+        jobs : int
+            The number of worker processes
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (scenario name, exception) with errors of failed scenarios
+        """
+
+    tasks = [(json_tup_scenario, chunk_size) for json_tup_scenario in json_tup_scenarios_list]
+    if jobs > 1:
+        results = run_in_pool(run_scenario_stream, tasks, jobs)
+    else:
+        results = []
+        for task in tasks:
+            try:
+                results.append((run_scenario_stream(*task), None))
+            except Exception as error:
+                results.append((None, error))
+
+    return [(json_tup_scenario[SCENARIO_NAME], error)
+            for json_tup_scenario, (_, error) in zip(json_tup_scenarios_list, results) if error is not None]
+
+
+def process_live_stream(json_tup_scenarios_list, input_file, output_file):
+    """Runs all scenarios in the real-time streaming mode on samples read from the input as they arrive.
+        Each line of the input is one sample with comma-separated columns - every scenario reads its "timestamp"
+        and "values" columns (see "columns_to_read"); the first line is skipped if it is a header. Other lines
+        which are not numbers or miss columns of a scenario are skipped (by that scenario) and reported
+        on the standard error output with their line numbers, so a single bad line does not end the session.
+        Features of every window are written to the output as soon as the window is complete: first the row with
+        "Scenario" and names of features of each scenario and then rows with the name of the scenario and features.
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        input_file : file
+            The text file (e.g. standard input or socket) with samples
+        output_file : file
+            The text file (e.g. standard output) where rows of features are written
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (scenario name, exception) with errors of failed scenarios
+        """
+
+    csv_writer = csv.writer(output_file)
+    errors = []
+    scenarios = []
+    for json_tup_scenario in json_tup_scenarios_list:
+        try:
+            scenario = create_scenario(json_tup_scenario, load_signal=False)
+            csv_writer.writerow(["Scenario"] + scenario.start_stream())
+            scenarios.append(scenario)
+        except Exception as error:
+            errors.append((json_tup_scenario[SCENARIO_NAME], error))
+    output_file.flush()
+
+    def write_rows(scenario, function, *arguments):
+        try:
+            for row in function(*arguments):
+                csv_writer.writerow([scenario.scenario_name] + row)
+        except Exception as error:
+            errors.append((scenario.scenario_name, error))
+            scenarios.remove(scenario)
+
+    for line_number, sample in enumerate(csv.reader(input_file), 1):
+        if len(sample) == 0:
+            continue
+        try:
+            sample = [float(column) for column in sample]
+        except ValueError as error:
+            if line_number > 1:
+                print("Line " + str(line_number) + " skipped: " + repr(error), file=sys.stderr)
+            continue
+        for scenario in list(scenarios):
+            try:
+                timestamp = sample[scenario.columns["timestamp"] - 1]
+                value = sample[scenario.columns["values"] - 1]
+            except IndexError:
+                print("Line " + str(line_number) + " skipped by scenario " + scenario.scenario_name + ": "
+                      + str(len(sample)) + " columns", file=sys.stderr)
+                continue
+            write_rows(scenario, scenario.push, [timestamp], [value])
+        output_file.flush()
+
+    for scenario in list(scenarios):
+        write_rows(scenario, scenario.finish_stream)
+    output_file.flush()
+
+    return errors
+
+
+def open_stream_input(source):
+    """Opens the input of the real-time streaming mode
+
+        Parameters
+        ----------
+        source : str
+            "-" for the standard input or "HOST:PORT" of the local socket - the program listens on it
+            and reads samples from the first connected client until it disconnects
+
+        Returns
+        -------
+        file
+            the text file with samples
+        """
+
+    if source == "-":
+        return sys.stdin
+
+    host, port = source.rsplit(":", 1)
+    with socket.create_server((host, int(port))) as server:
+        connection, _ = server.accept()
+    return connection.makefile('r')
+
+
+def extract_file_features(json_tup_scenarios_list, signal_file, cache=None):
+    """Runs all scenarios on the given signal file without saving the results - used by the batch mode
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        signal_file : str
+            The path to the file with signal data which replaces "signalFileName" of every scenario
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+
+        Returns
+        -------
+        dict
+            a dictionary where the key is the scenario name and the value is a tuple (result, exception), where
+            result is a tuple with rows of the header of the features file and the list of extracted features
+            [[name of the feature, values]] and exception is None if the scenario succeeded
+        """
+
+    file_scenarios = [(scenario[SCENARIO_NAME], dict(scenario[DICTIONARY], signalFileName=signal_file))
+                      for scenario in json_tup_scenarios_list]
+
+    results = {}
+    for group in group_scenarios_by_signal(file_scenarios):
+        for json_tup_scenario, (scenario, error) in zip(group, process_scenario_group(group, cache)):
+            if error is not None:
+                results[json_tup_scenario[SCENARIO_NAME]] = (None, error)
+            else:
+                results[json_tup_scenario[SCENARIO_NAME]] = \
+                    ((scenario.get_csv_header(), scenario.processed_signal.features), None)
+
+    return results
+
+
+def process_batch(json_tup_scenarios_list, signal_files, jobs, cache=None):
+    """Runs every scenario on every signal file and saves one merged .csv file with features for each scenario.
+        All files are processed inside one process (jobs = 1) or one pool of worker processes (jobs > 1).
+        Scenarios which read the same columns of a file share the loaded signal and their common processing steps.
+
+        Parameters
+        ----------
+        json_tup_scenarios_list : []
+            The list of tuples, where the first element in each tuple is the scenario name (SCENARIO_NAME)
+            and second element is a dictionary with scenario's attributes
+        signal_files : []
+            The list of paths to files with signal data
+        jobs : int
+            The number of worker processes
+        cache : SignalCache
+            (optional) The cache of intermediate signal states
+
+        Returns
+        -------
+        list of tuples
+            a list of tuples (scenario name, signal file, exception) with errors of failed runs
+        """
+
+    tasks = [(json_tup_scenarios_list, signal_file, cache) for signal_file in signal_files]
+    if jobs > 1:
+        results = run_in_pool(extract_file_features, tasks, jobs)
+    else:
+        results = [(extract_file_features(*task), None) for task in tasks]
+
+    errors = []
+    for scenario in json_tup_scenarios_list:
+        file_features = []
+        for signal_file, (file_results, file_error) in zip(signal_files, results):
+            if file_error is not None:
+                result, error = None, file_error
+            else:
+                result, error = file_results[scenario[SCENARIO_NAME]]
+            if error is not None:
+                errors.append((scenario[SCENARIO_NAME], signal_file, error))
+            else:
+                file_features.append((signal_file, result[0], result[1]))
+        save_batch_feature_file(scenario[SCENARIO_NAME], file_features,
+                                get_output_format(scenario[DICTIONARY].get("options")))
+
+    return errors
+
+
+def save_batch_feature_file(scenario_name, file_features, file_format="csv"):
+    """Writes features extracted from many signal files to one file (placed in ./results/features/).
+        Each row contains features of one window of one signal file and starts with the "File" column
+        with the name of the signal file.
+
+        Parameters
+        ----------
+        scenario_name : str
+            The name of the scenario
+        file_features : []
+            The list of tuples (signal file, rows of the header, list of extracted features) in the order of files
+        file_format : str
+            (optional) The format of the file - one of result_files.OUTPUT_FORMATS (default is "csv")
+        """
+
+    file_features = [file_feature for file_feature in file_features if len(file_feature[2]) > 0]
+    if len(file_features) == 0:
+        return
+
+    if not os.path.exists("./results/features"):
+        os.makedirs("./results/features")
+
+    file_ids = []
+    feature_columns = [[] for _ in file_features[0][2]]
+    for signal_file, header, features in file_features:
+        file_ids.extend([os.path.splitext(os.path.basename(signal_file))[0]] * len(features[0][1]))
+        for column, feature in zip(feature_columns, features):
+            column.append(np.asarray(feature[1], dtype=float))
+
+    date = datetime.now().strftime("%d-%m-%Y %H-%M-%S").__str__()
+    write_result_file("./results/features/" + scenario_name + " batch " + date,
+                      ["File"] + [x[0] for x in file_features[0][2]],
+                      [file_ids] + [np.concatenate(column) for column in feature_columns],
+                      file_features[0][1], file_format)
 
 
 def draw_all_signals(scenarios):
@@ -96,15 +786,75 @@ def draw_all_signals(scenarios):
         """
 
     for scenario in scenarios:
-        if scenario.options is None or "draw_plot" not in scenario.options \
-                or scenario.options["draw_plot"].lower() == "true":
+        if scenario.is_option_enabled("draw_plot"):
             title = "Processed " + str(scenario.processed_signal.signal_type) + " signal"
             y = str(scenario.processed_signal.signal_type) + " value"
             scenario.processed_signal.draw_plot(scenario.scenario_name, title, 'TimeStamp', y)
 
 
+def parse_arguments(arguments):
+    """Parses the command line arguments
+
+        Parameters
+        ----------
+        arguments : []
+            The list of command line arguments (without the name of the program)
+
+        Returns
+        -------
+        Namespace
+            parsed arguments: config_file_path, jobs, cache, cache_size, signals, chunk_size, stream_input, profile
+            and profile_step
+        """
+
+    parser = argparse.ArgumentParser(description="Processes physiological signals and extracts features from them.")
+    parser.add_argument("config_file_path", help="the path to the JSON configuration file")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="the number of worker processes used to process scenarios in parallel - spare processes "
+                             "compute HRV features of windows in parallel (default: 1)")
+    parser.add_argument("--cache", default=None,
+                        help="directory of the cache of intermediate signal states - scenarios resume from "
+                             "the longest cached prefix of their signal processing steps")
+    parser.add_argument("--cache-size", type=float, default=1024,
+                        help="size budget of the cache in megabytes (default: 1024)")
+    parser.add_argument("--signals", default=None,
+                        help="batch mode: glob pattern of signal files, every scenario is run on every file and "
+                             "features are saved to one merged .csv file per scenario")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="streaming mode: signal files are read and processed in chunks of the given number "
+                             "of samples and results are written while processing")
+    parser.add_argument("--stream-input", default=None,
+                        help="real-time streaming mode: samples are read from the standard input (-) or the local "
+                             "socket (HOST:PORT) and features of windows are written to the standard output "
+                             "as soon as windows are complete")
+    parser.add_argument("--profile", action="store_true",
+                        help="measure time, memory and number of samples of every processing step and save "
+                             "the report of each scenario to ./results/profiles (.json and .csv)")
+    parser.add_argument("--profile-step", default=None,
+                        help="the order or the name of the method whose step is run under cProfile - statistics "
+                             "are saved to the .prof file next to the report (implies --profile)")
+
+    arguments = parser.parse_args(arguments)
+    if arguments.profile_step is not None:
+        arguments.profile = True
+    if arguments.profile and (arguments.signals is not None or arguments.chunk_size is not None or
+                              arguments.stream_input is not None):
+        parser.error("--profile can not be combined with --signals, --chunk-size or --stream-input")
+    if arguments.chunk_size is not None:
+        if arguments.chunk_size < 1:
+            parser.error("--chunk-size has to be a positive number of samples")
+        if arguments.signals is not None or arguments.cache is not None:
+            parser.error("--chunk-size can not be combined with --signals or --cache")
+    if arguments.stream_input is not None and (arguments.signals is not None or arguments.cache is not None or
+                                               arguments.chunk_size is not None or arguments.jobs > 1):
+        parser.error("--stream-input can not be combined with --signals, --cache, --chunk-size or --jobs")
+
+    return arguments
+
+
 #
-def main(config_file_path):
+def main(config_file_path, jobs=1, signals=None, cache_directory=None, cache_size=1024, chunk_size=None,
+         stream_input=None, profile=False, profile_step=None):
     """MAIN SCRIPT
 
         Scenarios are loaded from .json file as list of tuples, next converted into list of Scenario objects.
@@ -113,12 +863,73 @@ def main(config_file_path):
         with extracted features and optionally .csv file with processed signal. In the last step there are drawn all the
         processed signals which were chosen by user to print (in configuration file).
 
+        Scenarios which process the same signal file load it only once and run their common first processing steps
+        only once. If more than one job is selected, scenarios are processed in parallel by a pool of worker processes
+        and processes which are not needed for scenarios compute HRV features of windows in parallel.
+        Errors of failed scenarios are reported after all scenarios have finished.
+
+        In the batch mode (signals glob pattern is given) every scenario is run on every matching signal file
+        and features are saved to one merged .csv file per scenario. Processed signals are not saved nor plotted.
+
+        If the cache directory is given, results of signal processing steps are stored there (up to cache_size megabytes)
+        and scenarios resume from the longest cached prefix of their steps.
+
+        In the streaming mode (chunk size is given) every scenario reads its signal file in chunks and writes results
+        while processing, so signals larger than the memory can be processed. Processed signals are not plotted.
+
+        In the real-time streaming mode (stream input is given) samples are read from the standard input or the local
+        socket as they arrive and features of windows are written to the standard output as soon as windows are complete.
+
+        If profiling is selected, every processing step is measured and the report of each scenario is saved
+        to ./results/profiles together with cProfile statistics of the chosen step.
+
     """
     tup_scenarios = load_config_file(config_file_path)
-    scenarios = convert_json_to_object_list(tup_scenarios)
-    process_scenarios(scenarios)
+    if profile:
+        tup_scenarios = enable_profiling(tup_scenarios, profile_step)
+    set_window_jobs(jobs)
+    cache = None
+    if cache_directory is not None:
+        cache = SignalCache(cache_directory, int(cache_size * 1024 * 1024))
+
+    if stream_input is not None:
+        errors = process_live_stream(tup_scenarios, open_stream_input(stream_input), sys.stdout)
+        for scenario_name, error in errors:
+            print("Scenario " + scenario_name + " failed: " + repr(error), file=sys.stderr)
+        if len(errors) > 0:
+            sys.exit(1)
+        return
+
+    if chunk_size is not None:
+        errors = stream_scenarios(tup_scenarios, chunk_size, jobs)
+        for scenario_name, error in errors:
+            print("Scenario " + scenario_name + " failed: " + repr(error), file=sys.stderr)
+        if len(errors) > 0:
+            sys.exit(1)
+        return
+
+    if signals is not None:
+        signal_files = sorted(glob.glob(signals, recursive=True))
+        if len(signal_files) == 0:
+            print("No signal files match " + signals, file=sys.stderr)
+            sys.exit(1)
+        batch_errors = process_batch(tup_scenarios, signal_files, jobs, cache)
+        for scenario_name, signal_file, error in batch_errors:
+            print("Scenario " + scenario_name + " failed for " + signal_file + ": " + repr(error), file=sys.stderr)
+        if len(batch_errors) > 0:
+            sys.exit(1)
+        return
+
+    scenarios, errors = run_scenarios(tup_scenarios, jobs, cache)
     draw_all_signals(scenarios)
 
+    for scenario_name, error in errors:
+        print("Scenario " + scenario_name + " failed: " + repr(error), file=sys.stderr)
+    if len(errors) > 0:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    main(sys.argv[1])
+    arguments = parse_arguments(sys.argv[1:])
+    main(arguments.config_file_path, arguments.jobs, arguments.signals, arguments.cache, arguments.cache_size,
+         arguments.chunk_size, arguments.stream_input, arguments.profile, arguments.profile_step)
@@ -0,0 +1,217 @@
+import numpy as np
+
+from filters import apply_filter, get_initial_state
+
+"""
+    Defined variables used for the fused preprocessing of the Pan-Tompkins algorithm:
+
+    BLOCK_SIZE (int) : number of samples processed at once - buffers of blocks are allocated once and stay in the cache
+"""
+
+BLOCK_SIZE = 16384
+
+
+class MovingWindowIntegrator:
+    """
+        Integrates values with the moving window: the output of each sample is the sum of the last length_of_window
+        values (values before the first sample are zeros), the same as the full convolution with the window of ones
+        cut to the length of the signal. Sums are computed as differences of cumulative sums of blocks, so the cost
+        does not depend on the length of the window. The last (length_of_window - 1) values are kept between calls,
+        so the signal can be integrated in chunks.
+
+        ...
+
+        Attributes
+        ----------
+        length_of_window : int
+            The length of the moving window
+        block_size : int
+            The number of values integrated at once
+        buffer : numpy.ndarray
+            Last (length_of_window - 1) values followed by values of the block
+        sums : numpy.ndarray
+            Cumulative sums of the buffer (with zero at the beginning)
+
+        Methods
+        -------
+        push(values, out=None)
+            Integrates next values of the signal.
+        """
+
+    def __init__(self, length_of_window, block_size=BLOCK_SIZE):
+        self.length_of_window = int(length_of_window)
+        self.block_size = block_size
+        self.buffer = np.zeros(self.length_of_window - 1 + block_size)
+        self.sums = np.zeros(self.length_of_window + block_size)
+
+    def push(self, values, out=None):
+        """Integrates next values of the signal
+
+            Parameters
+            ----------
+            values : numpy.ndarray
+                Next values of the signal
+            out : numpy.ndarray
+                (optional) The array of the same length as values where integrated values are written
+                (it may be values itself)
+
+            Returns
+            -------
+            numpy.ndarray
+                integrated values
+            """
+
+        if out is None:
+            out = np.empty(len(values))
+
+        kept = self.length_of_window - 1
+        for start in range(0, len(values), self.block_size):
+            count = min(self.block_size, len(values) - start)
+            self.buffer[kept:kept + count] = values[start:start + count]
+            np.cumsum(self.buffer[:kept + count], out=self.sums[1:kept + count + 1])
+            np.subtract(self.sums[kept + 1:kept + count + 1], self.sums[:count], out=out[start:start + count])
+            self.buffer[:kept] = self.buffer[count:count + kept]
+
+        return out
+
+
+class PanTompkinsKernel:
+    """
+        Fused preprocessing of the Pan-Tompkins algorithm: the bandpass filter, differentiation, squaring
+        and moving window integration run block by block over buffers allocated once, so each sample is read
+        and written only once. The results are the same as of butterworth_filter, differentiate, square
+        and moving_window_integration methods run one after another. The derivative of the sample needs
+        the next sample, so the output lags one sample behind the input until the kernel is flushed - then the last
+        sample (which keeps its filtered value, like in Signal.differentiate) is squared and integrated.
+
+        ...
+
+        Attributes
+        ----------
+        sos : numpy.ndarray
+            Second-order sections of the filter (None if values are already filtered)
+        state : numpy.ndarray
+            The state of the filter after the last block
+        integrator : MovingWindowIntegrator
+            The moving window integration of squared derivatives
+        last_value : float
+            The filtered value of the last sample, whose derivative needs the next sample (None before the first sample)
+        derivatives : numpy.ndarray
+            The buffer of squared derivatives of the block
+
+        Methods
+        -------
+        push(values, out=None)
+            Processes next values of the signal.
+        flush()
+            Processes the last sample of the signal.
+        """
+
+    def __init__(self, sos, length_of_window, block_size=BLOCK_SIZE):
+        self.sos = sos
+        self.state = None if sos is None else get_initial_state(sos)
+        self.integrator = MovingWindowIntegrator(length_of_window, block_size)
+        self.last_value = None
+        self.block_size = block_size
+        self.derivatives = np.empty(block_size)
+
+    def push(self, values, out=None):
+        """Processes next values of the signal
+
+            Parameters
+            ----------
+            values : numpy.ndarray
+                Next values of the signal
+            out : numpy.ndarray
+                (optional) The array where outputs are written - its length is the number of returned outputs
+                (see get_output_length). It may overlap values if it does not start after them (e.g. in-place
+                processing with one sample lag).
+
+            Returns
+            -------
+            numpy.ndarray
+                outputs of samples from the last sample of the previous call to the one before the last value
+            """
+
+        import scipy.signal as ss
+
+        if out is None:
+            out = np.empty(self.get_output_length(len(values)))
+
+        written = 0
+        for start in range(0, len(values), self.block_size):
+            block = values[start:start + self.block_size]
+            if self.sos is not None:
+                block, self.state = ss.sosfilt(self.sos, block, zi=self.state)
+            else:
+                block = block.copy()
+
+            """The derivative of the last sample of the previous block is computed with the first sample of this one"""
+            if self.last_value is None:
+                derivatives = self.derivatives[:len(block) - 1]
+                np.subtract(block[1:], block[:-1], out=derivatives)
+            else:
+                derivatives = self.derivatives[:len(block)]
+                derivatives[0] = block[0] - self.last_value
+                np.subtract(block[1:], block[:-1], out=derivatives[1:])
+            self.last_value = block[-1]
+
+            np.square(derivatives, out=derivatives)
+            self.integrator.push(derivatives, out[written:written + len(derivatives)])
+            written += len(derivatives)
+
+        return out
+
+    def flush(self):
+        """Processes the last sample of the signal (its filtered value is squared and integrated)
+
+            Returns
+            -------
+            numpy.ndarray
+                the output of the last sample (empty if no samples were processed)
+            """
+
+        if self.last_value is None:
+            return np.empty(0)
+
+        last = np.array([self.last_value]) ** 2
+        self.last_value = None
+        return self.integrator.push(last)
+
+    def get_output_length(self, length):
+        """Returns the number of outputs returned by push for the given number of values"""
+
+        if length == 0:
+            return 0
+        return length - 1 if self.last_value is None else length
+
+
+def pan_tompkins_transform(values, sos, length_of_window, mode="forward", block_size=BLOCK_SIZE):
+    """Runs the fused preprocessing of the Pan-Tompkins algorithm (see PanTompkinsKernel) on the whole signal in place
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal - they are replaced by the moving window integrated signal
+        sos : numpy.ndarray
+            Second-order sections of the bandpass filter
+        length_of_window : int
+            The length of the moving window
+        mode : str
+            (optional) The mode of applying the filter (see filters.FILTER_MODES). The "zeroPhase" filter needs
+            the whole signal, so only next steps are fused.
+        block_size : int
+            (optional) The number of samples processed at once
+        """
+
+    if mode != "forward":
+        values[:] = apply_filter(sos, values, mode)
+        sos = None
+
+    kernel = PanTompkinsKernel(sos, length_of_window, block_size)
+    written = 0
+    for start in range(0, len(values), block_size):
+        count = kernel.get_output_length(min(block_size, len(values) - start))
+        kernel.push(values[start:start + block_size], values[written:written + count])
+        written += count
+    values[written:] = kernel.flush()
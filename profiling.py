@@ -0,0 +1,175 @@
+import csv
+import json
+import marshal
+import time
+import tracemalloc
+
+"""
+    Defined variables used for profiling processing steps of scenarios:
+
+    PROFILE_COLUMNS ([]) : columns of the report with measurements of processing steps:
+                           "orders" and "methods" - orders and names of methods of the step (separated by "+"),
+                           "wall_time" and "cpu_time" - elapsed and CPU time of the step in seconds,
+                           "peak_memory" - the largest memory (in bytes) allocated during the step above the memory
+                           allocated before the step (traced in the whole process, so it includes allocations
+                           of other threads, e.g. the ResultWriter saving results of previous scenarios),
+                           "input_samples" and "output_samples" - number of samples of the signal (of each channel)
+                           before and after the step,
+                           "shared_with" - the name of the scenario which ran the step for many scenarios which share
+                           the signal (empty if the step was run by the scenario itself)
+"""
+
+PROFILE_COLUMNS = ["orders", "methods", "wall_time", "cpu_time", "peak_memory", "input_samples", "output_samples",
+                   "shared_with"]
+
+
+def create_profiler(options):
+    """Returns the StepProfiler if the "profile" option is set to "True", otherwise None
+        (profiling is disabled by default)
+
+        Parameters
+        ----------
+        options : dict
+            The dictionary with configuration options of the scenario (None if options are not given)
+        """
+
+    if options is None or options.get("profile", "False").lower() != "true":
+        return None
+    return StepProfiler(options.get("profile_step"))
+
+
+class StepProfiler:
+    """
+        Measures processing steps of a single scenario: elapsed and CPU time, the peak of allocated memory
+        (traced with tracemalloc only while the step runs) and number of samples of the signal before and after
+        each step.
+        The chosen step can also be run under cProfile - its statistics are written to the .prof file
+        which can be read with pstats or snakeviz.
+
+        Attributes
+        ----------
+        profile_step : str
+            the order or the name of the method whose step is run under cProfile (None if no step is chosen)
+        measurements : list
+            list of dictionaries with measurements of processed steps (keys are PROFILE_COLUMNS)
+        step_statistics : dict
+            cProfile statistics of chosen steps (the key is the order of the first method of the step)
+
+        Methods
+        -------
+        measure(step, signal, process)
+            Runs the processing step and saves its measurements.
+        add_shared_measurements(measurements, scenario_name)
+            Saves measurements of steps which were run once by another scenario for many scenarios.
+        is_profiled_step(step)
+            Checks whether the step should be run under cProfile.
+        save_report(path)
+            Writes measurements to .json and .csv files and cProfile statistics to .prof files.
+        """
+
+    def __init__(self, profile_step=None):
+        self.profile_step = None if profile_step is None else str(profile_step)
+        self.measurements = []
+        self.step_statistics = {}
+
+    def measure(self, step, signal, process):
+        """Runs the processing step and saves its measurements
+
+            Parameters
+            ----------
+            step : list
+                The list of methods of the processing step
+            signal : Signal
+                The processed signal (its samples are counted before and after the step)
+            process : callable
+                The function which runs the step
+            """
+
+        input_samples = signal.get_values().shape[-1]
+        profile = None
+        if self.is_profiled_step(step):
+            import cProfile
+
+            profile = cProfile.Profile()
+
+        """Tracing is stopped after the step (unless it was started by someone else), so it does not slow down
+            the rest of the program"""
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start_cpu_time = time.process_time()
+        start_time = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            process()
+        finally:
+            if profile is not None:
+                profile.disable()
+            wall_time = time.perf_counter() - start_time
+            cpu_time = time.process_time() - start_cpu_time
+            peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+            if started_tracing:
+                tracemalloc.stop()
+
+        if profile is not None:
+            profile.create_stats()
+            self.step_statistics[step[0]["order"]] = profile.stats
+
+        self.measurements.append({"orders": "+".join(str(method["order"]) for method in step),
+                                  "methods": "+".join(method["functionName"] for method in step),
+                                  "wall_time": wall_time,
+                                  "cpu_time": cpu_time,
+                                  "peak_memory": peak_memory,
+                                  "input_samples": input_samples,
+                                  "output_samples": signal.get_values().shape[-1],
+                                  "shared_with": ""})
+
+    def add_shared_measurements(self, measurements, scenario_name):
+        """Saves measurements of steps which were run once by another scenario for many scenarios
+
+            Parameters
+            ----------
+            measurements : list
+                Measurements of steps saved by the profiler of the other scenario
+            scenario_name : str
+                The name of the scenario which ran the steps
+            """
+
+        for measurement in measurements:
+            self.measurements.append(dict(measurement, shared_with=scenario_name))
+
+    def is_profiled_step(self, step):
+        """Checks whether the step contains the method chosen with profile_step (by its order or name)"""
+
+        return self.profile_step is not None and \
+            any(self.profile_step in (str(method["order"]), method["functionName"]) for method in step)
+
+    def save_report(self, path):
+        """Writes measurements of processed steps to .json and .csv files and cProfile statistics of chosen steps
+            to .prof files (one file for each step: path + " step " + order + ".prof")
+
+            Parameters
+            ----------
+            path : str
+                The path to the report without the extension
+            """
+
+        """Totals include steps shared with other scenarios"""
+        report = {"steps": self.measurements,
+                  "wall_time": sum(measurement["wall_time"] for measurement in self.measurements),
+                  "cpu_time": sum(measurement["cpu_time"] for measurement in self.measurements)}
+        with open(path + ".json", 'w') as json_file:
+            json.dump(report, json_file, indent=4)
+
+        with open(path + ".csv", 'w', newline='') as csv_file:
+            csv_writer = csv.DictWriter(csv_file, fieldnames=PROFILE_COLUMNS)
+            csv_writer.writeheader()
+            csv_writer.writerows(self.measurements)
+
+        for order, statistics in self.step_statistics.items():
+            """The same format as written by cProfile.Profile.dump_stats"""
+            with open(path + " step " + str(order) + ".prof", 'wb') as profile_file:
+                marshal.dump(statistics, profile_file)
@@ -0,0 +1,121 @@
+import numpy as np
+
+"""
+    Defined variables used for detecting R peaks:
+
+    R_PEAK_DETECTORS ([]) : available detectors of R peaks:
+                            "native" - thresholds of Pan-Tompkins applied to the moving window integrated signal,
+                            "biosppy" - the whole ECG pipeline of biosppy (biosppy.signals.ecg.ecg)
+    REFRACTORY_PERIOD (float) : time in seconds after the R peak in which the next R peak can not appear
+    LEARNING_PERIOD (float) : time in seconds from the beginning of the signal used for initial levels of peaks
+    SIGNAL_LEVEL_WEIGHT (float) : weight of the new peak in the running level of signal (R) peaks
+    NOISE_LEVEL_WEIGHT (float) : weight of the new peak in the running level of noise peaks
+    SEARCH_BACK_WEIGHT (float) : weight of the peak found by search-back in the running level of signal peaks
+    THRESHOLD_FRACTION (float) : position of the threshold between the noise level and the signal level
+    SEARCH_BACK_INTERVAL (float) : the multiple of the average R-R interval after which missed R peaks are searched for
+    AVERAGED_INTERVALS (int) : number of last R-R intervals used for the average R-R interval
+"""
+
+R_PEAK_DETECTORS = ["native", "biosppy"]
+REFRACTORY_PERIOD = 0.2
+LEARNING_PERIOD = 2.0
+SIGNAL_LEVEL_WEIGHT = 0.125
+NOISE_LEVEL_WEIGHT = 0.125
+SEARCH_BACK_WEIGHT = 0.25
+THRESHOLD_FRACTION = 0.25
+SEARCH_BACK_INTERVAL = 1.66
+AVERAGED_INTERVALS = 8
+
+
+def detect_r_peaks(values, sampling_rate, detector="native"):
+    """Returns indexes of samples with R peaks found by the selected detector
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the signal (the moving window integrated signal of the Pan-Tompkins algorithm)
+        sampling_rate : int
+            The rate that the signal has been sampled with
+        detector : str
+            (optional) The detector of R peaks (one of R_PEAK_DETECTORS) - default is "native"
+
+        Returns
+        -------
+        numpy.ndarray
+            sorted indexes of samples with R peaks
+        """
+
+    if detector == "native":
+        return detect_integrated_r_peaks(values, sampling_rate)
+    if detector == "biosppy":
+        import biosppy
+
+        r_peaks = biosppy.signals.ecg.ecg(values, sampling_rate=sampling_rate, show=False)
+        return np.asarray(r_peaks[2], dtype=int)
+
+    raise ValueError("Unknown detector of R peaks: " + str(detector))
+
+
+def detect_integrated_r_peaks(values, sampling_rate):
+    """Finds R peaks in the moving window integrated signal of the Pan-Tompkins algorithm.
+        Candidate peaks are local maxima of the signal separated by at least REFRACTORY_PERIOD (found at once
+        with scipy.signal.find_peaks). Each candidate is classified as the R peak or noise by the adaptive threshold
+        between running levels of signal and noise peaks. If no R peak is found for SEARCH_BACK_INTERVAL times
+        the average R-R interval, the highest noise candidate above half of the threshold since the last R peak
+        is taken as the missed R peak (search-back).
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the moving window integrated signal
+        sampling_rate : int
+            The rate that the signal has been sampled with
+
+        Returns
+        -------
+        numpy.ndarray
+            sorted indexes of samples with R peaks
+        """
+
+    import scipy.signal as ss
+
+    values = np.asarray(values, dtype=float)
+    refractory_samples = max(int(REFRACTORY_PERIOD * sampling_rate), 1)
+    candidates, _ = ss.find_peaks(values, distance=refractory_samples)
+    if len(candidates) == 0:
+        return candidates
+
+    """Initial levels are estimated from the learning period - the threshold starts at a third of its maximum"""
+    learning_values = values[:max(int(LEARNING_PERIOD * sampling_rate), 1)]
+    signal_level = np.max(learning_values) / 3
+    noise_level = np.mean(learning_values) / 2
+
+    heights = values[candidates]
+    r_peaks = []
+    intervals = []
+    last_noise_candidates = []
+    for candidate, height in zip(candidates, heights):
+        threshold = noise_level + THRESHOLD_FRACTION * (signal_level - noise_level)
+
+        if len(intervals) > 0 and candidate - r_peaks[-1] > SEARCH_BACK_INTERVAL * np.mean(intervals):
+            missed = [(noise_height, noise_candidate) for noise_candidate, noise_height in last_noise_candidates
+                      if noise_height > threshold / 2 and noise_candidate - r_peaks[-1] >= refractory_samples]
+            if len(missed) > 0:
+                missed_height, missed_candidate = max(missed)
+                intervals = (intervals + [missed_candidate - r_peaks[-1]])[-AVERAGED_INTERVALS:]
+                r_peaks.append(missed_candidate)
+                signal_level = SEARCH_BACK_WEIGHT * missed_height + (1 - SEARCH_BACK_WEIGHT) * signal_level
+                threshold = noise_level + THRESHOLD_FRACTION * (signal_level - noise_level)
+            last_noise_candidates = []
+
+        if height > threshold and (len(r_peaks) == 0 or candidate - r_peaks[-1] >= refractory_samples):
+            if len(r_peaks) > 0:
+                intervals = (intervals + [candidate - r_peaks[-1]])[-AVERAGED_INTERVALS:]
+            r_peaks.append(candidate)
+            signal_level = SIGNAL_LEVEL_WEIGHT * height + (1 - SIGNAL_LEVEL_WEIGHT) * signal_level
+            last_noise_candidates = []
+        else:
+            noise_level = NOISE_LEVEL_WEIGHT * height + (1 - NOISE_LEVEL_WEIGHT) * noise_level
+            last_noise_candidates.append((candidate, height))
+
+    return np.array(r_peaks, dtype=int)
@@ -0,0 +1,188 @@
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+"""
+    Defined variables used for resampling the signal:
+
+    RESAMPLING_METHODS ([]) : available methods of the decimate method:
+                              "polyphase" - polyphase FIR filter (like scipy.signal.resample_poly) applied to values
+                              only, timestamps are taken by the index of the output sample; any rational ratio
+                              of frequencies (default),
+                              "iir" - order 8 Chebyshev filter applied forward and backward to timestamps and values
+                              (scipy.signal.decimate); only integer ratios
+    MAX_RESAMPLING_FACTOR (int) : the largest upsampling or downsampling factor of the rational ratio
+    FILTER_HALF_LENGTH (int) : half of the length of the FIR filter as a multiple of the larger factor of the ratio
+    KAISER_BETA (float) : the shape parameter of the Kaiser window of the FIR filter
+"""
+
+RESAMPLING_METHODS = ["polyphase", "iir"]
+MAX_RESAMPLING_FACTOR = 1000
+FILTER_HALF_LENGTH = 10
+KAISER_BETA = 5.0
+
+
+def get_resampling_ratio(sampling_frequency, goal_frequency):
+    """Returns the ratio of frequencies as the pair of coprime factors (up, down) - the signal is upsampled
+        up times and downsampled down times
+
+        Parameters
+        ----------
+        sampling_frequency : float
+            The frequency with which the signal was sampled
+        goal_frequency : float
+            The goal frequency with which the signal should be sampled
+        """
+
+    ratio = Fraction(str(goal_frequency)) / Fraction(str(sampling_frequency))
+    ratio = ratio.limit_denominator(MAX_RESAMPLING_FACTOR)
+    if ratio <= 0 or ratio.numerator > MAX_RESAMPLING_FACTOR:
+        raise ValueError("Unsupported ratio of frequencies: " + str(sampling_frequency) + " -> " + str(goal_frequency))
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=64)
+def design_resampling_filter(up, down):
+    """Designs the low-pass FIR filter of the polyphase resampler (the same as in scipy.signal.resample_poly):
+        the cut of frequency is the lower of both Nyquist frequencies and the gain is up. Designs are memoized.
+
+        Returns
+        -------
+        numpy.ndarray
+            coefficients of the filter (shared by all callers - it must not be modified)
+        """
+
+    import scipy.signal as ss
+
+    max_factor = max(up, down)
+    taps = ss.firwin(2 * FILTER_HALF_LENGTH * max_factor + 1, 1.0 / max_factor, window=('kaiser', KAISER_BETA))
+    return taps * up
+
+
+def get_output_length(length, up, down):
+    """Returns the number of samples of the resampled signal of the given length"""
+
+    return -(-length * up // down)
+
+
+def get_first_input(output_index, up, down, taps_count):
+    """Returns the index of the first input sample needed by the output sample (it may be negative)"""
+
+    delay = (taps_count - 1) // 2
+    return -(-(delay + output_index * down - taps_count + 1) // up)
+
+
+def get_last_input(output_index, up, down, taps_count):
+    """Returns the index of the last input sample needed by the output sample"""
+
+    delay = (taps_count - 1) // 2
+    return (delay + output_index * down) // up
+
+
+def resample_values(values, offset, first, stop, up, down, last=None):
+    """Computes resampled values of output samples from first to stop. The output sample k is placed at the input
+        position k * down / up and the filter is centered on it, so the signal is not delayed. Samples before
+        the beginning of the signal have the value of its first sample and samples after the end (if the end is known)
+        have the value of its last sample, so there are no transients at the borders.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of input samples - values[..., i] is the sample offset + i of the signal
+            (channels of the multi-channel signal are resampled together along the last axis)
+        offset : int
+            The index of the first sample of values in the signal
+        first : int
+            The index of the first computed output sample
+        stop : int
+            The index after the last computed output sample
+        up : int
+            The upsampling factor
+        down : int
+            The downsampling factor
+        last : int
+            (optional) The index of the last sample of the signal, if the end of the signal is known
+
+        Returns
+        -------
+        numpy.ndarray
+            values of output samples from first to stop
+        """
+
+    import scipy.signal as ss
+
+    if stop <= first:
+        return np.empty(np.shape(values)[:-1] + (0,))
+
+    taps = design_resampling_filter(up, down)
+    first_input = get_first_input(first, up, down, len(taps))
+    indexes = np.arange(first_input, get_last_input(stop - 1, up, down, len(taps)) + 1)
+    indexes = np.clip(indexes, 0, last) if last is not None else np.maximum(indexes, 0)
+    block = values[..., indexes - offset]
+
+    """Zeros before the filter align outputs of scipy.signal.upfirdn with positions of output samples"""
+    shift = first_input * up - (len(taps) - 1) // 2 - first * down
+    skipped = -(shift // down)
+    aligned_taps = np.concatenate((np.zeros(skipped * down + shift), taps))
+    return ss.upfirdn(aligned_taps, block, up, down, axis=-1)[..., skipped:skipped + stop - first]
+
+
+def resample_timestamps(timestamps, offset, first, stop, up, down):
+    """Returns timestamps of output samples from first to stop. The output sample k takes the timestamp
+        of the input sample k * down / up (every down-th timestamp if up is 1) - if the position falls between
+        input samples, the timestamp is interpolated (extrapolated after the last sample).
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            Timestamps of input samples - timestamps[i] is the sample offset + i of the signal
+        offset : int
+            The index of the first sample of timestamps in the signal
+        first : int
+            The index of the first output sample
+        stop : int
+            The index after the last output sample
+        up : int
+            The upsampling factor
+        down : int
+            The downsampling factor
+        """
+
+    positions = np.arange(first, stop) * down
+    indexes = positions // up - offset
+    if up == 1:
+        return timestamps[indexes]
+
+    following = np.minimum(indexes + 1, len(timestamps) - 1)
+    previous = np.maximum(following - 1, 0)
+    intervals = timestamps[following] - timestamps[previous]
+    return timestamps[indexes] + (positions % up) / up * intervals
+
+
+def resample(timestamps, values, up, down):
+    """Resamples the signal with the polyphase FIR filter applied to values only (see resample_values)
+
+        Parameters
+        ----------
+        timestamps : numpy.ndarray
+            Timestamps of the signal
+        values : numpy.ndarray
+            Values of the signal (channels x samples if the signal has many channels)
+        up : int
+            The upsampling factor
+        down : int
+            The downsampling factor
+
+        Returns
+        -------
+        tuple
+            timestamps and values of the resampled signal
+        """
+
+    if up == down:
+        return np.array(timestamps, dtype=float), np.array(values, dtype=float)
+
+    length = get_output_length(len(timestamps), up, down)
+    return resample_timestamps(timestamps, 0, 0, length, up, down), \
+        resample_values(values, 0, 0, length, up, down, len(timestamps) - 1)
@@ -0,0 +1,205 @@
+import csv
+import gzip
+import queue
+import threading
+
+import numpy as np
+
+"""
+    Defined variables used for writing files with results (extracted features and processed signals):
+
+    OUTPUT_FORMATS ([]) : available formats of files with results:
+                          "csv" - .csv file with the header (processing information) in the first rows (default),
+                          "csv.gz" - the same .csv file compressed with gzip,
+                          "parquet" and "feather" - columnar files (pyarrow package is needed) with the header
+                          in the metadata of the file under HEADER_METADATA_KEY,
+                          "npz" - NumPy archive with one array for each column (arr_0, arr_1, ...), "labels" array
+                          with labels of columns and "header" array with the header
+    STREAMING_OUTPUT_FORMATS ([]) : formats which can be written while processing (in the streaming modes)
+    HEADER_METADATA_KEY (str) : the key of the header in the metadata of parquet and feather files
+    MAX_PENDING_RESULTS (int) : maximal number of scenarios waiting in the queue of the ResultWriter
+"""
+
+OUTPUT_FORMATS = ["csv", "csv.gz", "parquet", "feather", "npz"]
+STREAMING_OUTPUT_FORMATS = ["csv", "csv.gz"]
+HEADER_METADATA_KEY = "processing_info"
+MAX_PENDING_RESULTS = 2
+
+
+def get_output_format(options):
+    """Returns the value of the "output_format" option - one of OUTPUT_FORMATS ("csv" is the default)
+
+        Parameters
+        ----------
+        options : dict
+            The dictionary with configuration options of the scenario (None if options are not given)
+        """
+
+    if options is None:
+        return "csv"
+
+    file_format = options.get("output_format", "csv").lower()
+    if file_format not in OUTPUT_FORMATS:
+        raise ValueError("Unknown output format: " + str(file_format))
+    return file_format
+
+
+def get_header_text(header):
+    """Returns rows of the header as text - one line for each row with values separated by commas"""
+
+    return "\n".join(",".join(str(value) for value in row) for row in header)
+
+
+def open_csv_result(path, file_format):
+    """Opens the .csv file with results for writing (compressed with gzip for "csv.gz" format)
+
+        Parameters
+        ----------
+        path : str
+            The path to the file without the extension
+        file_format : str
+            The format of the file - one of STREAMING_OUTPUT_FORMATS
+
+        Returns
+        -------
+        file object
+            the text file opened for writing with csv.writer
+        """
+
+    if file_format == "csv":
+        return open(path + ".csv", 'w', newline='')
+    if file_format == "csv.gz":
+        return gzip.open(path + ".csv.gz", 'wt', newline='')
+
+    raise ValueError("Output format " + str(file_format) + " can not be written while processing")
+
+
+def write_result_file(path, labels, columns, header, file_format="csv", label_row=True):
+    """Writes the table with results to the file with one bulk write
+
+        Parameters
+        ----------
+        path : str
+            The path to the file without the extension (the extension of the format is added)
+        labels : []
+            Labels of columns
+        columns : []
+            Columns of the table - arrays or lists with the same length
+        header : []
+            Rows of the header with processing information (written before labels in .csv files,
+            otherwise stored in the metadata of the file)
+        file_format : str
+            (optional) The format of the file - one of OUTPUT_FORMATS (default is "csv")
+        label_row : bool
+            (optional) Whether the .csv file has the row with labels (default is True)
+
+        Returns
+        -------
+        str
+            the path to the written file
+        """
+
+    columns = [np.asarray(column) for column in columns]
+
+    if file_format in STREAMING_OUTPUT_FORMATS:
+        with open_csv_result(path, file_format) as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerows(header)
+            if label_row:
+                csv_writer.writerow(labels)
+            if len(columns) > 0:
+                csv_writer.writerows(zip(*[column.tolist() for column in columns]))
+        return path + "." + file_format
+
+    if file_format in ("parquet", "feather"):
+        import pyarrow as pa
+
+        table = pa.Table.from_arrays([pa.array(column) for column in columns], names=[str(label) for label in labels])
+        table = table.replace_schema_metadata({HEADER_METADATA_KEY: get_header_text(header)})
+        if file_format == "parquet":
+            import pyarrow.parquet as parquet
+
+            parquet.write_table(table, path + ".parquet")
+        else:
+            import pyarrow.feather as feather
+
+            """Uncompressed feather files can be memory-mapped by readers"""
+            feather.write_feather(table, path + ".feather", compression="uncompressed")
+        return path + "." + file_format
+
+    if file_format == "npz":
+        np.savez(path + ".npz", *columns, labels=np.array([str(label) for label in labels]),
+                 header=np.array(get_header_text(header)))
+        return path + ".npz"
+
+    raise ValueError("Unknown output format: " + str(file_format))
+
+
+class ResultWriter:
+    """
+        Background stage which saves results of processed scenarios (Scenario.save_results) in the writer thread,
+        so the next scenarios are processed while results of previous ones are written.
+        The queue of scenarios waiting for writing is bounded - submit blocks while it is full (backpressure),
+        so results of at most max_pending + 1 scenarios are kept in memory only for writing.
+        Errors of writing are collected and available after the writer is closed.
+
+        Attributes
+        ----------
+        errors : dict
+            exceptions raised while saving results (the key is the scenario name)
+        pending : queue.Queue
+            the bounded queue of scenarios waiting for writing
+        thread : threading.Thread
+            the writer thread
+
+        Methods
+        -------
+        submit(scenario)
+            Adds the processed scenario to the queue of scenarios whose results should be saved.
+        close()
+            Waits until results of all submitted scenarios are saved and stops the writer thread.
+        """
+
+    def __init__(self, max_pending=MAX_PENDING_RESULTS):
+        self.errors = {}
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self.write_results, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, scenario):
+        """Adds the processed scenario to the queue of scenarios whose results should be saved
+            (blocks while the queue is full)"""
+
+        self.pending.put(scenario)
+
+    def write_results(self):
+        """Saves results of scenarios from the queue until the writer is closed (run by the writer thread)"""
+
+        while True:
+            scenario = self.pending.get()
+            if scenario is None:
+                return
+            try:
+                scenario.save_results()
+            except Exception as error:
+                self.errors[scenario.scenario_name] = error
+
+    def close(self):
+        """Waits until results of all submitted scenarios are saved and stops the writer thread
+
+            Returns
+            -------
+            dict
+                exceptions raised while saving results (the key is the scenario name)
+            """
+
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+        return self.errors
@@ -1,10 +1,15 @@
 import csv
 import os
 import numpy as np
+from contextlib import ExitStack
 from datetime import datetime
-from signal import Signal
+from signal import Signal, STATISTICS_LABELS
 from operator import itemgetter
 
+from profiling import create_profiler
+
+from result_files import STREAMING_OUTPUT_FORMATS, get_output_format, open_csv_result, write_result_file
+from signal_files import get_signal_file_path, is_multi_channel, iter_signal_chunks
 from signalTypes.PeriodicSignal import PeriodicSignal
 
 
@@ -23,28 +28,77 @@ class Scenario:
         processing_methods : list
             list of methods with attributes and parameters used for signal processing
             which are taken from JSON configuration file
+        signal_file_name : str
+            the name of the file with signal data taken from JSON configuration file
+        signal_type : str
+            the type of the signal taken from JSON configuration file
+        columns : dict
+            dictionary with "timestamp" and "values" column numbers taken from JSON configuration file
+            ("values" is a list of column numbers of a multi-channel signal)
+        windowing_attributes : dict
+            dictionary which contains information about the windowing of the scenario, like: length of the window and its slide
         options : dict
             dictionary with configuration options for scenario, like:
             "draw_plot": whether to draw a plot with processed signal
             "save_processed_signal": save processed signal to .csv file
+            "feature_mode": how statistics are extracted from the signal ("single", "batch" or "rolling")
+            "output_format": the format of files with results (one of result_files.OUTPUT_FORMATS)
+            "profile": measure processing steps and save the report to ./results/profiles
+            "profile_step": the order or the name of the method whose step is run under cProfile
         processing_info : dict
             Information about order and type of processing to write in header of .csv file with extracted features
+        stream : SignalStream
+            the stream of the real-time streaming mode (None if the mode is not started)
+        profiler : StepProfiler
+            measures processing steps if the "profile" option is enabled (None otherwise)
 
         Methods
         -------
+        create_signal(signal_file_name)
+            Creates the Signal object of the scenario's signal type.
+        get_signal_class()
+            Returns the class of the Signal object which represents the scenario's signal type.
         sort_methods_by_order()
             Sorts methods in the scenario by their order.
         process_methods()
             Processes the signal with all methods defined in the flow scenario.
+        get_feature_mode()
+            Returns the "feature_mode" option.
+        get_processing_steps()
+            Divides sorted methods of the scenario into processing steps.
+        record_step(step)
+            Saves the order and names of methods of the processing step to the processing info.
+        process_step(step)
+            Processes the signal with a single processing step.
+        run_step(step)
+            Support method for processing the signal with a single processing step.
+        process_method(method)
+            Processes the signal with a single method of the flow scenario.
+        create_stream()
+            Creates the SignalStream which runs all methods of the flow scenario on the signal in chunks.
+        process_stream(chunk_size)
+            Processes the signal file in chunks and writes results while processing (streaming mode).
+        write_stream_results(results, features_writer, signal_writer)
+            Support method for writing results of the chunk of the streaming mode.
+        start_stream()
+            Starts the real-time streaming mode.
+        push(timestamps, values)
+            Processes next samples in the real-time streaming mode and returns features of complete windows.
+        finish_stream()
+            Finishes the real-time streaming mode and returns features of remaining windows.
         save_results()
-            Writes extracted features and processed signal to separate .csv files
-        save_feature_csv()
-            Writes extracted features to the csv file and call function to write the processed signal to csv file.
-        save_signal_csv()
-            Writes processed signal to the csv file.
+            Writes extracted features and processed signal to separate files
+        is_option_enabled(option)
+            Checks whether the "True"/"False" option is enabled.
+        save_feature_file(file_name, file_format)
+            Writes extracted features to the file of the given format.
+        save_signal_file(file_name, file_format)
+            Writes processed signal to the file of the given format.
         setup_csv_header()
             Support method for adding the header to .csv file with extracted features.
             The header contains information about order and type of processing methods used on the signal.
+        get_csv_header()
+            Support method for creating rows of the header of .csv file with extracted features.
         """
 
     def __init__(self, scenario_name, signal_file_name, signal_type, methods, columns, **kwargs):
@@ -65,34 +119,70 @@ class Scenario:
                 Dictionary which contains information about columns to read from .csv file with signal data
                 with specified: "timestamp" column number and "values" column number (values for the signal)
             kwargs : {}
-                Dictionary with optional "options" and "windowing_attr" parameters.
+                Dictionary with optional "options", "windowing_attr" and "load_signal" parameters.
                 options - dictionary with configuration options for scenario, like:
                             whether to draw a plot with processed signal or save processed signal to .csv file
                 windowing_attr - dictionary which contains information about the windowing, like: length of the window and its slide.
+                load_signal - if set to False, the signal file is not loaded and processed_signal is None
+                            until it is set (e.g. when many scenarios share the same loaded signal)
 
             """
         self.scenario_name = scenario_name
         self.processing_methods = methods
         self.options = None
         windowing = None
+        load_signal = True
         for key, item in kwargs.items():
             if key == "options":
                 self.options = item
             elif key == "windowing_attr":
                 windowing = item
+            elif key == "load_signal":
+                load_signal = item
+
+        self.scenario_name = scenario_name
+        self.processing_methods = methods
+        self.signal_file_name = signal_file_name
+        self.signal_type = signal_type
+        self.columns = columns
+        self.windowing_attributes = windowing
+        self.processed_signal = None
+        if load_signal:
+            self.processed_signal = self.create_signal(signal_file_name)
+
+        self.processing_info = {}
+        self.stream = None
+        self.profiler = create_profiler(self.options)
+
+    def create_signal(self, signal_file_name):
+        """Creates the Signal object of the scenario's signal type
+
+            Parameters
+            ----------
+            signal_file_name : str
+                The name of the file which contains signal data (placed in ./signals) or a path to the signal file.
+                If set to None - no file is loaded and the signal is empty.
+
+            Returns
+            -------
+            Signal
+                the object of Signal (or its derived class) with the scenario's columns and windowing
+            """
+
+        signal_class = self.get_signal_class()
+        return signal_class(signal_file_name, self.signal_type, self.columns, self.windowing_attributes)
+
+    def get_signal_class(self):
+        """Returns the class of the Signal object which represents the scenario's signal type"""
 
         # periodic_signals is a dictionary containing all periodic signal types;
         # If in the future there is implemented new signal type which could use methods available in this class -
         # it should be added to this array
         periodic_signals = ['ECG']
-        self.scenario_name = scenario_name
-        self.processing_methods = methods
-        if signal_type in periodic_signals:
-            self.processed_signal = PeriodicSignal(signal_file_name, signal_type, columns, windowing)
-        else:
-            self.processed_signal = Signal(signal_file_name, signal_type, columns, windowing)
+        if self.signal_type in periodic_signals:
+            return PeriodicSignal
 
-        self.processing_info = {}
+        return Signal
 
     def sort_methods_by_order(self):
         """Sorts methods in the scenario by their order"""
@@ -103,18 +193,237 @@ class Scenario:
         """Processes all defined methods in the flow scenario"""
 
         self.sort_methods_by_order()
+        for step in self.get_processing_steps():
+            self.process_step(step)
+
+    def get_feature_mode(self):
+        """Returns the value of the "feature_mode" option - "single" (default), "batch" or "rolling"."""
+
+        if self.options is None:
+            return "single"
+        return self.options.get("feature_mode", "single").lower()
+
+    def get_processing_steps(self):
+        """Divides sorted methods of the scenario into processing steps.
+            Each step is a list with a single method. If "feature_mode" option is set to "batch" or "rolling",
+            consecutive statistic feature extraction methods are joined into one step, so they are extracted together
+            with the selected mode of Signal.extract_statistics.
+
+            Returns
+            -------
+            list
+                list of steps, where each step is a list of methods
+            """
+
+        batch_features = self.get_feature_mode() in ["batch", "rolling"]
+        steps = []
         for method in self.processing_methods:
-            method_to_call = getattr(self.processed_signal, method["functionName"])
-            self.processing_info[method["order"]] = method["functionName"]
-            if method.get("attributes") is None and method.get("outputLabel") is None:
-                method_to_call()
-            elif method.get("outputLabel") is None:
-                method_to_call(method["attributes"])
+            if batch_features and len(steps) > 0 and method["functionName"] in STATISTICS_LABELS \
+                    and steps[-1][-1]["functionName"] in STATISTICS_LABELS:
+                steps[-1].append(method)
             else:
-                method_to_call(method["outputLabel"])
+                steps.append([method])
+
+        return steps
+
+    def record_step(self, step):
+        """Saves the order and names of methods of the processing step to the processing info
+
+            Parameters
+            ----------
+            step : list
+                The list of methods of the processing step
+            """
+
+        for method in step:
+            self.processing_info[method["order"]] = method["functionName"]
+
+    def process_step(self, step):
+        """Processes the signal with a single processing step (measured by the profiler if profiling is enabled)
+
+            Parameters
+            ----------
+            step : list
+                The list of methods of the processing step (see get_processing_steps)
+            """
+
+        if self.profiler is not None:
+            self.profiler.measure(step, self.processed_signal, lambda: self.run_step(step))
+        else:
+            self.run_step(step)
+
+    def run_step(self, step):
+        """Support method for processing the signal with a single processing step
+
+            Parameters
+            ----------
+            step : list
+                The list of methods of the processing step (see get_processing_steps)
+            """
+
+        if self.get_feature_mode() in ["batch", "rolling"] and step[0]["functionName"] in STATISTICS_LABELS:
+            self.record_step(step)
+            statistics = [(method["functionName"], method.get("outputLabel")) for method in step]
+            self.processed_signal.extract_statistics(statistics, self.get_feature_mode())
+        else:
+            self.process_method(step[0])
+
+    def process_method(self, method):
+        """Processes a single method of the flow scenario
+
+            Parameters
+            ----------
+            method : dict
+                The dictionary with "functionName", "order" and optional "attributes" or "outputLabel" of the method
+            """
+
+        method_to_call = getattr(self.processed_signal, method["functionName"])
+        self.processing_info[method["order"]] = method["functionName"]
+        if method.get("attributes") is None and method.get("outputLabel") is None:
+            method_to_call()
+        elif method.get("outputLabel") is None:
+            method_to_call(method["attributes"])
+        else:
+            method_to_call(method["outputLabel"])
+
+    def create_stream(self):
+        """Creates the SignalStream which runs all methods of the flow scenario on the signal in chunks
+            and saves all methods to the processing info
+
+            Returns
+            -------
+            SignalStream
+                the stream of the scenario
+            """
+
+        from streaming import SignalStream
+
+        if is_multi_channel(self.columns):
+            raise ValueError("Multi-channel signals can not be processed in the streaming mode")
+
+        self.sort_methods_by_order()
+        for step in self.get_processing_steps():
+            self.record_step(step)
+
+        return SignalStream(self.processing_methods, self.get_signal_class(), self.windowing_attributes,
+                            self.get_feature_mode())
+
+    def process_stream(self, chunk_size):
+        """Processes the signal file in chunks (streaming mode) and writes results while processing:
+            features of each window are written as soon as the window is complete and the processed signal
+            (if selected) as soon as its samples are ready. The whole signal is never loaded into memory,
+            so processed_signal stays None and the signal can not be plotted. Results are written to .csv files
+            (compressed with gzip if the "output_format" option is "csv.gz") - other formats need all results at once.
+
+            Parameters
+            ----------
+            chunk_size : int
+                The maximal number of samples read from the signal file at once
+            """
+
+        file_format = get_output_format(self.options)
+        if file_format not in STREAMING_OUTPUT_FORMATS:
+            raise ValueError("Output format " + file_format + " is not supported in the streaming mode")
+
+        stream = self.create_stream()
+        labels = stream.get_feature_labels()
+
+        date = datetime.now().strftime("%d-%m-%Y %H-%M-%S").__str__()
+        features_file_name = self.scenario_name + " " + date
+        signal_file_name = self.signal_type + "signal " + features_file_name
+
+        with ExitStack() as files:
+            features_writer = None
+            signal_writer = None
+            if len(labels) > 0:
+                if not os.path.exists("./results/features"):
+                    os.makedirs("./results/features")
+                features_writer = csv.writer(files.enter_context(
+                    open_csv_result("./results/features/" + features_file_name, file_format)))
+                self.setup_csv_header(features_writer)
+                features_writer.writerow(labels)
+            if self.is_option_enabled("save_processed_signal"):
+                if not os.path.exists("./results/signals"):
+                    os.makedirs("./results/signals")
+                signal_writer = csv.writer(files.enter_context(
+                    open_csv_result("./results/signals/" + signal_file_name, file_format)))
+
+            path = get_signal_file_path(self.signal_file_name)
+            for timestamps, values in iter_signal_chunks(path, self.columns, chunk_size):
+                self.write_stream_results(stream.push(timestamps, values), features_writer, signal_writer)
+            self.write_stream_results(stream.flush(), features_writer, signal_writer)
+
+    def write_stream_results(self, results, features_writer, signal_writer):
+        """Support method for writing results of the chunk of the streaming mode
+
+            Parameters
+            ----------
+            results : ()
+                The tuple with timestamps and values of processed samples and the list of rows of features
+                (see SignalStream.push)
+            features_writer : Writer
+                Csv writer of the file with extracted features (None if features are not extracted)
+            signal_writer : Writer
+                Csv writer of the file with processed signal (None if it is not saved)
+            """
+
+        timestamps, values, rows = results
+        if features_writer is not None:
+            features_writer.writerows(rows)
+        if signal_writer is not None:
+            signal_writer.writerows(np.column_stack((timestamps, values)))
+
+    def start_stream(self):
+        """Starts the real-time streaming mode - samples are not read from the signal file, but they are given
+            with push() as they arrive (e.g. from a live wearable feed). Processing methods keep their state
+            between pushes, so the time of processing a sample does not grow with the duration of the session.
+
+            Returns
+            -------
+            list
+                names of features in rows returned by push() and finish_stream()
+            """
+
+        self.stream = self.create_stream()
+        return self.stream.get_feature_labels()
+
+    def push(self, timestamps, values):
+        """Processes next samples in the real-time streaming mode (see start_stream)
+
+            Parameters
+            ----------
+            timestamps : numpy.ndarray
+                Timestamps of next samples (later than timestamps of previous samples)
+            values : numpy.ndarray
+                Values of next samples
+
+            Returns
+            -------
+            list
+                rows of features of windows which are complete after these samples
+            """
+
+        _, _, rows = self.stream.push(timestamps, values)
+        return rows
+
+    def finish_stream(self):
+        """Finishes the real-time streaming mode (see start_stream)
+
+            Returns
+            -------
+            list
+                rows of features of all remaining windows
+            """
+
+        _, _, rows = self.stream.flush()
+        self.stream = None
+        return rows
 
     def save_results(self):
-        """Writes extracted features and processed signal (if selected) to separate .csv files"""
+        """Writes extracted features and processed signal (if selected) to separate files
+            of the format selected with the "output_format" option and the report of the profiler (if enabled)"""
+
+        file_format = get_output_format(self.options)
 
         date = datetime.now().strftime("%d-%m-%Y %H-%M-%S").__str__()
         features_file_name = self.scenario_name + " " + date
@@ -125,49 +434,63 @@ class Scenario:
         if not os.path.exists("./results/signals"):
             os.makedirs("./results/signals")
 
-        self.save_feature_csv(features_file_name)
+        self.save_feature_file(features_file_name, file_format)
+
+        if self.is_option_enabled("save_processed_signal"):
+            self.save_signal_file(signal_file_name, file_format)
 
-        if self.options is None or "save_processed_signal" not in self.options \
-                or self.options["save_processed_signal"].lower() == "true":
-            self.save_signal_csv(signal_file_name)
+        if self.profiler is not None:
+            if not os.path.exists("./results/profiles"):
+                os.makedirs("./results/profiles")
+            self.profiler.save_report("./results/profiles/" + features_file_name)
 
-    def save_feature_csv(self, file_name):
-        """Writes extracted features to the csv file and call function to write the processed signal to csv file
+    def is_option_enabled(self, option):
+        """Checks whether the "True"/"False" option is enabled. Options which are not specified are enabled by default.
+
+            Parameters
+            ----------
+            option : str
+                The name of the option, like: "draw_plot" or "save_processed_signal"
+            """
+
+        return self.options is None or option not in self.options or self.options[option].lower() == "true"
+
+    def save_feature_file(self, file_name, file_format="csv"):
+        """Writes extracted features to the file with one bulk write. The header with processing information
+            is written in the first rows of .csv files and in the metadata of other formats.
 
             Parameters
            ----------
            file_name : str
                The name of the newly created file which contains extracted features data
-               (will be placed in ./results/features/).
+               (will be placed in ./results/features/, the extension is added).
                The name is compatible with the signal file name which is also saved after running the scenario.
+           file_format : str
+               (optional) The format of the file - one of result_files.OUTPUT_FORMATS (default is "csv")
         """
 
         if self.processed_signal.features.__len__() > 0:
-            with open("./results/features/" + file_name + ".csv", 'w', newline='') as csv_file:
-                csv_writer = csv.writer(csv_file)
-                self.setup_csv_header(csv_writer)
-                csv_writer.writerow([x[0] for x in self.processed_signal.features])
-                feature_values = [x[1] for x in self.processed_signal.features]
-                feature_values = np.array(feature_values)
-                feature_values = feature_values.transpose()
-                for row in feature_values:
-                    csv_writer.writerow(row)
-
-    def save_signal_csv(self, file_name):
-        """Writes processed signal to the csv file
+            write_result_file("./results/features/" + file_name, [x[0] for x in self.processed_signal.features],
+                              [x[1] for x in self.processed_signal.features], self.get_csv_header(), file_format)
+
+    def save_signal_file(self, file_name, file_format="csv"):
+        """Writes processed signal (timestamp and values columns - a column for each channel) to the file
+            with one bulk write
 
            Parameters
            ----------
            file_name : str
                The name of the newly created file which contains processed signal data
-               (will be placed in ./results/signals/).
+               (will be placed in ./results/signals/, the extension is added).
                The name bases on the scenario file name which was used to process the signal.
+           file_format : str
+               (optional) The format of the file - one of result_files.OUTPUT_FORMATS (default is "csv")
         """
 
-        with open("./results/signals/" + file_name + ".csv", 'w', newline='') as csv_file:
-            csv_writer = csv.writer(csv_file)
-            for element in self.processed_signal.signal_samples:
-                csv_writer.writerow(element)
+        signal = self.processed_signal
+        labels = ["values"] if signal.channels is None else signal.channels
+        write_result_file("./results/signals/" + file_name, ["timestamp"] + labels,
+                          [signal.timestamps] + signal.get_channel_values(), [], file_format, label_row=False)
 
     def setup_csv_header(self, csv_writer):
         """
@@ -179,18 +502,32 @@ class Scenario:
            csv_writer : Writer
                 Csv writer object used for writing to .csv file
         """
+
+        for row in self.get_csv_header():
+            csv_writer.writerow(row)
+
+    def get_csv_header(self):
+        """
+            Support method for creating the header of .csv file with extracted features.
+            The header contains information about order and type of processing methods used on the signal.
+
+            Returns
+            -------
+            list
+                rows of the header
+        """
         header = [str(x) + "=" + str(y) for x, y in self.processing_info.items()]
-        scenario_info = "Signal type: " + self.processed_signal.signal_type + " | Windowing: "
-        if self.processed_signal.windowing_attributes is None:
+        scenario_info = "Signal type: " + self.signal_type + " | Windowing: "
+        if self.windowing_attributes is None:
             scenario_info += "OFF"
         else:
-            scenario_info += "length=" + str(self.processed_signal.windowing_attributes["length"]) + \
-                             " slide=" + str(self.processed_signal.windowing_attributes["slide"])
+            scenario_info += "length=" + str(self.windowing_attributes["length"]) + \
+                             " slide=" + str(self.windowing_attributes["slide"])
 
         header = ' '.join(header)
-        csv_writer.writerow(["-" * len(header)])
-        csv_writer.writerow(["Scenario information: "])
-        csv_writer.writerow([scenario_info])
-        csv_writer.writerow(["Order of processing methods: "])
-        csv_writer.writerow([header])
-        csv_writer.writerow(["-" * len(header)])
+        return [["-" * len(header)],
+                ["Scenario information: "],
+                [scenario_info],
+                ["Order of processing methods: "],
+                [header],
+                ["-" * len(header)]]
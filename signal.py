@@ -1,13 +1,34 @@
-import peakutils
-
-import scipy.signal as ss
-import scipy.stats as stat
-import scipy.integrate as integration
-
-from matplotlib import pyplot as plt
-import pandas as pd
 import numpy as np
 
+from baseline import estimate_baseline
+from filters import apply_filter, get_butterworth_design
+from pan_tompkins import MovingWindowIntegrator
+from resampling import get_resampling_ratio, resample
+from signal_files import get_channel_names, get_signal_file_path, is_multi_channel, read_signal_columns
+from windowing import SignalWindows
+from window_statistics import batch_statistics, rolling_statistics
+
+"""
+    Defined variables used for batched feature extraction:
+
+    STATISTICS_LABELS ({}) : dictionary where the key is the name of the statistic feature extraction method
+                             and the value is its default output label
+    CHANNEL_LABEL (str) : the format of labels of features of a channel of the multi-channel signal
+"""
+
+STATISTICS_LABELS = {
+    "mean": "Mean",
+    "median": "Median",
+    "standard_deviation": "Standard deviation",
+    "minimum": "Minimum",
+    "maximum": "Maximum",
+    "variance": "Variance",
+    "kurtosis": "Kurtosis",
+    "skewness": "Skewness",
+    "area_under_curve": "Area under curve"
+}
+CHANNEL_LABEL = "{label} ({channel})"
+
 
 class Signal:
     """
@@ -17,8 +38,16 @@ class Signal:
 
             Attributes
             ----------
-            signal_samples : [[]]
-                the two-dimensions list with signal [[timestamps, values]]
+            timestamps : numpy.ndarray
+                contiguous array with timestamps of the signal samples
+            values : numpy.ndarray
+                contiguous array with values of the signal samples - the two-dimensions array (channels x samples)
+                if the signal has many channels; all methods process every channel along the samples axis
+            channels : list
+                names of channels of the multi-channel signal (None if the signal has a single channel)
+            signal_samples : numpy.ndarray
+                (read-only copy) the two-dimensions array with signal [[timestamp, value]]
+                (a column of values for each channel)
             features : [[]]
                 the two-dimensions list with extracted features [[name of the feature, value]]
             signal_type : str
@@ -46,8 +75,10 @@ class Signal:
                 Gets phase part of given signal.
             normalize_by_std()
                 Normalizes the signal by standard deviation.
-            smooth()
-                Smooths the signal by averaging the samples.
+            smooth(attr)
+                Smooths the signal with the selected kernel (moving average, Savitzky–Golay, exponential).
+            smooth_values(values, attr)
+                Returns values smoothed with the selected kernel (shared with the streaming mode).
 
 
             Methods for feature extraction:
@@ -77,6 +108,8 @@ class Signal:
                 Extracts skewness value from the signal.
             area_under_curve(self, attr="Area under curve"):
                 Extracts the area under the curve characteristic value from the signal.
+            extract_statistics(statistics, mode)
+                Extracts many of the above statistics at once in one vectorized pass or incrementally.
 
 
             Other methods:
@@ -84,9 +117,17 @@ class Signal:
             draw_plot(window_name, title_name, x_name, y_name)
                 Plots the signal chart with specified names of window, title, x and y values.
             get_values()
-                Support method to get signal values out of a sampled signal.
+                Support method to get signal values (a view, without copying) out of a sampled signal.
+            get_channel_values()
+                Support method to get values of every channel (views) of the signal.
+            add_feature(label, feature_values)
+                Support method for saving values of the feature of every window (of every channel) to the features list.
             get_windowed_values()
                 Method to get values out of a sampled signal and decide whether returned signal should be windowed or not.
+            get_windows()
+                Support method to find start and stop indexes of all windows of the signal.
+            get_window_bounds()
+                Support method to get start and stop indexes of all windows (whole signal if it is not windowed).
             get_window_timestamps()
                 Support method to get timestamps out of a sampled signal and divide them into windows timestamps.
             divide_into_windows():
@@ -95,36 +136,46 @@ class Signal:
                 Support method for setting new for the signal.
             """
 
+    # names of methods which only process the signal - they do not extract features and do not depend on the windowing
+    signal_processing_methods = ["butterworth_filter", "differentiate", "square", "moving_window_integration",
+                                 "decimate", "get_phase_part", "normalize_by_std", "smooth"]
+
+    # names of attributes which describe the state of the processed signal (stored in the cache of signal states)
+    cached_attributes = ["timestamps", "values"]
+
     def __init__(self, signal_file_name, signal_type, columns, windowing_attr=None):
-        """Initialization of the Signal object which include loading the signal from .csv file and
-            saving it as signal_samples property
+        """Initialization of the Signal object which include loading the signal from file (.csv or binary) and
+            saving its timestamps and values as separate contiguous arrays
 
             Parameters
            ----------
            signal_file_name : str
-               The name of the file which contains signal data (placed in ./signals)
+               The name of the file which contains signal data (placed in ./signals) or a path to the signal file
+               (see signal_files.get_signal_file_path).
+               If set to None - no file is loaded and the signal is empty.
            signal_type : str
                type of signal
                it has to be included in the list of available types of the signal (manual.txt)
            columns : dict
                Dictionary which contains information about columns to read from .csv file with signal data
                 with specified: "timestamp" column number and "values" column number (values for the signal)
+                or a list of column numbers (one for each channel) with optional "channels" list of their names
            windowing_attr : dict
                 Dictionary which contains information about the windowing, like: length of the window and its slide.
                 If set to None - there is no windowing included.
 
            """
 
-        path = './signals/' + signal_file_name + '.csv'
-        pandas_data_framed_signal = pd.read_csv(r'' + path)
-        columns_names = pandas_data_framed_signal.columns
-        columns_selected = [columns_names[columns["timestamp"]-1], columns_names[columns["values"]-1]]
-
-        pandas_data_framed_signal = pandas_data_framed_signal[columns_selected]
         self.signal_type = signal_type
-        self.signal_samples = pandas_data_framed_signal.to_numpy()
+        self.timestamps = np.empty(0)
+        self.values = np.empty(0)
         self.windowing_attributes = windowing_attr
         self.features = []
+        self.channels = get_channel_names(columns) if columns is not None and is_multi_channel(columns) else None
+
+        if signal_file_name is not None:
+            path = get_signal_file_path(signal_file_name)
+            self.timestamps, self.values = read_signal_columns(path, columns)
 
     def butterworth_filter(self, attr):
         """Creating and using Butterworth digital filter
@@ -147,33 +198,26 @@ class Signal:
                     an array or a scalar of cut of frequencies that will be applied to the filter
                         Scalar for 'lowpass' and 'highpass' filter.
                         Array for 'bandpass' and 'bandstop' filter.
-           """
-
-        order = attr["filterOrder"]
-        freq = attr["samplingRate"]
-        type = attr["type"]
-        cut_of_freq = attr["cutOfFrequencies"]
-
-        nyquist_freq = 0.5 * freq
+               - mode: str
+                    (optional) mode of applying the filter (see filters.FILTER_MODES):
+                        'forward' (default) - causal filter
+                        'zeroPhase' - forward and backward filter which does not delay the signal
 
-        """Normalization of frequency values by the Nyquist frequency f = f / fn"""
-        if isinstance(cut_of_freq, list):
-            cut_of_freq = [elem / nyquist_freq for elem in cut_of_freq]
-        else:
-            cut_of_freq = cut_of_freq / nyquist_freq
+           The filter is designed as second-order sections and the design is reused by next calls with the same attributes.
+           """
 
-        """Creating coefficients of the filter"""
-        b, a = ss.butter(order, cut_of_freq, btype=type, analog=False)
+        sos = get_butterworth_design(attr)
 
-        """Applying created filter's coefficients to the signal.Filtered signal is applied only to the values of the signal. 
+        """Applying created filter to the signal. Filtered signal is applied only to the values of the signal. 
              It did not changed the timestamps."""
-        filtered_values = ss.lfilter(b, a, self.get_values())
+        filtered_values = apply_filter(sos, self.get_values(), attr.get("mode", "forward"))
         self.set_values(filtered_values)
 
     def differentiate(self):
         """Differentiate the signal"""
 
-        differentiated_signal = np.diff(self.get_values())
+        differentiated_signal = np.diff(self.get_values(), axis=-1)
+        """Differentiated signal is one sample shorter - the last value of the signal stays unchanged (see set_values)"""
         self.set_values(differentiated_signal)
 
     def square(self):
@@ -193,28 +237,43 @@ class Signal:
                     length of the moving window
            """
 
-        length_of_window = attr["lengthOfWindow"]
+        length_of_window = int(attr["lengthOfWindow"])
 
-        integrated_signal = np.convolve(self.get_values(), np.ones(length_of_window))
-        self.set_values(integrated_signal)
+        """Each value is replaced by the sum of the last length_of_window values (the same as the full convolution
+            with the window of ones cut to the length of the signal) - sums are computed from cumulative sums in place"""
+        for channel_values in self.get_channel_values():
+            MovingWindowIntegrator(length_of_window).push(channel_values, channel_values)
 
     def decimate(self, attr):
-        """Decimates the signal
+        """Decimates (resamples) the signal
 
            Parameters
            ----------
            attr : {}
                The dictionary with attributes:
-               - samplingFrequency: int
+               - samplingFrequency: float
                     frequency with which signal was sampled
-               - goalFrequency: int
+               - goalFrequency: float
                     goal frequency with which signal should be sampled
+               - method: str
+                    (optional) the method of resampling - one of resampling.RESAMPLING_METHODS:
+                    "polyphase" (default) - polyphase FIR filter applied to values only, timestamps are taken
+                    by the index of output samples; any rational ratio of frequencies,
+                    "iir" - order 8 Chebyshev filter applied to timestamps and values (scipy.signal.decimate);
+                    only integer ratios
            """
-        sampling_frequency = int(attr["samplingFrequency"])
-        goal_frequency = int(attr["goalFrequency"])
+        method = attr.get("method", "polyphase")
 
-        ratio = int(sampling_frequency / goal_frequency)
-        self.signal_samples = ss.decimate(self.signal_samples, ratio, 8, axis=0)
+        if method == "iir":
+            import scipy.signal as ss
+
+            ratio = int(int(attr["samplingFrequency"]) / int(attr["goalFrequency"]))
+            self.signal_samples = ss.decimate(self.signal_samples, ratio, 8, axis=0)
+        elif method == "polyphase":
+            up, down = get_resampling_ratio(attr["samplingFrequency"], attr["goalFrequency"])
+            self.timestamps, self.values = resample(self.timestamps, self.values, up, down)
+        else:
+            raise ValueError("Unknown method of decimation: " + str(method))
 
     def get_phase_part(self, attr):
         """Gets phase part of given signal
@@ -223,44 +282,109 @@ class Signal:
             ----------
             attr : {}
                 The dictionary with attributes:
+                - method: str
+                    (optional) the method of estimating the baseline - one of baseline.BASELINE_METHODS:
+                    "polynomial" (default), "piecewise" or "als"
                 - deg: int
                     degree of the polynomial that will estimate the data baseline - recommended is 10
+                    ("polynomial" and "piecewise" methods)
                 - maxIt: int
                     maximum number of iterations to perform for baseline function - recommended is 100
+                - segmentLength: int
+                    (optional) the number of samples of segments of the "piecewise" method
+                - lambda: float
+                    (optional) smoothness of the baseline of the "als" method
+                - p: float
+                    (optional) weight of samples above the baseline of the "als" method
             """
-        degree = attr["deg"]
-        max_iterations = attr["maxIt"]
 
-        baseline = peakutils.baseline(self.signal_samples[:, 1], deg=degree, max_it=max_iterations)
-        self.signal_samples[:, 1] = [(j - p) for j, p in zip(self.signal_samples[:, 1], baseline)]
+        for channel_values in self.get_channel_values():
+            channel_values -= estimate_baseline(channel_values, attr)
 
     def normalize_by_std(self):
         """Normalizes the signal by standard standard deviation."""
 
-        mean = np.mean(self.get_values())
-        standard_dev = np.std(self.get_values())
+        values = self.get_values()
+        mean = np.mean(values, axis=-1, keepdims=True)
+        standard_dev = np.std(values, axis=-1, keepdims=True)
 
-        data_norm_by_std = [((number - mean) / standard_dev) for number in self.get_values()]
-        self.set_values(data_norm_by_std)
+        values -= mean
+        values /= standard_dev
 
-    def smooth(self):
-        """Removes noise from the signal
-            It actually smooths signal by averaging the samples.
-            For more info visit: https://becominghuman.ai/introduction-to-timeseries-analysis-using-python-numpy-only-3a7c980231af
+    def smooth(self, attr=None):
+        """Removes noise from the signal by smoothing it with the selected kernel.
+            All kernels run in linear time with respect to the length of the signal.
 
-        """
+           Parameters
+           ----------
+           attr : {}
+               (optional) The dictionary with attributes:
+               - kernel: str
+                    type of the smoothing kernel. Available kernels:
+                        'movingAverage' (default) - centered moving average, shortened at the edges of the signal
+                        'savitzkyGolay' - Savitzky–Golay filter (local polynomial fit)
+                        'exponential' - exponential moving average
+                        'iterative' - repeated averaging of every sample with its neighbours
+               - windowLength: int
+                    (movingAverage, savitzkyGolay) number of samples in the smoothing window - default is 5
+               - polyOrder: int
+                    (savitzkyGolay) order of the fitted polynomial - default is 2
+               - alpha: float
+                    (exponential) smoothing factor from range (0, 1] - default is 0.5
+               - numberOfIterations: int
+                    (iterative) number of averaging sweeps - default is the number of samples
+
+           The 'iterative' kernel gives the same output as the former implementation of this method
+           (which always did as many sweeps as there are samples). Each sweep is a single vectorized recursive filter,
+           but the total cost still grows with numberOfIterations times the number of samples.
+           With growing number of iterations its output converges to the straight line between the first
+           and the last sample of the signal.
+           """
 
-        "We start indexing at 2 because the algorithm needs the previous two samples of the signal to work properly."
-        starting_index = 2
+        self.set_values(self.smooth_values(self.get_values(), attr))
 
-        """Signal is an array of two-elements arrays with signal timestamp and value, where value is at the second place.
-            In order to get only value we have to point at the index 1 - therefore: value_of_signal = 1
-        """
-        value_of_signal = 1
-        for j in range(len(self.get_values())):
-            for i in range(starting_index, len(self.signal_samples)):
-                self.signal_samples[i - 1][value_of_signal] = (self.signal_samples[i - 2][value_of_signal] +
-                                                               self.signal_samples[i][value_of_signal]) / 2
+    @staticmethod
+    def smooth_values(values, attr=None):
+        """Returns values smoothed with the selected kernel (see smooth for attributes)
+
+           Parameters
+           ----------
+           values : numpy.ndarray
+               The values which should be smoothed (channels are smoothed separately along the last axis)
+           attr : {}
+               (optional) The dictionary with attributes of the smoothing kernel
+           """
+
+        import scipy.signal as ss
+
+        if attr is None:
+            attr = {}
+        kernel = attr.get("kernel", "movingAverage")
+
+        if kernel == "movingAverage":
+            half_of_window = int(attr.get("windowLength", 5)) // 2
+            cumulative_sum = np.concatenate((np.zeros(np.shape(values)[:-1] + (1,)), np.cumsum(values, axis=-1)),
+                                            axis=-1)
+            indexes = np.arange(np.shape(values)[-1])
+            window_starts = np.maximum(indexes - half_of_window, 0)
+            window_stops = np.minimum(indexes + half_of_window + 1, np.shape(values)[-1])
+            smoothed_values = (cumulative_sum[..., window_stops] - cumulative_sum[..., window_starts]) / \
+                              (window_stops - window_starts)
+        elif kernel == "savitzkyGolay":
+            smoothed_values = ss.savgol_filter(values, int(attr.get("windowLength", 5)), int(attr.get("polyOrder", 2)))
+        elif kernel == "exponential":
+            alpha = float(attr.get("alpha", 0.5))
+            smoothed_values, _ = ss.lfilter([alpha], [1, alpha - 1], values, zi=(1 - alpha) * values[..., :1])
+        elif kernel == "iterative":
+            smoothed_values = np.array(values, dtype=float)
+            for _ in range(int(attr.get("numberOfIterations", smoothed_values.shape[-1]))):
+                # one sweep: value[i] = (new value[i - 1] + old value[i + 1]) / 2, first and last sample are kept
+                smoothed_values[..., 1:-1], _ = ss.lfilter([0.5], [1, -0.5], smoothed_values[..., 2:],
+                                                            zi=0.5 * smoothed_values[..., :1])
+        else:
+            raise ValueError("Unknown smoothing kernel: " + str(kernel))
+
+        return smoothed_values
 
     def draw_plot(self, window_name, title_name, x_name, y_name):
         """Plots the signal chart with specified names of window, title, x and y values.
@@ -277,12 +401,16 @@ class Signal:
                 The y-axis name
            """
 
-        x_axis, y_axis = zip(*self.signal_samples)
+        """matplotlib is imported only when the plot is drawn - it is the slowest import of the program"""
+        from matplotlib import pyplot as plt
+
         plt.figure(window_name)
         plt.title(title_name)
         plt.xlabel(x_name)
         plt.ylabel(y_name)
-        plt.plot(x_axis, y_axis)
+        plt.plot(self.timestamps, self.values.T)
+        if self.channels is not None:
+            plt.legend(self.channels)
         plt.show()
 
     def mean(self, attr="Mean"):
@@ -298,9 +426,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.mean(window))
+            feature_values.append(np.mean(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def median(self, attr="Median"):
         """Extracts the median value from the signal. After being extracted, values are saved to the features list.
@@ -315,9 +443,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.median(window))
+            feature_values.append(np.median(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def standard_deviation(self, attr="Standard deviation"):
         """Extracts the standard deviation value from the signal. After being extracted,
@@ -333,9 +461,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.std(window))
+            feature_values.append(np.std(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def minimum(self, attr="Minimum"):
         """Extracts the minimum value from the signal. After being extracted, values are saved to the features list.
@@ -350,9 +478,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.min(window))
+            feature_values.append(np.min(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def maximum(self, attr="Maximum"):
         """Extracts the maximum value from the signal. After being extracted, values are saved to the features list.
@@ -367,9 +495,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.max(window))
+            feature_values.append(np.max(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def variance(self, attr="Variance"):
         """Extracts the variance value from the signal. After being extracted, values are saved to the features list.
@@ -384,9 +512,9 @@ class Signal:
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(np.var(window))
+            feature_values.append(np.var(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def kurtosis(self, attr="Kurtosis"):
         """Extracts the kurtosis value from the signal. After being extracted, values are saved to the features list.
@@ -398,12 +526,14 @@ class Signal:
 
            """
 
+        import scipy.stats as stat
+
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(stat.kurtosis(window))
+            feature_values.append(stat.kurtosis(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def skewness(self, attr="Skewness"):
         """Extracts the skewness value from the signal. After being extracted, values are saved to the features list.
@@ -414,12 +544,14 @@ class Signal:
                (optional) The name of the value obtained from "outputLabel" field in JSON configuration file
 
            """
+        import scipy.stats as stat
+
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
-            feature_values.append(stat.skew(window))
+            feature_values.append(stat.skew(window, axis=-1))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
 
     def area_under_curve(self, attr="Area under curve"):
         """Extracts the area under the curve characteristic value from the signal.
@@ -432,95 +564,160 @@ class Signal:
 
            """
 
+        import scipy.integrate as integration
+
         signal_values = self.get_windowed_values()
         feature_values = list()
         for window in signal_values:
             feature_values.append(integration.trapz(window))
 
-        self.features.append([attr, feature_values])
+        self.add_feature(attr, feature_values)
+
+    def extract_statistics(self, statistics, mode="batch"):
+        """Extracts many statistics from the signal at once. The signal is divided into windows only once and all
+            statistics are computed together. After being extracted, values are saved to the features list
+            in the same order as requested.
+
+           Parameters
+           ----------
+           statistics : [()]
+               The list of tuples, where the first element is the name of the statistic (one of the feature extraction
+               methods listed in STATISTICS_LABELS) and the second element is its output label or None for the default one
+           mode : str
+               (optional) How the statistics are computed:
+               - "batch": in one vectorized pass over the window matrix
+               - "rolling": incrementally, updating running statistics with samples entering and leaving the window -
+                    efficient for heavily overlapping windows (slide much smaller than the length of the window)
+
+           """
+
+        starts, stops = self.get_window_bounds()
+        names = [name for name, label in statistics]
+        if mode == "rolling":
+            results = rolling_statistics(self.values, starts, stops, names)
+        else:
+            results = batch_statistics(self.values, starts, stops, names)
+
+        for name, label in statistics:
+            if label is None:
+                label = STATISTICS_LABELS[name]
+            self.add_feature(label, results[name].T.tolist())
+
+    @property
+    def signal_samples(self):
+        """The two-dimensions array with signal [[timestamp, value]] (a column of values for each channel).
+            It is a copy made of timestamps and values arrays - modifying it does not change the signal."""
+
+        return np.column_stack((self.timestamps, self.values.T))
+
+    @signal_samples.setter
+    def signal_samples(self, samples):
+        """Splits the two-dimensions array with signal [[timestamp, value]] into timestamps and values arrays"""
+
+        samples = np.asarray(samples, dtype=float)
+        self.timestamps = np.ascontiguousarray(samples[:, 0])
+        if self.channels is None:
+            self.values = np.ascontiguousarray(samples[:, 1])
+        else:
+            self.values = np.ascontiguousarray(samples[:, 1:].T)
 
     def get_values(self):
         """Support method to get values out of a sampled signal.
                     Since signal is made out of time stamps and corresponding values sometimes we just want to use the values
-                    e.g: feature extraction.
+                    e.g: feature extraction. Returned array is a view - changing it changes values of the signal.
 
                 """
 
-        values_list = list()
-        for iterator in range(len(self.signal_samples)):
-            values_list.append(self.signal_samples[iterator][1])
+        return self.values
+
+    def get_channel_values(self):
+        """Support method to get values of every channel of the signal. Returned arrays are views - changing them
+            changes values of the signal. A single-channel signal has only one channel."""
 
-        return values_list
+        return list(np.atleast_2d(self.values))
+
+    def add_feature(self, label, feature_values):
+        """Support method for saving values of the feature of every window to the features list.
+            Features of the multi-channel signal are saved separately for every channel - the name of the channel
+            is added to the label (see CHANNEL_LABEL).
+
+            Parameters
+            ----------
+            label : str
+                The label of the feature
+            feature_values : list
+                Values of the feature of every window (arrays with a value of every channel
+                if the signal has many channels)
+            """
+
+        if self.channels is None:
+            self.features.append([label, feature_values])
+            return
+
+        feature_values = np.asarray(feature_values, dtype=float).reshape(-1, len(self.channels))
+        for channel, channel_values in zip(self.channels, feature_values.T):
+            self.features.append([CHANNEL_LABEL.format(label=label, channel=channel), channel_values.tolist()])
 
     def get_windowed_values(self):
         """Method to get values out of a sampled signal and decide whether returned signal should be windowed or not.
-         Method returns a 2 dimensional array where each element represents a window with signal values if it is windowed
+         Method returns a list where each element is a view of signal values of one window if it is windowed
          or it has only one element with whole signal if it is not windowed.
                        """
-        values = list()
 
         if self.windowing_attributes is None:
-            values.append(self.get_values())
-        else:
-            values = self.divide_into_windows()
+            return [self.values]
 
-        return values
+        return self.divide_into_windows()
 
-    def get_window_timestamps(self):
-        """Support method to get timestamps out of a sampled signal and divide them into windows timestamps.
+    def get_windows(self):
+        """Support method to find the windows of the signal with attributes - length of window and slide - selected by
+            user in configuration file. Returns SignalWindows object with start and stop indexes of every window.
                                        """
-        timestamps = list()
-
-        window_start = self.signal_samples[0, 0]
-        window_stop = window_start + self.windowing_attributes["length"]
-        timestamps.append([window_start, window_stop])
 
-        while True:
-            window_start += self.windowing_attributes["slide"]
-            window_stop += self.windowing_attributes["slide"]
-            if window_stop > self.signal_samples[-1, 0]:
-                break
-            timestamps.append([window_start, window_stop])
+        windows = SignalWindows(self.timestamps,
+                                self.windowing_attributes["length"],
+                                self.windowing_attributes["slide"])
 
         if len(self.features) == 0:
-            start_timestamps = [x[0] for x in timestamps]
-            self.features.append(["Start Window Timestamp", start_timestamps])
+            self.features.append(["Start Window Timestamp", windows.start_timestamps.tolist()])
 
-        return timestamps
+        return windows
 
-    def divide_into_windows(self):
-        """Support method to get values out of a sampled signal and divide them into windows with attributes -
-                    length of window and slide - selected by user in configuration file. Method returns a 2 dimensional array where each element
-                        represents a window with signal values.
-                               """
+    def get_window_bounds(self):
+        """Support method to get start and stop indexes of all windows.
+            If the signal is not windowed, there is only one window with the whole signal.
+                                       """
+
+        if self.windowing_attributes is None:
+            return np.array([0]), np.array([np.shape(self.values)[-1]])
 
-        values = list()
-        timestamps = self.get_window_timestamps()
+        windows = self.get_windows()
+        return windows.starts, windows.stops
 
-        for window in timestamps:
-            window_start = window[0]
-            window_stop = window[1]
+    def get_window_timestamps(self):
+        """Support method to get timestamps out of a sampled signal and divide them into windows timestamps.
+                                       """
 
-            left_condition = self.signal_samples[:, 0] >= window_start
-            right_condition = self.signal_samples[:, 0] <= window_stop
+        windows = self.get_windows()
+        return np.column_stack((windows.start_timestamps, windows.stop_timestamps)).tolist()
 
-            wind = self.signal_samples[left_condition & right_condition].tolist()
-            values.append([x[1] for x in wind])
+    def divide_into_windows(self):
+        """Support method to get values out of a sampled signal and divide them into windows with attributes -
+                    length of window and slide - selected by user in configuration file. Method returns a list where
+                    each element is a view of signal values of one window.
+                               """
 
-        return values
+        return self.get_windows().views(self.values)
 
     def set_values(self, new_values):
-        """Support method for setting new for the signal.
-            Since signal is made out of time stamps and corresponding values sometimes we just want to set new values
-        """
-
-        length_of_values = len(self.signal_samples)
-        length_of_new_values = len(new_values)
+        """Support method for setting new values for the signal. Values are updated in place.
+            Since signal is made out of time stamps and corresponding values sometimes we just want to set new values.
 
-        if length_of_values > length_of_new_values:
-            length_of_vector = length_of_new_values
-        else:
-            length_of_vector = length_of_values
+            The number of samples of the signal never changes:
+            - if new values are longer than the signal (e.g. full convolution), the surplus at the end is dropped,
+            - if new values are shorter than the signal (e.g. differentiation), only the first len(new_values) values
+              are replaced and the remaining values at the end of the signal stay unchanged.
+        """
 
-        for index in range(length_of_vector):
-            self.signal_samples[index][1] = new_values[index]
+        length_of_vector = min(np.shape(self.values)[-1], np.shape(new_values)[-1])
+        self.values[..., :length_of_vector] = new_values[..., :length_of_vector]
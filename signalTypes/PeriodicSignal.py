@@ -1,14 +1,11 @@
 from signal import Signal
 
-import biosppy
-
-from matplotlib import pyplot as plt
 import numpy as np
-from cmath import sqrt
-from statistics import mean, stdev
 
-import pyhrv.nonlinear as nl
-import pyhrv.frequency_domain as fd
+from filters import get_butterworth_design
+from hrv import windowed_frequency_domain_parameters, windowed_poincare_parameters, windowed_time_domain_parameters
+from pan_tompkins import pan_tompkins_transform
+from r_peaks import detect_r_peaks
 
 
 class PeriodicSignal(Signal):
@@ -21,10 +18,14 @@ class PeriodicSignal(Signal):
 
         Attributes
         ----------
-        r_peaks_distance: []
-            vector with distances between found peaks in milliseconds.
-            
+        r_peaks_distance: numpy.ndarray
+            vector with distances between found peaks in seconds.
+        r_peaks_timestamps: numpy.ndarray
+            timestamps of found peaks (in the units of the signal timestamps).
+
         Methods for feature extraction:
+        In all HRV methods there is implemented a mechanism of extraction for windowed signal - features are computed
+        from R-R intervals whose both peaks lie in the window.
         -------
         get_vector_r_peaks_distance_parameters():
             Extract mean, standard deviation, heart rate and RMSSD of distance R vector.
@@ -39,15 +40,25 @@ class PeriodicSignal(Signal):
         -------
         find_r_peaks(attr)
             Returns R peaks coordinates in seconds.
+        find_r_peak_indexes(attr)
+            Returns indexes of samples with R peaks.
         calculate_r_peaks_distance(attr)
             Calculate distance between R peaks in seconds.
+        get_r_peaks_distance_windows()
+            Returns indexes of the first and one past the last R-R interval of every window of the signal.
+        extract_hrv_features(compute_parameters, labels, attr)
+            Support method for saving HRV features of every window to the features list.
 
     """
 
+    signal_processing_methods = Signal.signal_processing_methods + ["pan_tompkins"]
+    cached_attributes = Signal.cached_attributes + ["r_peaks_distance", "r_peaks_timestamps"]
+
     def __init__(self, signal_file_name, signal_type, columns, windowing_attr=None):
         super().__init__(signal_file_name, signal_type, columns, windowing_attr)
 
-        self.r_peaks_distance = []
+        self.r_peaks_distance = np.empty(0)
+        self.r_peaks_timestamps = np.empty(0)
 
     def pan_tompkins(self, attr):
         """Uses Pan–Tompkins algorithm to extract vector of R-peaks distances.
@@ -62,6 +73,10 @@ class PeriodicSignal(Signal):
                 -length of the moving window.
             5) Calculate vector with R-peaks distances
 
+        Steps 1) - 4) are fused (see pan_tompkins.PanTompkinsKernel): the signal is processed in place block by block,
+        so no intermediate signals are created. The result is the same as of butterworth_filter, differentiate, square
+        and moving_window_integration methods run one after another.
+
 
        Parameters
        ----------
@@ -75,15 +90,20 @@ class PeriodicSignal(Signal):
                 an array  of cut of frequencies that will be applied to the filter
            - lengthOfWindow: int
                 length of the moving window during moving window integration
+           - mode: str
+                (optional) mode of applying the filter (see filters.FILTER_MODES) - default is "forward"
+           - detector: str
+                (optional) detector of R peaks (one of r_peaks.R_PEAK_DETECTORS) - default is "native"
         """
 
-        attributes = attr
-        attributes["type"] = 'bandpass'
+        if self.channels is not None:
+            raise ValueError("Pan–Tompkins algorithm needs a single-channel signal")
+
+        """Attributes of the configuration are not changed - the filter type is set on a copy"""
+        attributes = dict(attr, type='bandpass')
 
-        self.butterworth_filter(attributes)
-        self.differentiate()
-        self.square()
-        self.moving_window_integration(attributes)
+        pan_tompkins_transform(self.get_values(), get_butterworth_design(attributes), int(attributes["lengthOfWindow"]),
+                               attributes.get("mode", "forward"))
         self.calculate_r_peaks_distance(attributes)
 
     def find_r_peaks(self, attr):
@@ -95,56 +115,91 @@ class PeriodicSignal(Signal):
                The dictionary with attributes:
                - samplingRate: int
                     rate that the signal has been sampled with
+               - detector: str
+                    (optional) detector of R peaks (one of r_peaks.R_PEAK_DETECTORS) - default is "native"
            Returns
            -------
            R peaks coordinates in seconds
                a vector of seconds in which the peak has appeared
         """
 
-        sampling_rate = int(attr["samplingRate"])
+        return self.find_r_peak_indexes(attr) / int(attr["samplingRate"])
 
-        r_peaks = biosppy.signals.ecg.ecg(self.get_values(), sampling_rate=sampling_rate, show=False)
-        return r_peaks[2] / sampling_rate
+    def find_r_peak_indexes(self, attr):
+        """Get indexes of samples of the signal with R peaks (see find_r_peaks for attributes)"""
+
+        return detect_r_peaks(self.get_values(), int(attr["samplingRate"]), attr.get("detector", "native"))
 
     def calculate_r_peaks_distance(self, attr):
-        """Calculate distance between R peaks in seconds."""
-        r_peaks = self.find_r_peaks(attr)
-        self.r_peaks_distance = [r_peaks[i] - r_peaks[i - 1] for i in np.arange(1, len(r_peaks))]
+        """Calculate distance between R peaks in seconds and save timestamps of R peaks."""
+        r_peak_indexes = self.find_r_peak_indexes(attr)
+        self.r_peaks_distance = np.diff(r_peak_indexes) / int(attr["samplingRate"])
+        self.r_peaks_timestamps = self.timestamps[r_peak_indexes]
+
+    def get_r_peaks_distance_windows(self):
+        """Returns indexes of the first and one past the last R-R interval of every window of the signal
+            (the same windows as for other features). R-R interval belongs to the window if both its R peaks lie
+            in the window. Peaks of each window are found with a binary search over sorted timestamps of R peaks,
+            so the signal is not rescanned for each window. If the signal is not windowed, there is only one window
+            with all R-R intervals.
+
+            Returns
+            -------
+            tuple
+                two arrays with indexes of the first and one past the last R-R interval of each window
+        """
 
-    def get_vector_r_peaks_distance_parameters(self, attr={}):
-        """Calculate mean, standard deviation, heart rate and RMSSD of distance R vector.
-            After being extracted, values are saved to the features list."""
-        vector_mean = mean(self.r_peaks_distance)
-        vector_sd = stdev(self.r_peaks_distance)
-        vector_hr = 60 / vector_mean
-        vector_rmsdd = sqrt(sum([pow(vector_mean - x, 2) for x in self.r_peaks_distance]) / (
-                self.r_peaks_distance.__len__() - 1)).__abs__()
-
-        self.features.append([attr.get("vector_mean", "Mean R Distance"), np.array([vector_mean])])
-        self.features.append([attr.get("vector_sd", "SD R Distance"), np.array([vector_sd])])
-        self.features.append([attr.get("vector_hr", "HR"), np.array([vector_hr])])
-        self.features.append([attr.get("vector_rmssd", "RMSSD"), np.array([vector_rmsdd])])
-
-    def get_poincare_parameters(self, attr={}):
-        """Calculate SD1 and SD2 of poincare plot.
-            After being extracted, values are saved to the features list."""
+        if self.windowing_attributes is None:
+            return np.array([0]), np.array([len(self.r_peaks_distance)])
+
+        windows = self.get_windows()
+        first_peaks = np.searchsorted(self.r_peaks_timestamps, windows.start_timestamps, side='left')
+        stop_peaks = np.searchsorted(self.r_peaks_timestamps, windows.stop_timestamps, side='right')
+        first_intervals = np.minimum(first_peaks, len(self.r_peaks_distance))
+        return first_intervals, np.maximum(stop_peaks - 1, first_intervals)
+
+    def extract_hrv_features(self, compute_parameters, labels, attr):
+        """Support method for computing HRV parameters of every window and saving them to the features list
+
+            Parameters
+            ----------
+            compute_parameters : callable
+                The function of the hrv module which computes the dictionary of parameters of all windows
+                from R-R intervals and indexes of the first and one past the last R-R interval of each window
+            labels : [()]
+                The list of tuples with the key of the output label in attr, the key of the parameter returned by
+                compute_parameters and the default output label
+            attr : {}
+                The dictionary with output labels obtained from "outputLabel" field in JSON configuration file
+            """
 
         if attr is None:
             attr = {}
-        result = nl.poincare(nni=self.r_peaks_distance, show=False)
-        plt.close(result["poincare_plot"])
 
-        self.features.append([attr.get("sd1", "SD1"), np.array([result['sd1']])])
-        self.features.append([attr.get("sd2", "SD2"), np.array([result['sd2']])])
+        results = compute_parameters(self.r_peaks_distance, *self.get_r_peaks_distance_windows())
+        for label_key, parameter, label in labels:
+            self.features.append([attr.get(label_key, label), np.asarray(results[parameter], dtype=float)])
+
+    def get_vector_r_peaks_distance_parameters(self, attr=None):
+        """Calculate mean, standard deviation, heart rate and RMSSD of distance R vector.
+            After being extracted, values are saved to the features list."""
+
+        self.extract_hrv_features(windowed_time_domain_parameters, [("vector_mean", "mean", "Mean R Distance"),
+                                                                    ("vector_sd", "sd", "SD R Distance"),
+                                                                    ("vector_hr", "hr", "HR"),
+                                                                    ("vector_rmssd", "rmssd", "RMSSD")], attr)
 
-    def get_psd_parameters(self, attr={}):
-        """Calculate LF HF, their normalized values and ratio LF/HF.
+    def get_poincare_parameters(self, attr=None):
+        """Calculate SD1 and SD2 of poincare plot (the plot is not created).
+            After being extracted, values are saved to the features list."""
+
+        self.extract_hrv_features(windowed_poincare_parameters, [("sd1", "sd1", "SD1"), ("sd2", "sd2", "SD2")], attr)
+
+    def get_psd_parameters(self, attr=None):
+        """Calculate LF HF, their normalized values and ratio LF/HF (the plot is not created).
         After being extracted, values are saved to the features list."""
-        result = fd.welch_psd(nni=self.r_peaks_distance, show=False)
-        plt.close(result["fft_plot"])
-
-        self.features.append([attr.get("lf", "LF"), np.array([result[2][1]])])
-        self.features.append([attr.get("hf", "HF"), np.array([result[2][2]])])
-        self.features.append([attr.get("lf_norm", "LF Norm"), np.array([result[5][0]])])
-        self.features.append([attr.get("hf_norm", "HF Norm"), np.array([result[5][1]])])
-        self.features.append([attr.get("lf_hf", "LF/HF"), np.array([result[6]])])
+
+        self.extract_hrv_features(windowed_frequency_domain_parameters, [("lf", "lf", "LF"), ("hf", "hf", "HF"),
+                                                                         ("lf_norm", "lf_norm", "LF Norm"),
+                                                                         ("hf_norm", "hf_norm", "HF Norm"),
+                                                                         ("lf_hf", "lf_hf", "LF/HF")], attr)
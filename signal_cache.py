@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+
+class SignalCache:
+    """
+        A class used to represent the on-disk cache of intermediate signal states.
+
+        Each entry is a directory named by the hash of the signal file contents and the normalized sequence
+        of processing steps applied to the signal so far. It contains one .npy file for each attribute of the signal
+        listed in its "cached_attributes" (e.g. timestamps, values and r_peaks_distance).
+        When the total size of entries exceeds the size budget, the least recently used entries are removed.
+
+        ...
+
+        Attributes
+        ----------
+        directory : str
+            the directory where the cache entries are stored
+        max_size : int
+            the size budget of the cache in bytes
+        file_hashes : dict
+            hashes of already read signal files - the key is (path, size, modification time)
+
+        Methods
+        -------
+        get_key(signal_file_path, signal_type, columns, step_keys)
+            Returns the key of the signal state.
+        contains(key)
+            Checks whether the signal state is stored in the cache.
+        load(key, signal)
+            Restores the signal state from the cache.
+        save(key, signal)
+            Stores the signal state in the cache.
+        get_file_hash(path)
+            Returns the hash of the file contents.
+        evict()
+            Removes the least recently used entries until the cache fits in its size budget.
+        """
+
+    def __init__(self, directory, max_size):
+        """Initialization of the SignalCache object
+
+            Parameters
+            ----------
+            directory : str
+                The directory where the cache entries are stored (it is created if it does not exist)
+            max_size : int
+                The size budget of the cache in bytes
+            """
+
+        self.directory = directory
+        self.max_size = max_size
+        self.file_hashes = {}
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def get_key(self, signal_file_path, signal_type, columns, step_keys):
+        """Returns the key of the signal state
+
+            Parameters
+            ----------
+            signal_file_path : str
+                The path to the file with signal data
+            signal_type : str
+                The type of the signal
+            columns : dict
+                Dictionary with "timestamp" and "values" column numbers
+            step_keys : []
+                Normalized keys of processing steps applied to the signal so far
+
+            Returns
+            -------
+            str
+                the key of the signal state
+            """
+
+        description = [self.get_file_hash(signal_file_path), signal_type, columns, step_keys]
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def contains(self, key):
+        """Checks whether the signal state is stored in the cache"""
+
+        return os.path.isdir(os.path.join(self.directory, key))
+
+    def load(self, key, signal):
+        """Restores the signal state from the cache and marks the entry as recently used
+
+            Parameters
+            ----------
+            key : str
+                The key of the signal state
+            signal : Signal
+                The signal whose attributes are replaced with the cached ones
+
+            Returns
+            -------
+            bool
+                True if the state was found in the cache, otherwise False
+            """
+
+        entry = os.path.join(self.directory, key)
+        try:
+            for attribute in signal.cached_attributes:
+                setattr(signal, attribute, np.load(os.path.join(entry, attribute + ".npy")))
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def save(self, key, signal):
+        """Stores the signal state in the cache. The entry is written to a temporary directory first and then renamed,
+            so other processes never see a partially written entry.
+
+            Parameters
+            ----------
+            key : str
+                The key of the signal state
+            signal : Signal
+                The signal whose attributes listed in "cached_attributes" are stored
+            """
+
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            os.utime(entry)
+            return
+
+        temporary_entry = entry + ".tmp-" + uuid.uuid4().hex
+        os.makedirs(temporary_entry)
+        for attribute in signal.cached_attributes:
+            np.save(os.path.join(temporary_entry, attribute + ".npy"), np.asarray(getattr(signal, attribute)))
+
+        try:
+            os.rename(temporary_entry, entry)
+        except OSError:
+            # the same entry has been just saved by another process
+            shutil.rmtree(temporary_entry, ignore_errors=True)
+
+        self.evict()
+
+    def get_file_hash(self, path):
+        """Returns the hash of the file contents. The file is read only once while its size and modification time
+            do not change.
+
+            Parameters
+            ----------
+            path : str
+                The path to the file
+            """
+
+        status = os.stat(path)
+        file_id = (os.path.abspath(path), status.st_size, status.st_mtime_ns)
+        if file_id not in self.file_hashes:
+            file_hash = hashlib.sha256()
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 20), b''):
+                    file_hash.update(chunk)
+            self.file_hashes[file_id] = file_hash.hexdigest()
+
+        return self.file_hashes[file_id]
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in its size budget"""
+
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if ".tmp-" in name or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry))
+                entries.append((os.stat(entry).st_mtime, size, entry))
+            except FileNotFoundError:
+                continue
+            total_size += size
+
+        for _, size, entry in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
@@ -0,0 +1,229 @@
+import os
+
+import numpy as np
+
+"""
+    Defined variables used for reading signal files:
+
+    BINARY_EXTENSIONS ([]) : extensions of binary signal files in the order of preference when the signal file name
+                             is given without extension
+    CONVERSION_FORMATS ([]) : binary formats to which .csv signal files can be converted
+"""
+
+BINARY_EXTENSIONS = [".npy", ".parquet", ".feather", ".npz"]
+CONVERSION_FORMATS = ["npy", "parquet", "feather"]
+
+
+def get_value_columns(columns):
+    """Returns the list of numbers of values columns (numbered from 1) - "values" is a single column number
+        or a list of column numbers of a multi-channel signal"""
+
+    if isinstance(columns["values"], list):
+        return list(columns["values"])
+    return [columns["values"]]
+
+
+def is_multi_channel(columns):
+    """Checks whether the signal has a list of values columns (one for each channel)"""
+
+    return isinstance(columns["values"], list)
+
+
+def get_channel_names(columns):
+    """Returns names of channels of the multi-channel signal: the optional "channels" list of names
+        or "ch" with the number of the values column of each channel (e.g. "ch2")"""
+
+    names = columns.get("channels")
+    if names is None:
+        return ["ch" + str(column) for column in get_value_columns(columns)]
+    if len(names) != len(get_value_columns(columns)):
+        raise ValueError("The number of names of channels differs from the number of values columns")
+    return [str(name) for name in names]
+
+
+def get_signal_file_path(signal_file_name):
+    """Gets the path to the file with signal data
+
+        If the signal file name is a path to an existing file or a name of a file placed in ./signals with its extension,
+        this file is used. Otherwise the file name is treated as a name without extension: the binary file
+        (.npy, .parquet, .feather, .npz) converted from the .csv file is preferred if it is not older than the .csv file.
+
+        Parameters
+        ----------
+        signal_file_name : str
+            The name of the file placed in ./signals (with or without extension) or a path to an existing signal file
+
+        Returns
+        -------
+        str
+            the path to the file with signal data
+        """
+
+    if os.path.isfile(signal_file_name):
+        return signal_file_name
+
+    path = './signals/' + signal_file_name
+    if os.path.isfile(path):
+        return path
+
+    csv_path = path + '.csv'
+    for extension in BINARY_EXTENSIONS:
+        binary_path = path + extension
+        if os.path.isfile(binary_path) and \
+                (not os.path.isfile(csv_path) or os.path.getmtime(binary_path) >= os.path.getmtime(csv_path)):
+            return binary_path
+
+    return csv_path
+
+
+def read_signal_columns(path, columns):
+    """Reads only timestamp and values columns from the signal file as float arrays.
+        The format of the file is chosen by its extension:
+            - .npy - two-dimensions array (samples x columns), memory-mapped so only selected columns are read,
+            - .npz - one array for each column,
+            - .parquet and .feather - columnar files (pyarrow package is needed),
+            - any other - .csv file with the header row.
+
+        Parameters
+        ----------
+        path : str
+            The path to the file with signal data
+        columns : dict
+            Dictionary which contains information about columns to read from the file with signal data
+            with specified: "timestamp" column number and "values" column number or a list of column numbers
+            of a multi-channel signal (numbered from 1)
+
+        Returns
+        -------
+        tuple
+            contiguous arrays with timestamps and values of the signal - values of the multi-channel signal
+            are a two-dimensions array (channels x samples)
+        """
+
+    indexes = [columns["timestamp"] - 1] + [column - 1 for column in get_value_columns(columns)]
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".npy":
+        data = np.load(path, mmap_mode='r')
+        selected = [data[:, index] for index in indexes]
+    elif extension == ".npz":
+        with np.load(path) as data:
+            selected = [data[data.files[index]] for index in indexes]
+    elif extension == ".parquet":
+        import pyarrow.parquet as parquet
+
+        names = parquet.read_schema(path).names
+        table = parquet.read_table(path, columns=[names[index] for index in indexes])
+        selected = [table.column(index).to_numpy() for index in range(len(indexes))]
+    elif extension == ".feather":
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, columns=indexes)
+        selected = [table.column(index).to_numpy() for index in range(len(indexes))]
+    else:
+        import pandas as pd
+
+        names = pd.read_csv(r'' + path, nrows=0).columns
+        selected_names = [names[index] for index in indexes]
+        data = pd.read_csv(r'' + path, usecols=selected_names, dtype={name: float for name in selected_names})
+        selected = [data[name].to_numpy() for name in selected_names]
+
+    timestamps = np.array(selected[0], dtype=float, order='C')
+    if is_multi_channel(columns):
+        """Channels are rows, so the values of each channel are contiguous"""
+        return timestamps, np.array(selected[1:], dtype=float, order='C')
+    return timestamps, np.array(selected[1], dtype=float, order='C')
+
+
+def iter_signal_chunks(path, columns, chunk_size):
+    """Reads timestamp and values columns from the signal file in chunks, so the whole file is never loaded
+        into memory. The format of the file is chosen by its extension (see read_signal_columns).
+        Arrays of .npz files can not be memory-mapped, so both selected columns are loaded at once.
+        Only single-channel signals can be read in chunks.
+
+        Parameters
+        ----------
+        path : str
+            The path to the file with signal data
+        columns : dict
+            Dictionary which contains information about columns to read from the file with signal data
+            with specified: "timestamp" column number and "values" column number (numbered from 1)
+        chunk_size : int
+            The maximal number of samples in one chunk
+
+        Yields
+        ------
+        tuple
+            contiguous arrays with timestamps and values of the next chunk of the signal
+        """
+
+    indexes = [columns["timestamp"] - 1, columns["values"] - 1]
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".npy":
+        data = np.load(path, mmap_mode='r')
+        for start in range(0, data.shape[0], chunk_size):
+            yield tuple(np.array(data[start:start + chunk_size, index], dtype=float) for index in indexes)
+    elif extension == ".npz":
+        timestamps, values = read_signal_columns(path, columns)
+        for start in range(0, len(timestamps), chunk_size):
+            yield timestamps[start:start + chunk_size], values[start:start + chunk_size]
+    elif extension == ".parquet":
+        import pyarrow.parquet as parquet
+
+        parquet_file = parquet.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[names[index] for index in indexes]):
+            yield tuple(np.array(batch.column(index).to_numpy(), dtype=float) for index in range(len(indexes)))
+    elif extension == ".feather":
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, columns=indexes, memory_map=True)
+        for start in range(0, table.num_rows, chunk_size):
+            chunk = table.slice(start, chunk_size)
+            yield tuple(np.array(chunk.column(index).to_numpy(), dtype=float) for index in range(len(indexes)))
+    else:
+        import pandas as pd
+
+        names = pd.read_csv(r'' + path, nrows=0).columns
+        selected_names = [names[index] for index in indexes]
+        with pd.read_csv(r'' + path, usecols=selected_names, dtype={name: float for name in selected_names},
+                         chunksize=chunk_size) as reader:
+            for data in reader:
+                yield tuple(data[name].to_numpy(dtype=float, copy=True) for name in selected_names)
+
+
+def convert_csv_file(path, file_format="npy"):
+    """Converts the .csv signal file to the binary file placed next to it (with the same name and new extension),
+        so next runs do not have to parse the .csv file. All columns of the file are converted to floats.
+
+        Parameters
+        ----------
+        path : str
+            The path to the .csv file with signal data
+        file_format : str
+            The format of the binary file: "npy" (default), "parquet" or "feather"
+
+        Returns
+        -------
+        str
+            the path to the created binary file
+        """
+
+    if file_format not in CONVERSION_FORMATS:
+        raise ValueError("Unknown format of the signal file: " + str(file_format))
+
+    import pandas as pd
+
+    data = pd.read_csv(r'' + path, dtype=float)
+    binary_path = os.path.splitext(path)[0] + "." + file_format
+
+    if file_format == "npy":
+        """Columns are stored one after another, so reading one column from memory-mapped file reads only its pages"""
+        np.save(binary_path, np.asfortranarray(data.to_numpy(dtype=float)))
+    elif file_format == "parquet":
+        data.to_parquet(binary_path)
+    else:
+        data.to_feather(binary_path)
+
+    return binary_path
@@ -0,0 +1,702 @@
+import numpy as np
+import scipy.signal as ss
+
+from filters import get_butterworth_design, get_initial_state, get_settling_length
+from pan_tompkins import MovingWindowIntegrator, PanTompkinsKernel
+from resampling import design_resampling_filter, get_first_input, get_output_length, get_resampling_ratio, \
+    resample_timestamps, resample_values
+from signal import Signal, STATISTICS_LABELS
+from window_statistics import batch_statistics, rolling_statistics
+
+"""
+    Defined variables used for processing the signal in chunks:
+
+    STREAMING_PRECISION (float) : relative size of the transient of a zero-phase filter at the border of the chunk
+                                  which is neglected - it decides how many samples chunks of zero-phase filters
+                                  (decimation, butterworth_filter in "zeroPhase" mode) overlap
+    STREAMING_SMOOTHING_KERNELS ([]) : smoothing kernels which can be used in the streaming mode
+"""
+
+STREAMING_PRECISION = 1e-16
+STREAMING_SMOOTHING_KERNELS = ["movingAverage", "savitzkyGolay", "exponential"]
+
+
+class SignalStream:
+    """
+        A class used to represent the processing flow of a scenario run on a signal in chunks.
+
+        Each signal processing method is a stage which keeps its state between chunks (filter initial conditions,
+        last samples of the previous chunk, overlapping samples), so the concatenated output of all chunks is the same
+        as the output of processing the whole signal at once. Consecutive feature extraction methods form one stage
+        which passes samples unchanged and extracts features of every window as soon as the window is complete.
+        The memory used by the stream is bounded by the size of the chunk and the length of the window.
+
+        ...
+
+        Attributes
+        ----------
+        stages : []
+            processing stages in the order of the methods of the scenario
+        feature_stages : []
+            stages which extract features (in the order of the methods of the scenario)
+        next_row : int
+            index of the next window whose features are returned
+
+        Methods
+        -------
+        push(timestamps, values)
+            Processes the next chunk of the signal.
+        flush()
+            Processes the samples kept by the stages after the last chunk of the signal.
+        get_feature_labels()
+            Returns names of features in the rows of features.
+        """
+
+    def __init__(self, methods, signal_class, windowing_attr=None, feature_mode="single"):
+        """Initialization of the SignalStream object which creates stages for all methods
+
+            Parameters
+            ----------
+            methods : []
+                The list of methods of the scenario sorted by their order
+            signal_class : type
+                The class of the Signal object which represents the signal type of the scenario
+            windowing_attr : dict
+                Dictionary which contains information about the windowing, like: length of the window and its slide.
+                Features can be extracted in the streaming mode only from the windowed signal.
+            feature_mode : str
+                How statistics are extracted from the windows ("single", "batch" or "rolling")
+            """
+
+        self.stages = []
+        self.feature_stages = []
+        self.next_row = 0
+
+        for method in methods:
+            name = method["functionName"]
+            if name in STATISTICS_LABELS:
+                if windowing_attr is None:
+                    raise ValueError("Features can be extracted in the streaming mode only with windowing: " + name)
+                if len(self.stages) == 0 or not isinstance(self.stages[-1], WindowFeatureStage):
+                    stage = WindowFeatureStage(windowing_attr, feature_mode)
+                    self.stages.append(stage)
+                    self.feature_stages.append(stage)
+                self.stages[-1].add_statistic(name, method.get("outputLabel"))
+            elif name in signal_class.signal_processing_methods:
+                self.stages.append(create_processing_stage(name, method.get("attributes")))
+            else:
+                raise ValueError("Method can not be run in the streaming mode: " + name)
+
+        self.stages = fuse_pan_tompkins_stages(self.stages)
+
+    def push(self, timestamps, values):
+        """Processes the next chunk of the signal
+
+            Parameters
+            ----------
+            timestamps : numpy.ndarray
+                Timestamps of the samples of the chunk (later than timestamps of previous chunks)
+            values : numpy.ndarray
+                Values of the samples of the chunk
+
+            Returns
+            -------
+            tuple
+                timestamps and values of processed samples which are ready and the list of rows of features
+                of windows which are complete (see get_feature_labels)
+            """
+
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.asarray(values, dtype=float)
+        for stage in self.stages:
+            timestamps, values = stage.push(timestamps, values)
+
+        return timestamps, values, self.get_complete_rows()
+
+    def flush(self):
+        """Processes the samples kept by the stages after the last chunk of the signal.
+            Each stage flushes its samples and passes them through all following stages.
+
+            Returns
+            -------
+            tuple
+                timestamps and values of the remaining processed samples and the list of rows of features
+                of all remaining windows
+            """
+
+        timestamps = np.empty(0)
+        values = np.empty(0)
+        for stage in self.stages:
+            timestamps, values = stage.push(timestamps, values)
+            flushed_timestamps, flushed_values = stage.flush()
+            timestamps = np.concatenate((timestamps, flushed_timestamps))
+            values = np.concatenate((values, flushed_values))
+
+        return timestamps, values, self.get_complete_rows(flushing=True)
+
+    def get_feature_labels(self):
+        """Returns names of features in the rows of features - the first one is "Start Window Timestamp"
+            (an empty list if the scenario does not extract features)"""
+
+        if len(self.feature_stages) == 0:
+            return []
+
+        return ["Start Window Timestamp"] + [label for stage in self.feature_stages for label in stage.labels]
+
+    def get_complete_rows(self, flushing=False):
+        """Returns rows of features of windows which are complete in all feature stages.
+            When flushing, rows of all remaining windows are returned - missing features are set to None."""
+
+        rows = []
+        if len(self.feature_stages) == 0:
+            return rows
+
+        while all(self.next_row in stage.windows for stage in self.feature_stages) or \
+                (flushing and any(self.next_row in stage.windows for stage in self.feature_stages)):
+            start_timestamp, _ = self.feature_stages[0].windows.get(self.next_row, (None, None))
+            row = [start_timestamp]
+            for stage in self.feature_stages:
+                _, features = stage.windows.pop(self.next_row, (None, [None] * len(stage.labels)))
+                row.extend(features)
+            rows.append(row)
+            self.next_row += 1
+
+        return rows
+
+
+def create_processing_stage(name, attr):
+    """Creates the stage which runs the signal processing method on the signal in chunks
+
+        Parameters
+        ----------
+        name : str
+            The name of the signal processing method of the Signal class
+        attr : {}
+            The dictionary with attributes of the method (see the method of the Signal class)
+
+        Returns
+        -------
+        object
+            the stage with push(timestamps, values) and flush() methods
+        """
+
+    if name == "butterworth_filter":
+        sos = get_butterworth_design(attr)
+        if attr.get("mode", "forward") == "zeroPhase":
+            return OverlapStage(lambda timestamps, values: (timestamps, ss.sosfiltfilt(sos, values)),
+                                get_settling_length(sos, STREAMING_PRECISION))
+        return SosFilterStage(sos)
+    if name == "differentiate":
+        return DifferenceStage()
+    if name == "square":
+        return ElementwiseStage(np.square)
+    if name == "moving_window_integration":
+        return IntegrationStage(int(attr["lengthOfWindow"]))
+    if name == "decimate" and attr.get("method", "polyphase") == "polyphase":
+        up, down = get_resampling_ratio(attr["samplingFrequency"], attr["goalFrequency"])
+        if up == down:
+            return ElementwiseStage(np.copy)
+        return ResamplingStage(up, down)
+    if name == "decimate" and attr["method"] == "iir":
+        ratio = int(int(attr["samplingFrequency"]) / int(attr["goalFrequency"]))
+        sos = ss.cheby1(8, 0.05, 0.8 / ratio, output='sos')
+        margin = get_settling_length(sos, STREAMING_PRECISION)
+
+        """The same zero-phase filter as used by scipy.signal.decimate - it is applied to timestamps and values"""
+        def zero_phase_filter(timestamps, values):
+            filtered = ss.sosfiltfilt(sos, np.column_stack((timestamps, values)), axis=0)
+            return filtered[:, 0], filtered[:, 1]
+
+        return OverlapStage(zero_phase_filter, margin, ratio)
+    if name == "smooth":
+        if attr is None:
+            attr = {}
+        kernel = attr.get("kernel", "movingAverage")
+        if kernel not in STREAMING_SMOOTHING_KERNELS:
+            raise ValueError("Smoothing kernel can not be used in the streaming mode: " + str(kernel))
+        if kernel == "exponential":
+            alpha = float(attr.get("alpha", 0.5))
+            return FilterStage([alpha], [1, alpha - 1], first_value_state=[1 - alpha])
+
+        return OverlapStage(lambda timestamps, values: (timestamps, Signal.smooth_values(values, attr)),
+                            int(attr.get("windowLength", 5)) // 2)
+
+    raise ValueError("Method can not be run in the streaming mode: " + name)
+
+
+def fuse_pan_tompkins_stages(stages):
+    """Replaces each sequence of stages of the Pan-Tompkins preprocessing (forward butterworth_filter, differentiate,
+        square and moving_window_integration) with one PanTompkinsStage which gives the same output in one pass
+
+        Parameters
+        ----------
+        stages : []
+            Stages of the stream
+
+        Returns
+        -------
+        list
+            stages with fused sequences
+        """
+
+    fused = []
+    for stage in stages:
+        fused.append(stage)
+        if len(fused) >= 4 and isinstance(fused[-4], SosFilterStage) and isinstance(fused[-3], DifferenceStage) and \
+                isinstance(fused[-2], ElementwiseStage) and fused[-2].function is np.square and \
+                isinstance(fused[-1], IntegrationStage):
+            fused[-4:] = [PanTompkinsStage(fused[-4].sos, fused[-1].integrator.length_of_window)]
+
+    return fused
+
+
+class ElementwiseStage:
+    """Stage which applies the function to every value separately - it does not keep any state"""
+
+    def __init__(self, function):
+        self.function = function
+
+    def push(self, timestamps, values):
+        return timestamps, self.function(values)
+
+    def flush(self):
+        return np.empty(0), np.empty(0)
+
+
+class FilterStage:
+    """
+        Stage which applies the linear recursive filter (scipy.signal.lfilter) to values.
+        The state of the filter is passed from one chunk to the next one.
+
+        ...
+
+        Attributes
+        ----------
+        b : numpy.ndarray
+            numerator coefficients of the filter
+        a : numpy.ndarray
+            denominator coefficients of the filter
+        state : numpy.ndarray
+            the state of the filter after the last chunk (None before the first chunk)
+        first_value_state : []
+            (optional) the initial state of the filter as a multiple of the first value of the signal,
+            if not given, the filter starts from zeros
+        """
+
+    def __init__(self, b, a, first_value_state=None):
+        self.b = np.atleast_1d(b)
+        self.a = np.atleast_1d(a)
+        self.state = None
+        self.first_value_state = first_value_state
+
+    def push(self, timestamps, values):
+        if len(values) == 0:
+            return timestamps, values
+        if self.state is None:
+            if self.first_value_state is None:
+                self.state = np.zeros(max(len(self.a), len(self.b)) - 1)
+            else:
+                self.state = np.asarray(self.first_value_state, dtype=float) * values[0]
+
+        filtered_values, self.state = ss.lfilter(self.b, self.a, values, zi=self.state)
+        return timestamps, filtered_values
+
+    def flush(self):
+        return np.empty(0), np.empty(0)
+
+
+class SosFilterStage:
+    """
+        Stage which applies the filter given as second-order sections (scipy.signal.sosfilt) to values.
+        The state of the filter is passed from one chunk to the next one.
+        """
+
+    def __init__(self, sos):
+        self.sos = sos
+        self.state = get_initial_state(sos)
+
+    def push(self, timestamps, values):
+        if len(values) == 0:
+            return timestamps, values
+
+        filtered_values, self.state = ss.sosfilt(self.sos, values, zi=self.state)
+        return timestamps, filtered_values
+
+    def flush(self):
+        return np.empty(0), np.empty(0)
+
+
+class DifferenceStage:
+    """
+        Stage which differentiates values (like Signal.differentiate). The difference of the sample needs the next
+        sample, so the last sample of each chunk is kept until the next chunk. The last sample of the signal
+        keeps its value.
+        """
+
+    def __init__(self):
+        self.last_timestamp = np.empty(0)
+        self.last_value = np.empty(0)
+
+    def push(self, timestamps, values):
+        if len(values) == 0:
+            return timestamps, values
+
+        timestamps = np.concatenate((self.last_timestamp, timestamps))
+        values = np.concatenate((self.last_value, values))
+        self.last_timestamp = timestamps[-1:]
+        self.last_value = values[-1:]
+        return timestamps[:-1], np.diff(values)
+
+    def flush(self):
+        timestamps, values = self.last_timestamp, self.last_value
+        self.last_timestamp = np.empty(0)
+        self.last_value = np.empty(0)
+        return timestamps, values
+
+
+class IntegrationStage:
+    """
+        Stage which integrates values with the moving window (like Signal.moving_window_integration).
+        The last (length_of_window - 1) values are kept by the integrator, so windows can span the border of chunks.
+        """
+
+    def __init__(self, length_of_window):
+        self.integrator = MovingWindowIntegrator(length_of_window)
+
+    def push(self, timestamps, values):
+        return timestamps, self.integrator.push(values)
+
+    def flush(self):
+        return np.empty(0), np.empty(0)
+
+
+class PanTompkinsStage:
+    """
+        Stage which runs the fused Pan-Tompkins preprocessing (see pan_tompkins.PanTompkinsKernel) - the same output
+        as SosFilterStage, DifferenceStage, squaring and IntegrationStage one after another. The output lags one sample
+        behind the input, so the timestamp of the last sample is kept until the next chunk.
+        """
+
+    def __init__(self, sos, length_of_window):
+        self.kernel = PanTompkinsKernel(sos, length_of_window)
+        self.last_timestamp = np.empty(0)
+
+    def push(self, timestamps, values):
+        if len(values) == 0:
+            return timestamps, values
+
+        timestamps = np.concatenate((self.last_timestamp, timestamps))
+        self.last_timestamp = timestamps[-1:]
+        return timestamps[:-1], self.kernel.push(values)
+
+    def flush(self):
+        timestamps = self.last_timestamp
+        self.last_timestamp = np.empty(0)
+        return timestamps, self.kernel.flush()
+
+
+class OverlapStage:
+    """
+        Stage which runs a function of the whole block of samples (e.g. zero-phase filter or centered smoothing),
+        whose output of a sample depends only on samples not further than the margin. Blocks overlap by the margin
+        on both sides, so only outputs of samples far enough from the border of the block (or at the real beginning
+        and end of the signal) are returned. Outputs are returned at least margin samples later than their inputs.
+
+        ...
+
+        Attributes
+        ----------
+        function : callable
+            The function (timestamps, values) -> (timestamps, values) of the block of samples
+        margin : int
+            The number of samples needed on each side of the sample to compute its output
+        step : int
+            Only every step-th sample of the signal is returned (decimation)
+        block : SampleBuffer
+            Samples kept in the block
+        returned : int
+            The number of samples at the beginning of the block whose outputs were already returned
+        offset : int
+            The index of the first sample of the block in the whole signal
+        """
+
+    def __init__(self, function, margin, step=1):
+        self.function = function
+        self.margin = margin
+        self.step = step
+        self.block = SampleBuffer()
+        self.returned = 0
+        self.offset = 0
+
+    def push(self, timestamps, values):
+        self.block.append(timestamps, values)
+
+        """The block is processed only when at least margin new outputs can be returned"""
+        if len(self.block) - self.returned <= 2 * self.margin:
+            return np.empty(0), np.empty(0)
+
+        stop = len(self.block) - self.margin
+        outputs = self.get_outputs(stop)
+
+        """Samples which were not returned yet are kept with twice the margin of samples before them, so the last block
+            is never shorter than the full window of the function"""
+        keep_from = max(stop - 2 * self.margin, 0)
+        self.block.drop(keep_from)
+        self.offset += keep_from
+        self.returned = stop - keep_from
+        return outputs
+
+    def flush(self):
+        if len(self.block) == self.returned:
+            return np.empty(0), np.empty(0)
+
+        outputs = self.get_outputs(len(self.block))
+        self.block = SampleBuffer()
+        self.returned = 0
+        return outputs
+
+    def get_outputs(self, stop):
+        """Runs the function on the block and returns outputs of samples from the first not returned one to stop"""
+
+        timestamps, values = self.function(*self.block.get_arrays())
+        first = self.returned + (-(self.offset + self.returned)) % self.step
+        return timestamps[first:stop:self.step], values[first:stop:self.step]
+
+
+class ResamplingStage:
+    """
+        Stage which resamples the signal with the polyphase FIR filter (like Signal.decimate with the "polyphase"
+        method). The output sample is returned as soon as all input samples under the filter have arrived,
+        and only input samples needed by next output samples are kept, so outputs are the same as of the whole signal.
+
+        ...
+
+        Attributes
+        ----------
+        up : int
+            The upsampling factor
+        down : int
+            The downsampling factor
+        taps_count : int
+            The length of the FIR filter
+        samples : SampleBuffer
+            Input samples needed by next output samples
+        offset : int
+            The index of the first kept sample in the whole signal
+        received : int
+            The number of input samples received so far
+        next_output : int
+            The index of the next output sample
+        """
+
+    def __init__(self, up, down):
+        self.up = up
+        self.down = down
+        self.taps_count = len(design_resampling_filter(up, down))
+        self.samples = SampleBuffer()
+        self.offset = 0
+        self.received = 0
+        self.next_output = 0
+
+    def push(self, timestamps, values):
+        self.samples.append(timestamps, values)
+        self.received += len(values)
+
+        """The output sample k is ready when the last input sample under the filter, (delay + k * down) // up,
+            has arrived"""
+        delay = (self.taps_count - 1) // 2
+        stop = max((self.received * self.up - delay - 1) // self.down + 1, self.next_output)
+        return self.get_outputs(stop)
+
+    def flush(self):
+        if self.received == 0:
+            return np.empty(0), np.empty(0)
+
+        outputs = self.get_outputs(get_output_length(self.received, self.up, self.down), self.received - 1)
+        self.samples = SampleBuffer()
+        return outputs
+
+    def get_outputs(self, stop, last=None):
+        """Returns output samples from the next one to stop and removes input samples which are not needed anymore"""
+
+        if stop == self.next_output:
+            return np.empty(0), np.empty(0)
+
+        timestamps, values = self.samples.get_arrays()
+        outputs = (resample_timestamps(timestamps, self.offset, self.next_output, stop, self.up, self.down),
+                   resample_values(values, self.offset, self.next_output, stop, self.up, self.down, last))
+        self.next_output = stop
+
+        """The timestamp of the output sample may be interpolated from the input sample before its position"""
+        keep_from = max(min(get_first_input(stop, self.up, self.down, self.taps_count),
+                            stop * self.down // self.up - 1), self.offset)
+        self.samples.drop(keep_from - self.offset)
+        self.offset = keep_from
+        return outputs
+
+
+class WindowFeatureStage:
+    """
+        Stage which extracts statistics of windows of the signal as soon as the window is complete - when a sample
+        later than the end of the window arrives (or the signal ends). Windows are the same as the windows of
+        the whole signal (see windowing.SignalWindows). Samples are passed to the next stage unchanged and only samples
+        of windows which are not complete yet are kept.
+
+        ...
+
+        Attributes
+        ----------
+        length : float
+            The length of the window
+        slide : float
+            The slide of the window
+        feature_mode : str
+            How statistics are computed ("rolling" or other for the vectorized pass)
+        statistics : []
+            Names of extracted statistics
+        labels : []
+            Output labels of extracted statistics
+        first_timestamp : float
+            The timestamp of the first sample of the signal (None before the first sample)
+        last_timestamp : float
+            The timestamp of the last sample of the signal so far
+        next_window : int
+            The index of the first window which is not complete yet
+        samples : SampleBuffer
+            Samples of windows which are not complete yet
+        windows : dict
+            Complete windows which were not taken yet - the key is the index of the window and the value is a tuple
+            with the start timestamp of the window and the list of its features
+        """
+
+    def __init__(self, windowing_attr, feature_mode):
+        self.length = windowing_attr["length"]
+        self.slide = windowing_attr["slide"]
+        self.feature_mode = feature_mode
+        self.statistics = []
+        self.labels = []
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.next_window = 0
+        self.samples = SampleBuffer()
+        self.windows = {}
+
+    def add_statistic(self, name, label=None):
+        """Adds the statistic (the name of the feature extraction method) to the extracted features"""
+
+        self.statistics.append(name)
+        self.labels.append(STATISTICS_LABELS[name] if label is None else label)
+
+    def push(self, timestamps, values):
+        if len(values) == 0:
+            return timestamps, values
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamps[0]
+        self.last_timestamp = timestamps[-1]
+        self.samples.append(timestamps, values)
+
+        """Window is complete when a sample later than its end arrives"""
+        windows_count = self.next_window
+        while self.get_stop_timestamp(windows_count) < self.last_timestamp:
+            windows_count += 1
+        self.extract_windows(windows_count)
+
+        return timestamps, values
+
+    def flush(self):
+        """Extracts features of windows which end at the last sample (and of the first window, which always exists)"""
+
+        if self.first_timestamp is not None:
+            windows_count = self.next_window
+            while windows_count == 0 or self.get_stop_timestamp(windows_count) <= self.last_timestamp:
+                windows_count += 1
+            self.extract_windows(windows_count)
+
+        return np.empty(0), np.empty(0)
+
+    def get_start_timestamp(self, window_index):
+        return self.first_timestamp + self.slide * window_index
+
+    def get_stop_timestamp(self, window_index):
+        return self.get_start_timestamp(window_index) + self.length
+
+    def extract_windows(self, windows_count):
+        """Extracts features of windows from the first not complete window to windows_count
+            and removes samples which are not needed by next windows"""
+
+        if windows_count <= self.next_window:
+            return
+
+        timestamps, values = self.samples.get_arrays()
+        indexes = np.arange(self.next_window, windows_count)
+        start_timestamps = self.first_timestamp + self.slide * indexes
+        starts = np.searchsorted(timestamps, start_timestamps, side='left')
+        stops = np.searchsorted(timestamps, start_timestamps + self.length, side='right')
+        if self.feature_mode == "rolling":
+            results = rolling_statistics(values, starts, stops, self.statistics)
+        else:
+            results = batch_statistics(values, starts, stops, self.statistics)
+
+        for row, window_index in enumerate(indexes):
+            self.windows[int(window_index)] = (start_timestamps[row], [results[name][row] for name in self.statistics])
+
+        self.next_window = windows_count
+        self.samples.drop(np.searchsorted(timestamps, self.get_start_timestamp(self.next_window), side='left'))
+
+
+class SampleBuffer:
+    """
+        A class used to represent samples kept by a stage between chunks.
+        Appended chunks are joined into contiguous arrays only when they are needed, so appending a chunk
+        (e.g. a single sample in the real-time mode) costs constant time regardless of the number of kept samples.
+
+        ...
+
+        Attributes
+        ----------
+        timestamps : numpy.ndarray
+            Timestamps of joined samples
+        values : numpy.ndarray
+            Values of joined samples
+        pending : []
+            Chunks (tuples of timestamps and values) appended after samples were joined
+        size : int
+            The number of all kept samples
+
+        Methods
+        -------
+        append(timestamps, values)
+            Appends the chunk at the end of the buffer.
+        get_arrays()
+            Returns timestamps and values of all kept samples as contiguous arrays.
+        drop(count)
+            Removes the first count samples.
+        """
+
+    def __init__(self):
+        self.timestamps = np.empty(0)
+        self.values = np.empty(0)
+        self.pending = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamps, values):
+        if len(values) > 0:
+            self.pending.append((timestamps, values))
+            self.size += len(values)
+
+    def get_arrays(self):
+        if len(self.pending) > 0:
+            self.timestamps = np.concatenate([self.timestamps] + [chunk[0] for chunk in self.pending])
+            self.values = np.concatenate([self.values] + [chunk[1] for chunk in self.pending])
+            self.pending = []
+
+        return self.timestamps, self.values
+
+    def drop(self, count):
+        timestamps, values = self.get_arrays()
+        self.timestamps = timestamps[count:]
+        self.values = values[count:]
+        self.size = len(self.values)
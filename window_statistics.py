@@ -0,0 +1,340 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+"""
+    Defined variables used for computing statistics of windows in one pass:
+
+    MOMENT_STATISTICS ([]) : statistics which are computed from the shared central moments of the window
+    MAX_BLOCK_SIZE (int) : maximal number of values which are copied at once into the window matrix
+"""
+
+MOMENT_STATISTICS = ["mean", "standard_deviation", "variance", "kurtosis", "skewness"]
+MAX_BLOCK_SIZE = 2 ** 22
+
+
+def batch_statistics(values, starts, stops, statistics):
+    """Computes all requested statistics of all windows in one vectorized pass.
+        Windows with the same number of samples are gathered into 2-D window matrices (in blocks of rows,
+        so the memory stays bounded for heavily overlapping windows) and each statistic is a reduction along an axis.
+        Mean, variance, standard deviation, skewness and kurtosis share the same central moments.
+        Windows of all channels of the multi-channel signal are reduced together.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The values of the signal (channels x samples if the signal has many channels)
+        starts : numpy.ndarray
+            Index of the first sample of each window
+        stops : numpy.ndarray
+            Index one past the last sample of each window
+        statistics : []
+            Names of statistics to compute (names of the feature extraction methods of the Signal class)
+
+        Returns
+        -------
+        dict
+            a dictionary where the key is the name of the statistic and the value is an array with the statistic
+            for every window (channels x windows if the signal has many channels)
+        """
+
+    values = np.asarray(values, dtype=float)
+    lengths = stops - starts
+    results = {name: np.empty(values.shape[:-1] + (len(starts),)) for name in statistics}
+    channels_count = int(np.prod(values.shape[:-1]))
+
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        all_windows = sliding_window_view(values, length, axis=-1)
+        block_size = max(MAX_BLOCK_SIZE // max(length * channels_count, 1), 1)
+        for block_start in range(0, len(rows), block_size):
+            block_rows = rows[block_start:block_start + block_size]
+            windows_matrix = all_windows[..., starts[block_rows], :]
+            for name, feature_values in _matrix_statistics(windows_matrix, statistics).items():
+                results[name][..., block_rows] = feature_values
+
+    return results
+
+
+def _matrix_statistics(windows_matrix, statistics):
+    """Computes requested statistics of every row of the window matrix (along the last axis)"""
+
+    results = {}
+
+    if any(name in MOMENT_STATISTICS for name in statistics):
+        mean = windows_matrix.mean(axis=-1)
+        deviations = windows_matrix - mean[..., np.newaxis]
+        squared_deviations = np.square(deviations)
+        m2 = squared_deviations.mean(axis=-1)
+
+        """The same condition for a constant window as used by scipy.stats - skewness and kurtosis are not defined"""
+        constant = m2 <= (np.finfo(m2.dtype).resolution * mean) ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if "skewness" in statistics:
+                m3 = (squared_deviations * deviations).mean(axis=-1)
+                results["skewness"] = np.where(constant, np.nan, m3 / m2 ** 1.5)
+            if "kurtosis" in statistics:
+                m4 = np.square(squared_deviations).mean(axis=-1)
+                results["kurtosis"] = np.where(constant, np.nan, m4 / m2 ** 2 - 3)
+
+        results["mean"] = mean
+        results["variance"] = m2
+        results["standard_deviation"] = np.sqrt(m2)
+
+    if "median" in statistics:
+        results["median"] = np.median(windows_matrix, axis=-1)
+    if "minimum" in statistics:
+        results["minimum"] = windows_matrix.min(axis=-1)
+    if "maximum" in statistics:
+        results["maximum"] = windows_matrix.max(axis=-1)
+    if "area_under_curve" in statistics:
+        import scipy.integrate as integration
+
+        results["area_under_curve"] = integration.trapz(windows_matrix, axis=-1)
+
+    return {name: results[name] for name in statistics}
+
+
+def rolling_statistics(values, starts, stops, statistics):
+    """Computes all requested statistics of all windows incrementally, which is efficient for long, heavily
+        overlapping windows (slide much smaller than length). All statistics except median are computed
+        for all windows at once from segments between boundaries of windows, median is updated window by window
+        with vectorized operations whose cost grows mainly with the number of samples entering and leaving
+        the window:
+            - mean, variance, standard deviation, skewness, kurtosis and area merge centered moments of segments
+              between boundaries of windows (O(log) merges per window),
+            - minimum and maximum merge extremes of the same segments,
+            - median keeps the sorted window - values leaving and entering the window are deleted and inserted
+              at positions found by binary search.
+        Windows have to be ordered, so that both their starts and stops are non-decreasing.
+        Channels of the multi-channel signal are processed one after another.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The values of the signal (channels x samples if the signal has many channels)
+        starts : numpy.ndarray
+            Index of the first sample of each window
+        stops : numpy.ndarray
+            Index one past the last sample of each window
+        statistics : []
+            Names of statistics to compute (names of the feature extraction methods of the Signal class)
+
+        Returns
+        -------
+        dict
+            a dictionary where the key is the name of the statistic and the value is an array with the statistic
+            for every window (channels x windows if the signal has many channels)
+        """
+
+    values = np.asarray(values, dtype=float)
+    if values.ndim > 1:
+        channel_results = [rolling_statistics(channel_values, starts, stops, statistics) for channel_values in values]
+        return {name: np.array([results[name] for results in channel_results]) for name in statistics}
+
+    results = {}
+
+    if any(name in MOMENT_STATISTICS + ["area_under_curve"] for name in statistics):
+        results.update(_rolling_moments(values, starts, stops))
+    if "median" in statistics:
+        results["median"] = _rolling_median(values, starts, stops)
+    if "minimum" in statistics:
+        results["minimum"] = _rolling_extreme(values, starts, stops, np.minimum)
+    if "maximum" in statistics:
+        results["maximum"] = _rolling_extreme(values, starts, stops, np.maximum)
+
+    return {name: results[name] for name in statistics}
+
+
+def _get_segments(starts, stops):
+    """Splits the signal into segments between consecutive boundaries (starts and stops) of non-empty windows
+
+        Returns
+        -------
+        tuple
+            the mask of non-empty windows, boundaries of segments, the index of the first segment and the number
+            of segments of every non-empty window
+        """
+
+    non_empty = stops > starts
+    boundaries = np.unique(np.concatenate((starts[non_empty], stops[non_empty])))
+    first_segments = np.searchsorted(boundaries, starts[non_empty])
+    segments_counts = np.searchsorted(boundaries, stops[non_empty]) - first_segments
+    return non_empty, boundaries, first_segments, segments_counts
+
+
+def _merge_segments(level, first_segments, segments_counts, merge, initial):
+    """Merges values of consecutive segments of every window. Merges of 2, 4, 8, ... consecutive segments are built
+        level by level and each window merges at most one of them on every level (by bits of its number of segments),
+        so the cost is O(S log S) for S segments.
+
+        Parameters
+        ----------
+        level : []
+            Arrays with values of every segment (e.g. count, mean and central sums of powers)
+        first_segments : numpy.ndarray
+            The index of the first segment of every window
+        segments_counts : numpy.ndarray
+            The number of segments of every window
+        merge : callable
+            The function which merges lists of arrays of two consecutive parts of windows
+        initial : []
+            Values of the window without segments (neutral for merge)
+
+        Returns
+        -------
+        list
+            arrays with merged values of every window
+        """
+
+    window_values = [np.full(len(first_segments), value, dtype=float) for value in initial]
+    positions = first_segments.copy()
+    size = 1
+    while np.any(segments_counts >= size):
+        """Windows whose number of segments has this bit take the merge of the next size segments"""
+        taking = np.flatnonzero(segments_counts & size)
+        if len(taking) > 0:
+            piece = [values[positions[taking]] for values in level]
+            merged = merge([values[taking] for values in window_values], piece)
+            for values, merged_values in zip(window_values, merged):
+                values[taking] = merged_values
+            positions[taking] += size
+
+        """The next level merges pairs of neighbouring pieces of this level"""
+        if np.any(segments_counts >= 2 * size):
+            level = merge([values[:-size] for values in level], [values[size:] for values in level])
+        size *= 2
+
+    return window_values
+
+
+def _segment_moments(values, boundaries):
+    """Computes the number of samples, the mean and central sums of powers (M2, M3, M4) of every segment
+        between consecutive boundaries. Sums are centered on the mean of the segment (two passes), so they are
+        exact up to rounding of the segment itself."""
+
+    counts = np.diff(boundaries).astype(float)
+    segment_indexes = np.repeat(np.arange(len(counts)), np.diff(boundaries))
+    segment_values = values[boundaries[0]:boundaries[-1]]
+    means = np.add.reduceat(segment_values, boundaries[:-1] - boundaries[0]) / counts
+
+    deviations = segment_values - means[segment_indexes]
+    squared_deviations = np.square(deviations)
+    offsets = boundaries[:-1] - boundaries[0]
+    m2 = np.add.reduceat(squared_deviations, offsets)
+    m3 = np.add.reduceat(squared_deviations * deviations, offsets)
+    m4 = np.add.reduceat(np.square(squared_deviations), offsets)
+    return [counts, means, m2, m3, m4]
+
+
+def _merge_moments(first, second):
+    """Merges moments (count, mean, M2, M3, M4) of two consecutive parts of windows with the pairwise formulas
+        of Chan and Pebay - all terms are centered, so nothing cancels. Parts without samples are neutral."""
+
+    count_a, mean_a, m2_a, m3_a, m4_a = first
+    count_b, mean_b, m2_b, m3_b, m4_b = second
+    count = count_a + count_b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.where(count > 0, mean_b - mean_a, 0.0)
+        weight_b = np.where(count > 0, count_b / count, 0.0)
+        mean = np.where(count_a > 0, mean_a, mean_b) + np.where(count_a > 0, delta * weight_b, 0.0)
+        product = np.where(count > 0, count_a * count_b / count, 0.0)
+        weight_a = 1.0 - weight_b
+
+        m2 = m2_a + m2_b + delta ** 2 * product
+        m3 = m3_a + m3_b + delta ** 3 * product * (weight_a - weight_b) + \
+            3 * delta * (weight_a * m2_b - weight_b * m2_a)
+        m4 = m4_a + m4_b + delta ** 4 * product * (weight_a ** 2 - weight_a * weight_b + weight_b ** 2) + \
+            6 * delta ** 2 * (weight_a ** 2 * m2_b + weight_b ** 2 * m2_a) + 4 * delta * (weight_a * m3_b - weight_b * m3_a)
+
+    return [count, mean, m2, m3, m4]
+
+
+def _rolling_moments(values, starts, stops):
+    """Computes moment statistics and area of every window from moments of segments between consecutive
+        boundaries of windows. Moments of each segment are centered on its own mean and segments of a window
+        are merged with the pairwise formulas (_merge_moments, see _merge_segments), so the results are as accurate
+        as of the batch mode even for drifting signals or signals with values of very different magnitudes."""
+
+    results_count = len(starts)
+    non_empty, boundaries, first_segments, segments_counts = _get_segments(starts, stops)
+    moments = [np.zeros(results_count) for _ in range(5)]
+
+    if len(boundaries) > 0:
+        window_moments = _merge_segments(_segment_moments(values, boundaries), first_segments, segments_counts,
+                                         _merge_moments, [0.0] * 5)
+        for moment, values_of_windows in zip(moments, window_moments):
+            moment[non_empty] = values_of_windows
+
+    counts, mean, m2_sums, m3_sums, m4_sums = moments
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(non_empty, mean, np.nan)
+        m2 = m2_sums / counts
+        m3 = m3_sums / counts
+        m4 = m4_sums / counts
+
+        """The same condition for a constant window as used by scipy.stats - skewness and kurtosis are not defined"""
+        constant = m2 <= (np.finfo(m2.dtype).resolution * mean) ** 2
+        skewness = np.where(constant, np.nan, m3 / m2 ** 1.5)
+        kurtosis = np.where(constant, np.nan, m4 / m2 ** 2 - 3)
+
+    """Trapezoidal rule: sum of the window values minus half of the first and the last value"""
+    edges = np.zeros(results_count)
+    edges[non_empty] = (values[starts[non_empty]] + values[stops[non_empty] - 1]) / 2
+    area = np.where(non_empty, mean * counts, 0.0) - edges
+
+    return {
+        "mean": mean,
+        "variance": m2,
+        "standard_deviation": np.sqrt(m2),
+        "skewness": skewness,
+        "kurtosis": kurtosis,
+        "area_under_curve": area
+    }
+
+
+def _rolling_extreme(values, starts, stops, reduce):
+    """Computes minimum or maximum of every window from extremes of segments between consecutive boundaries
+        of windows (see _merge_segments). The function reduce is numpy.minimum or numpy.maximum - NaN values
+        propagate like in the batch mode."""
+
+    results = np.full(len(starts), np.nan)
+    non_empty, boundaries, first_segments, segments_counts = _get_segments(starts, stops)
+
+    if len(boundaries) > 0:
+        level = [reduce.reduceat(values[boundaries[0]:boundaries[-1]], boundaries[:-1] - boundaries[0])]
+        neutral = np.inf if reduce is np.minimum else -np.inf
+        results[non_empty] = _merge_segments(level, first_segments, segments_counts,
+                                             lambda first, second: [reduce(first[0], second[0])], [neutral])[0]
+
+    return results
+
+
+def _rolling_median(values, starts, stops):
+    """Computes median of every window from the sorted window. Values leaving the window are deleted and values
+        entering it are inserted at positions found by binary search, so the cost of a slide is the binary search
+        of these values and copies of the window (all vectorized). The window is sorted again when more values
+        change than it has. NaN values are sorted to the end, so the median is NaN like in the batch mode."""
+
+    results = np.full(len(starts), np.nan)
+    window = np.empty(0)
+    window_start = window_stop = 0
+
+    for window_index, (start, stop) in enumerate(zip(starts, stops)):
+        if start >= window_stop or (start - window_start) + (stop - window_stop) >= stop - start:
+            window = np.sort(values[start:stop])
+        else:
+            leaving = np.sort(values[window_start:start])
+            """Equal leaving values are deleted at consecutive positions"""
+            positions = np.searchsorted(window, leaving) + np.arange(len(leaving)) - \
+                np.searchsorted(leaving, leaving)
+            window = np.delete(window, positions)
+            entering = np.sort(values[window_stop:stop])
+            window = np.insert(window, np.searchsorted(window, entering), entering)
+        window_start, window_stop = start, stop
+
+        count = len(window)
+        if count > 0:
+            results[window_index] = np.nan if np.isnan(window[-1]) else \
+                (window[(count - 1) // 2] + window[count // 2]) / 2
+
+    return results
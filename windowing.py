@@ -0,0 +1,107 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SignalWindows:
+    """
+        A class used to represent the division of a signal into windows.
+
+        Window boundaries are found only once with a binary search over the sorted timestamps of the signal
+        and are stored as two compact arrays of sample indexes. The values of the windows are never copied -
+        they are handed out as NumPy views of the signal values.
+
+        ...
+
+        Attributes
+        ----------
+        start_timestamps : numpy.ndarray
+            timestamps at which the windows begin
+        stop_timestamps : numpy.ndarray
+            timestamps at which the windows end
+        starts : numpy.ndarray
+            index of the first sample of each window
+        stops : numpy.ndarray
+            index one past the last sample of each window (the window contains samples [start, stop))
+
+        Methods
+        -------
+        views(values)
+            Returns a list with a view of the signal values for every window.
+        matrix(values)
+            Returns a 2-D window matrix (windows x samples) if all windows have the same number of samples.
+        lengths()
+            Returns the number of samples in each window.
+        """
+
+    def __init__(self, timestamps, length, slide):
+        """Initialization of the SignalWindows object which finds the boundaries of all windows
+
+            Parameters
+            ----------
+            timestamps : numpy.ndarray
+                Sorted timestamps of the signal samples
+            length : float
+                The length of the window (in the units of timestamps)
+            slide : float
+                The slide of the window (in the units of timestamps)
+            """
+
+        first_timestamp = timestamps[0]
+        last_timestamp = timestamps[-1]
+
+        """The first window is always created, next ones only if they end before the last sample of the signal"""
+        windows_count = max(int(np.floor((last_timestamp - first_timestamp - length) / slide)) + 1, 0) + 1
+        self.start_timestamps = first_timestamp + slide * np.arange(windows_count)
+        self.stop_timestamps = self.start_timestamps + length
+        in_signal = self.stop_timestamps <= last_timestamp
+        in_signal[0] = True
+        self.start_timestamps = self.start_timestamps[in_signal]
+        self.stop_timestamps = self.stop_timestamps[in_signal]
+
+        """Window contains all samples for which: window_start <= timestamp <= window_stop"""
+        self.starts = np.searchsorted(timestamps, self.start_timestamps, side='left')
+        self.stops = np.searchsorted(timestamps, self.stop_timestamps, side='right')
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lengths(self):
+        """Returns the number of samples in each window"""
+
+        return self.stops - self.starts
+
+    def views(self, values):
+        """Returns a list with a view of the signal values for every window
+
+            Parameters
+            ----------
+            values : numpy.ndarray
+                The values of the signal which should be divided into windows (along the last axis)
+            """
+
+        return [values[..., start:stop] for start, stop in zip(self.starts, self.stops)]
+
+    def matrix(self, values):
+        """Returns a 2-D window matrix where each row contains values of a single window
+            (windows x samples of a single-channel signal, channels x windows x samples of a multi-channel signal).
+            If windows start at equally distant samples the matrix is a strided view of the values (no copy is made).
+            If windows have different number of samples the matrix can not be created and None is returned.
+
+            Parameters
+            ----------
+            values : numpy.ndarray
+                The values of the signal which should be divided into windows (along the last axis)
+            """
+
+        lengths = self.lengths()
+        if len(lengths) == 0 or np.any(lengths != lengths[0]):
+            return None
+
+        all_windows = sliding_window_view(values, lengths[0], axis=-1)
+        steps = np.diff(self.starts)
+        if len(steps) == 0:
+            return all_windows[..., self.starts[0]:self.starts[0] + 1, :]
+        if steps[0] > 0 and np.all(steps == steps[0]):
+            return all_windows[..., self.starts[0]::steps[0], :][..., :len(self.starts), :]
+
+        return all_windows[..., self.starts, :]